@@ -0,0 +1,210 @@
+import os
+import time
+import zlib
+import hashlib
+from collections import namedtuple
+
+from hashcache import get_cache, READ_BLOCK
+from entropy import ByteHistogram, DEFAULT_MODE, DEFAULT_SAMPLE_BYTES, sample_ranges
+
+# -------------------- Configuration --------------------
+HEADER_BYTES = 512
+FAST_ALGO = "crc32"
+# hash-cache slot holding the detected kind ("" = unknown); the version
+# changes whenever detection does, so kinds cached by older rules are ignored
+MAGIC_ALGO = "magic:2"
+
+# (offset, signature, kind) – checked in order, first match wins
+MAGIC_SIGNATURES = [
+    (0, b"%PDF-", "pdf"),
+    (0, b"\x89PNG\r\n\x1a\n", "png"),
+    (0, b"\xff\xd8\xff", "jpeg"),
+    (0, b"GIF87a", "gif"),
+    (0, b"GIF89a", "gif"),
+    (0, b"BM", "bmp"),
+    (0, b"II*\x00", "tiff"),
+    (0, b"MM\x00*", "tiff"),
+    (8, b"WEBP", "webp"),
+    (8, b"AVI ", "avi"),
+    (8, b"WAVE", "wav"),
+    (4, b"ftypqt", "mov"),
+    (4, b"ftyp", "mp4"),
+    (0, b"\x1a\x45\xdf\xa3", "mkv"),
+    (0, b"ID3", "mp3"),
+    (0, b"\xff\xfb", "mp3"),
+    (0, b"fLaC", "flac"),
+    (0, b"OggS", "ogg"),
+    (0, b"PK\x03\x04", "zip"),
+    (0, b"PK\x05\x06", "zip"),
+    (0, b"Rar!\x1a\x07", "rar"),
+    (0, b"7z\xbc\xaf\x27\x1c", "7z"),
+    (0, b"\x1f\x8b", "gz"),
+    (0, b"BZh", "bz2"),
+    (257, b"ustar", "tar"),
+    (0, b"MZ", "exe"),
+    (0, b"\x7fELF", "elf"),
+    (0, b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", "ole"),
+    (0, b"#!", "script"),
+]
+
+FileRecord = namedtuple("FileRecord", "path size md5 fast_digest entropy kind")
+
+
+# -------------------- Magic Bytes --------------------
+# Signatures of 2-3 bytes also start ordinary text ("BMW ...", "MZ ...",
+# "ID3 ...") and must be confirmed by the header fields that follow them.
+def _is_bmp(h):
+    # reserved words are zero; the DIB header has one of the known sizes
+    return len(h) >= 18 and h[6:10] == b"\0\0\0\0" and \
+        int.from_bytes(h[14:18], "little") in (12, 16, 40, 52, 56, 64, 108, 124)
+
+
+def _is_pe(h):
+    # e_lfanew points at the "PE\0\0" header (a plain DOS MZ stub is not confirmed)
+    if len(h) < 64:
+        return False
+    pe = int.from_bytes(h[60:64], "little")
+    return 64 <= pe <= len(h) - 4 and h[pe:pe + 4] == b"PE\0\0"
+
+
+def _is_id3(h):
+    # major version 2-4, revision 0xff never used, size bytes are 7-bit
+    return len(h) >= 10 and h[3] in (2, 3, 4) and h[4] != 0xFF and all(b < 0x80 for b in h[6:10])
+
+
+def _is_mpeg_frame(h):
+    # valid bitrate index (not 0 / 15) and sample-rate index (not 3)
+    return len(h) >= 3 and h[2] >> 4 not in (0, 15) and (h[2] >> 2) & 3 != 3
+
+
+def _is_gzip(h):
+    return len(h) >= 4 and h[2] == 8 and h[3] < 0x20  # deflate, reserved flags clear
+
+
+def _is_bzip2(h):
+    # block size '1'-'9', then the block magic (pi) or the end-of-stream magic (sqrt pi)
+    return len(h) >= 10 and 0x31 <= h[3] <= 0x39 and \
+        h[4:10] in (b"1AY&SY", b"\x17rE8P\x90")
+
+
+MAGIC_CHECKS = {
+    b"BM": _is_bmp,
+    b"MZ": _is_pe,
+    b"ID3": _is_id3,
+    b"\xff\xfb": _is_mpeg_frame,
+    b"\x1f\x8b": _is_gzip,
+    b"BZh": _is_bzip2,
+}
+
+
+def detect_magic(header):
+    """Return the content kind for a file header (see MAGIC_SIGNATURES), or None.
+
+    Short signatures only count when MAGIC_CHECKS confirms the header.
+    """
+    for offset, signature, kind in MAGIC_SIGNATURES:
+        if header[offset:offset + len(signature)] == signature:
+            check = MAGIC_CHECKS.get(signature)
+            if check is None or check(header):
+                return kind
+    return None
+
+
+# -------------------- Fused Analyzer --------------------
+def _feed_ranges(hist, chunk, offset, ranges):
+    # add the parts of `chunk` (starting at file `offset`) that fall in `ranges`
+    end = offset + len(chunk)
+    for start, length in ranges:
+        lo = max(start, offset)
+        hi = min(start + length, end)
+        if lo < hi:
+            hist.update(chunk[lo - offset:hi - offset])
+
+
+def analyze_file(path, entropy_mode=DEFAULT_MODE, sample_bytes=DEFAULT_SAMPLE_BYTES,
+                 fast_digest=False, cache=None, profiler=None):
+    """Size, MD5, optional CRC32, entropy and magic type of a file in one pass.
+
+    The file is opened once. If its digests are already in the hash cache
+    only the header and the entropy sample are read; otherwise a single
+    streaming pass feeds every digest and the entropy histogram, and the
+    new digests are stored in the cache.
+
+    With a profiling.Profiler, time is reported as the "stat" (open, stat,
+    cache lookup), "read" and "hash" (digests and histogram) phases, along
+    with the "files" and "bytes_read" counters.
+    """
+    cache = cache or get_cache()
+    hist = ByteHistogram()
+    clock = time.perf_counter
+    t_start = clock()
+    t_read = t_hash = 0.0
+    bytes_read = 0
+    with open(path, "rb", buffering=0) as f:
+        st = os.fstat(f.fileno())
+        size = st.st_size
+        ranges = sample_ranges(size, entropy_mode, sample_bytes)
+        md5 = cache.get(st)
+        fast = cache.get(st, FAST_ALGO) if fast_digest else None
+        buf = bytearray(READ_BLOCK)
+        view = memoryview(buf)
+        t_stat = clock() - t_start
+
+        if md5 is None or (fast_digest and fast is None):
+            md5_hasher = hashlib.md5()
+            crc = 0
+            header = b""
+            offset = 0
+            while True:
+                t0 = clock()
+                n = f.readinto(buf)
+                t1 = clock()
+                t_read += t1 - t0
+                if not n:
+                    break
+                chunk = view[:n]
+                if offset == 0:
+                    header = bytes(chunk[:HEADER_BYTES])
+                md5_hasher.update(chunk)
+                if fast_digest:
+                    crc = zlib.crc32(chunk, crc)
+                _feed_ranges(hist, chunk, offset, ranges)
+                offset += n
+                t_hash += clock() - t1
+            bytes_read = offset
+            md5 = md5_hasher.hexdigest()
+            cache.put(st, md5)
+            if fast_digest:
+                fast = "%08x" % crc
+                cache.put(st, fast, FAST_ALGO)
+        else:
+            t0 = clock()
+            header = f.read(HEADER_BYTES)
+            t_read += clock() - t0
+            bytes_read = len(header)
+            for start, length in ranges:
+                f.seek(start)
+                while length > 0:
+                    t0 = clock()
+                    n = f.readinto(view[:min(length, len(buf))])
+                    t1 = clock()
+                    t_read += t1 - t0
+                    if not n:
+                        break
+                    hist.update(view[:n])
+                    t_hash += clock() - t1
+                    bytes_read += n
+                    length -= n
+
+        kind = detect_magic(header)
+        # shared with categories.sniff, so scanned files are never re-read to classify them
+        cache.put(st, kind or "", MAGIC_ALGO)
+
+    if profiler is not None:
+        profiler.add_time("stat", t_stat)
+        profiler.add_time("read", t_read)
+        profiler.add_time("hash", t_hash)
+        profiler.count("files")
+        profiler.count("bytes_read", bytes_read)
+
+    return FileRecord(str(path), size, md5, fast, hist.entropy(), kind)
@@ -0,0 +1,324 @@
+"""Reproducible benchmarks for the engine changes quoted in the commit log.
+
+    python bench.py dupes [--files N] [--mb MB]     bytes read / time, full hash vs size-first
+    python bench.py hash-rss [SIZE_MB ...]          peak RSS hashing sparse files, per read mode
+    python bench.py entropy [--mb MB]               MB/s per entropy mode
+    python bench.py resultstore [--rows N]          memory of dict rows vs ScanResultStore
+    python bench.py walk [--files N] [--dirs N]     os.walk / rglob vs TreeWalker / ParallelWalker
+    python bench.py all                             every benchmark with its defaults
+
+Each benchmark builds its own data set in a temporary folder (or --dir)
+and removes it afterwards. Files are read right after they are written,
+so timings are warm page-cache numbers; compare runs on the same
+machine only. Hashing goes through a throwaway hash cache, never the
+user's ~/.dmanager one.
+"""
+import os
+import sys
+import time
+import random
+import shutil
+import hashlib
+import argparse
+import tempfile
+import subprocess
+import contextlib
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+MB = 1024 * 1024
+
+
+# -------------------- Helpers --------------------
+def bytes_read():
+    """Bytes this process has read so far (Linux /proc/self/io rchar), or None."""
+    try:
+        with open("/proc/self/io") as f:
+            for line in f:
+                if line.startswith("rchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def write_random(path, size, seed):
+    rng = random.Random(seed)
+    with open(path, "wb") as f:
+        left = size
+        while left > 0:
+            n = min(left, MB)
+            f.write(rng.randbytes(n))
+            left -= n
+
+
+def table(rows, header):
+    widths = [max(len(str(r[i])) for r in [header] + rows) for i in range(len(header))]
+    for r in [header] + rows:
+        print("  ".join(str(c).ljust(w) if i == 0 else str(c).rjust(w)
+                        for i, (c, w) in enumerate(zip(r, widths))))
+
+
+@contextlib.contextmanager
+def workdir(args):
+    if args.dir:
+        os.makedirs(args.dir, exist_ok=True)
+        path = tempfile.mkdtemp(prefix="bench-", dir=args.dir)
+    else:
+        path = tempfile.mkdtemp(prefix="dmanager-bench-")
+    try:
+        # keep benchmark digests out of the user's hash cache
+        os.environ["DMANAGER_HASH_CACHE"] = os.path.join(path, "hash_cache.db")
+        yield path
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+# -------------------- Duplicates (user-001) --------------------
+def bench_dupes(args):
+    from duplicates import group_duplicates
+    from hashcache import read_chunks
+    from profiling import Profiler
+
+    with workdir(args) as root:
+        # same-size pairs (half identical, half not) plus files of unique size
+        per_file = max(1, int(args.mb * MB / args.files))
+        paths = []
+        for i in range(args.files):
+            path = os.path.join(root, f"f{i:05d}.bin")
+            if i % 20 in (1, 3) and paths:
+                prev = paths[-1]
+                if i % 20 == 1:
+                    with open(prev, "rb") as src, open(path, "wb") as dst:
+                        dst.write(src.read())
+                else:
+                    write_random(path, os.path.getsize(prev), i)
+            else:
+                write_random(path, per_file + i, i)
+            paths.append(path)
+        total = sum(os.path.getsize(p) for p in paths)
+        print(f"{len(paths)} files, {total / MB:.1f} MB\n")
+
+        rows = []
+        before, t0 = bytes_read(), time.perf_counter()
+        by_md5 = {}
+        for path in paths:
+            h = hashlib.md5()
+            for chunk in read_chunks(path):
+                h.update(chunk)
+            by_md5.setdefault(h.hexdigest(), []).append(path)
+        old_groups = sum(1 for g in by_md5.values() if len(g) > 1)
+        rows.append(["full hash of every file", _read_since(before, total),
+                     f"{time.perf_counter() - t0:.2f}s", old_groups])
+
+        profiler = Profiler("bench dupes")
+        before, t0 = bytes_read(), time.perf_counter()
+        groups = group_duplicates(paths, profiler=profiler)
+        elapsed = time.perf_counter() - t0
+        counted = profiler.finish(write=False)["counters"].get("bytes_read", 0)
+        rows.append(["size + partial + full", _read_since(before, counted),
+                     f"{elapsed:.2f}s", len(groups)])
+        table(rows, ["method", "bytes read", "time", "groups"])
+
+
+def _read_since(before, fallback):
+    after = bytes_read()
+    n = after - before if before is not None and after is not None else fallback
+    return f"{n / MB:.1f} MB"
+
+
+# -------------------- Hashing RSS (user-004) --------------------
+HASH_MODES = ("read", "readinto", "mmap")
+
+
+def _hash_child(mode, path):
+    # runs in a fresh process so ru_maxrss belongs to this hash alone
+    from hashcache import compute_md5
+    if mode == "read":  # the pre-streaming implementation
+        with open(path, "rb") as f:
+            hashlib.md5(f.read()).hexdigest()
+    else:
+        compute_md5(path, use_mmap=(mode == "mmap"))
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(peak if sys.platform != "darwin" else peak // 1024)  # KiB
+
+
+def bench_hash_rss(args):
+    if resource is None:
+        print("hash-rss needs the resource module (not available on Windows)")
+        return
+    with workdir(args) as root:
+        rows = []
+        for size_mb in args.sizes:
+            path = os.path.join(root, f"sparse{size_mb}.bin")
+            with open(path, "wb") as f:
+                f.truncate(size_mb * MB)
+            row = [f"{size_mb} MiB"]
+            for mode in HASH_MODES:
+                out = subprocess.run([sys.executable, os.path.abspath(__file__), "hash-rss",
+                                      "--child", mode, path],
+                                     capture_output=True, text=True, check=True).stdout
+                row.append(f"{int(out) / 1024:.1f} MiB")
+            rows.append(row)
+            os.remove(path)
+        table(rows, ["file", "f.read() (old)", "readinto", "mmap"])
+        print("\nmmap pages are page cache: counted in RSS while resident, but reclaimable")
+
+
+# -------------------- Entropy (user-005) --------------------
+def bench_entropy(args):
+    import entropy
+    from entropy import ENTROPY_MODES, file_entropy, sample_ranges
+
+    backend = "NumPy" if entropy.np is not None else "Counter"
+    with workdir(args) as root:
+        path = os.path.join(root, "random.bin")
+        size = int(args.mb * MB)
+        write_random(path, size, 0)
+        print(f"{args.mb:g} MiB random file, histogram backend: {backend}\n")
+        rows = []
+        for mode in ENTROPY_MODES:
+            read = sum(n for _, n in sample_ranges(size, mode))
+            t0 = time.perf_counter()
+            value = file_entropy(path, mode)
+            elapsed = max(time.perf_counter() - t0, 1e-9)
+            rows.append([mode, f"{read / MB:.1f} MiB", f"{read / MB / elapsed:.1f} MB/s",
+                         f"{size / MB / elapsed:.1f} MB/s", f"{value:.4f}"])
+        table(rows, ["mode", "bytes read", "read rate", "file rate", "entropy"])
+
+
+# -------------------- Result Store (user-010) --------------------
+def bench_resultstore(args):
+    import tracemalloc
+    from resultstore import ScanResultStore, RISK_LABELS
+
+    # filenames are shared by both layouts, so they are built before measuring
+    names = [f"/data/folder{i % 1000}/file{i}.bin" for i in range(args.rows)]
+
+    def fill(add):
+        for i, name in enumerate(names):
+            add(name, i * 37, RISK_LABELS[i % 3], (i % 800) / 100, f"{i * 2654435761:032x}")
+
+    tracemalloc.start()
+    dict_rows = []
+    fill(lambda *v: dict_rows.append(dict(zip(ScanResultStore.FIELDS, v))))
+    dict_bytes = tracemalloc.get_traced_memory()[0]
+    dict_rows = None
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    store = ScanResultStore()
+    fill(store.append)
+    store_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print(f"{args.rows} results (tracemalloc, filename strings excluded)\n")
+    table([["list of dicts (old)", f"{dict_bytes / MB:.1f} MB"],
+           ["ScanResultStore", f"{store_bytes / MB:.1f} MB"]], ["layout", "memory"])
+
+
+# -------------------- Walker (user-011) --------------------
+def bench_walk(args):
+    from pathlib import Path
+    from walker import TreeWalker, ParallelWalker
+
+    with workdir(args) as root:
+        tree = os.path.join(root, "tree")
+        per_dir = max(1, args.files // args.dirs)
+        for d in range(args.dirs):
+            folder = os.path.join(tree, f"d{d % 20}", f"sub{d}")
+            os.makedirs(folder, exist_ok=True)
+            for i in range(per_dir):
+                open(os.path.join(folder, f"f{i}.txt"), "wb").close()
+        print(f"{per_dir * args.dirs} empty files in {args.dirs} folders\n")
+
+        def os_walk():
+            for top, _, files in os.walk(tree):
+                for name in files:
+                    path = os.path.join(top, name)
+                    os.path.getsize(path)
+                    yield path
+
+        def rglob():
+            return (p for p in Path(tree).rglob("*") if p.is_file())
+
+        def walker(cls, **kw):
+            def run():
+                for entry in cls(tree, **kw):
+                    entry.stat()
+                    yield entry
+            return run
+
+        rows = []
+        for label, make in (("os.walk + getsize (old)", os_walk),
+                            ("Path.rglob + is_file (old)", rglob),
+                            ("TreeWalker + cached stat", walker(TreeWalker)),
+                            ("ParallelWalker x8 + cached stat", walker(ParallelWalker, workers=8))):
+            t0 = time.perf_counter()
+            first = None
+            for n, _ in enumerate(make(), 1):
+                if first is None:
+                    first = time.perf_counter() - t0
+            rows.append([label, f"{time.perf_counter() - t0:.3f}s", f"{first * 1000:.2f} ms", n])
+        table(rows, ["walk", "total", "first file", "files"])
+
+
+# -------------------- Command Line --------------------
+BENCHMARKS = {
+    "dupes": bench_dupes,
+    "hash-rss": bench_hash_rss,
+    "entropy": bench_entropy,
+    "resultstore": bench_resultstore,
+    "walk": bench_walk,
+}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="bench.py", description="Engine benchmarks.")
+    parser.add_argument("--dir", help="create the test data below this folder (default: temp)")
+    sub = parser.add_subparsers(dest="command", metavar="BENCHMARK")
+    sub.required = True
+
+    p = sub.add_parser("dupes", help="bytes read finding duplicates")
+    p.add_argument("--files", type=int, default=400)
+    p.add_argument("--mb", type=float, default=256, help="approximate data set size")
+
+    p = sub.add_parser("hash-rss", help="peak RSS while hashing one file")
+    p.add_argument("sizes", nargs="*", type=int, default=[16, 256, 1024], metavar="SIZE_MB")
+    p.add_argument("--child", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+
+    p = sub.add_parser("entropy", help="throughput per entropy mode")
+    p.add_argument("--mb", type=float, default=64)
+
+    p = sub.add_parser("resultstore", help="memory held by Deep Scan results")
+    p.add_argument("--rows", type=int, default=1_000_000)
+
+    p = sub.add_parser("walk", help="tree walking")
+    p.add_argument("--files", type=int, default=50_000)
+    p.add_argument("--dirs", type=int, default=400)
+
+    sub.add_parser("all", help="run every benchmark with its defaults")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "hash-rss" and args.child:
+        _hash_child(*args.child)
+        return 0
+    if args.command == "all":
+        for name, func in BENCHMARKS.items():
+            print(f"== {name} ==")
+            func(parser.parse_args(([f"--dir={args.dir}"] if args.dir else []) + [name]))
+            print()
+        return 0
+    BENCHMARKS[args.command](args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
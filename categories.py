@@ -0,0 +1,172 @@
+import os
+import json
+
+from analyzer import HEADER_BYTES, MAGIC_ALGO, detect_magic
+from hashcache import get_cache
+
+# -------------------- Configuration --------------------
+DEFAULT_RULES_PATH = os.path.join(os.path.expanduser("~"), ".dmanager", "categories.json")
+FOLDER_CATEGORY = "Folders"
+OTHER_CATEGORY = "Others"
+
+DEFAULT_RULES = {
+    "Images": [".png", ".jpg", ".jpeg", ".gif", ".bmp", ".tiff", ".webp", ".svg"],
+    "Videos": [".mp4", ".mkv", ".mov", ".avi", ".flv", ".wmv", ".webm"],
+    "Documents": [".pdf", ".doc", ".docx", ".xls", ".xlsx", ".ppt", ".pptx", ".txt", ".md",
+                  ".odt", ".csv"],
+    "Archives": [".zip", ".rar", ".7z", ".tar", ".gz", ".bz2", ".xz", ".tgz",
+                 ".tar.gz", ".tar.bz2", ".tar.xz"],
+    "Music": [".mp3", ".wav", ".aac", ".flac", ".m4a", ".ogg"],
+    "Programs": [".exe", ".msi", ".bat", ".sh"],
+}
+
+# content kind (analyzer.detect_magic) -> the extension it is filed under,
+# so sniffed files follow the same (user-overridable) rules as named ones
+KIND_SUFFIX = {
+    "pdf": ".pdf", "png": ".png", "jpeg": ".jpg", "gif": ".gif", "bmp": ".bmp",
+    "tiff": ".tiff", "webp": ".webp", "avi": ".avi", "wav": ".wav", "mov": ".mov",
+    "mp4": ".mp4", "mkv": ".mkv", "mp3": ".mp3", "flac": ".flac", "ogg": ".ogg",
+    "zip": ".zip", "rar": ".rar", "7z": ".7z", "gz": ".gz", "bz2": ".bz2", "tar": ".tar",
+    "exe": ".exe", "elf": ".exe", "ole": ".doc", "script": ".sh",
+}
+# signatures shared by several formats (.docx/.epub are zips, .m4a is mp4,
+# .xls is OLE) or too short to overrule a known extension
+AMBIGUOUS_KINDS = {"zip", "ole", "mp4", "ogg", "bmp", "mp3", "exe", "script"}
+
+
+# -------------------- Category Engine --------------------
+class CategoryEngine:
+    """Maps file names to categories with one dict lookup per suffix.
+
+    `rules` is {category: [".ext", ...]}; suffixes may have several parts
+    (".tar.gz"), and the longest matching suffix wins. Later rules override
+    earlier ones for the same suffix. Folders never need a lookup: pass
+    is_dir=True when the caller already knows (e.g. from a DirEntry), so
+    classification never costs a stat.
+    """
+
+    def __init__(self, rules=None):
+        self.rules = {}
+        self.lookup = {}
+        self.max_parts = 1
+        self.update(DEFAULT_RULES if rules is None else rules)
+
+    def update(self, rules):
+        for category, suffixes in rules.items():
+            self.rules.setdefault(category, [])
+            for suffix in suffixes:
+                suffix = suffix.lower()
+                if not suffix.startswith("."):
+                    suffix = "." + suffix
+                old = self.lookup.get(suffix)
+                if old is not None and suffix in self.rules.get(old, ()):
+                    self.rules[old].remove(suffix)
+                self.lookup[suffix] = category
+                self.rules[category].append(suffix)
+                self.max_parts = max(self.max_parts, suffix.count("."))
+
+    @property
+    def categories(self):
+        return [c for c, suffixes in self.rules.items() if suffixes]
+
+    def classify(self, name, is_dir=False, default=OTHER_CATEGORY):
+        """Category for a file name or path; `default` when no rule matches."""
+        if is_dir:
+            return FOLDER_CATEGORY
+        name = os.path.basename(os.fspath(name)).lower()
+        # dots of the last `max_parts` suffixes; a leading dot (".bashrc") is not a suffix
+        dots = []
+        end = len(name)
+        for _ in range(self.max_parts):
+            end = name.rfind(".", 1, end)
+            if end <= 0:
+                break
+            dots.append(end)
+        for pos in reversed(dots):
+            category = self.lookup.get(name[pos:])
+            if category is not None:
+                return category
+        return default
+
+    def classify_file(self, path, is_dir=False, default=OTHER_CATEGORY, st=None):
+        """Category from the file's content, falling back to its extension.
+
+        Reads at most HEADER_BYTES (see sniff; `st` only saves opening
+        empty files). A recognised signature wins over a missing or
+        contradicting extension, except for ambiguous signatures, where a
+        known extension is trusted.
+        """
+        if is_dir:
+            return FOLDER_CATEGORY
+        by_ext = self.classify(path, default=None)
+        try:
+            kind = sniff(path, st)
+        except OSError:
+            kind = None
+        by_magic = self.lookup.get(KIND_SUFFIX.get(kind))
+        if by_magic is None or by_magic == by_ext:
+            return by_ext or default
+        if by_ext is not None and kind in AMBIGUOUS_KINDS:
+            return by_ext
+        return by_magic
+
+
+# -------------------- Content Sniffing --------------------
+def sniff(path, st=None, cache=None):
+    """Content kind of a file from its first HEADER_BYTES, or None.
+
+    Results are kept in the hash cache under the file's (device, inode,
+    size, mtime) key, next to the digests Deep Scan computes, so an
+    unchanged file is read at most once. The key comes from fstat of the
+    opened file: a DirEntry's stat has no device or inode on Windows.
+    `st`, if given, is only used to skip opening empty files.
+    """
+    if st is not None and not st.st_size:
+        return None
+    cache = cache or get_cache()
+    with open(path, "rb") as f:
+        st = os.fstat(f.fileno())
+        kind = cache.get(st, MAGIC_ALGO)
+        if kind is None:
+            kind = detect_magic(f.read(HEADER_BYTES)) or ""
+            cache.put(st, kind, MAGIC_ALGO)
+    return kind or None
+
+
+def load_rules(path):
+    """Read a {category: [suffixes]} JSON rule file."""
+    with open(path, "r", encoding="utf-8") as f:
+        rules = json.load(f)
+    if not isinstance(rules, dict) or not all(isinstance(v, list) for v in rules.values()):
+        raise ValueError(f"{path}: expected an object of category -> list of extensions")
+    return rules
+
+
+# -------------------- Shared Instance --------------------
+_engine = None
+
+
+def get_engine():
+    """Shared engine: the defaults plus the user rule file, if present.
+
+    The rule file is DMANAGER_CATEGORIES or ~/.dmanager/categories.json.
+    """
+    global _engine
+    if _engine is None:
+        engine = CategoryEngine()
+        path = os.environ.get("DMANAGER_CATEGORIES", DEFAULT_RULES_PATH)
+        if os.path.exists(path):
+            try:
+                engine.update(load_rules(path))
+            except (OSError, ValueError) as e:
+                print(f"Ignoring category rules in {path}: {e}")
+        _engine = engine
+    return _engine
+
+
+def categorize(name, is_dir=False, default=OTHER_CATEGORY):
+    return get_engine().classify(name, is_dir, default)
+
+
+def categorize_file(path, is_dir=False, default=OTHER_CATEGORY, st=None):
+    return get_engine().classify_file(path, is_dir, default, st)
@@ -0,0 +1,381 @@
+"""Headless command line for Deep Scan, duplicate search, organize and undo.
+
+    python cli.py scan FOLDER [--format json|csv] [--output FILE] [--fail-on RISK]
+    python cli.py dupes PATH... [--format json|csv] [--output FILE] [--fail-if-found]
+    python cli.py organize SOURCE... --target DIR [--flat] [--dry-run]
+    python cli.py undo [TX] [--owner NAME] [--list] [--force]
+
+Drives the same engines as the GUI pages (scanengine, duplicates, walker,
+mover, categories, journal) and never imports tkinter, customtkinter or
+PIL, so it runs from cron on a machine without a display. Results go to
+stdout (or --output); progress and diagnostics go to stderr. Engine
+modules are imported by the command that needs them, so startup stays
+fast.
+"""
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+import contextlib
+
+# -------------------- Configuration --------------------
+JOURNAL_OWNER = "cli"
+PROGRESS_INTERVAL = 0.5  # seconds between progress lines on a terminal
+
+# exit codes
+EXIT_OK = 0
+EXIT_ERRORS = 1        # finished, but some files could not be processed
+EXIT_USAGE = 2         # bad arguments or paths (argparse uses 2 as well)
+EXIT_FOUND = 3         # --fail-on / --fail-if-found matched
+EXIT_INTERRUPTED = 130  # Ctrl-C
+
+
+# -------------------- Helpers --------------------
+def error(message):
+    print(f"error: {message}", file=sys.stderr)
+
+
+def write_json(out, data):
+    json.dump(data, out, indent=2)
+    out.write("\n")
+
+
+def write_csv(out, fieldnames, rows):
+    writer = csv.DictWriter(out, fieldnames=fieldnames)
+    writer.writeheader()
+    writer.writerows(rows)
+
+
+class Progress:
+    """Single-line progress on stderr, only when stderr is a terminal."""
+
+    def __init__(self, label, quiet=False):
+        self.label = label
+        self.enabled = not quiet and sys.stderr.isatty()
+        self.last = 0.0
+
+    def update(self, done, total=None, force=False):
+        now = time.monotonic()
+        if not self.enabled or (not force and now - self.last < PROGRESS_INTERVAL):
+            return
+        self.last = now
+        total = f"/{total}" if total else ""
+        sys.stderr.write(f"\r{self.label}: {done}{total} files")
+        sys.stderr.flush()
+
+    def close(self):
+        if self.enabled:
+            sys.stderr.write("\n")
+
+
+def run_job(job, quiet=False):
+    """Run a jobs.Job to completion in the foreground; returns its JobResult.
+
+    Item errors are reported on stderr. Ctrl-C cancels the job and waits
+    for the items in flight, so the journal stays consistent.
+    """
+    progress = Progress(job.name, quiet)
+    job.start()
+    interrupted = False
+    while True:
+        try:
+            event = job.events.get()
+        except KeyboardInterrupt:
+            if not interrupted:
+                interrupted = True
+                error("interrupted, finishing the files in flight...")
+                job.cancel()
+            continue
+        if event[0] == "progress":
+            progress.update(event[1].done, event[1].total)
+        elif event[0] == "error":
+            _, item, exc = event
+            error(f"{getattr(item, 'path', item)}: {exc}")
+        elif event[0] == "done":
+            progress.close()
+            return event[1]
+
+
+def check_paths(paths):
+    missing = [p for p in paths if not os.path.exists(p)]
+    for p in missing:
+        error(f"no such file or directory: {p}")
+    return not missing
+
+
+# -------------------- Commands --------------------
+def cmd_scan(args, out):
+    from scanengine import DEFAULT_WORKERS, deep_scan
+    from resultstore import ScanResultStore, RISK_CODES
+    from profiling import Profiler
+
+    folder = os.path.abspath(args.folder)
+    if not os.path.isdir(folder):
+        error(f"not a directory: {args.folder}")
+        return EXIT_USAGE
+    workers = args.workers or DEFAULT_WORKERS
+    store = ScanResultStore()
+    errors = []
+    progress = Progress("Scan", args.quiet)
+    profiler = Profiler("Deep Scan", {"folder": folder, "workers": workers, "cli": True})
+
+    def failed(path, exc):
+        errors.append({"path": path, "error": str(exc)})
+        error(f"{path}: {exc}")
+
+    completed = False
+    try:
+        deep_scan(folder, progress.update, lambda row: None, lambda store: None,
+                  workers=workers, use_processes=args.processes, store=store,
+                  profiler=profiler, error_callback=failed)
+        completed = True
+    except KeyboardInterrupt:
+        return EXIT_INTERRUPTED
+    finally:
+        progress.close()
+        report = profiler.finish(write=completed and not args.no_report)
+
+    min_code = RISK_CODES[args.min_risk]
+    rows = [store.record(i) for i in range(len(store)) if store.risks[i] >= min_code]
+    if args.format == "csv":
+        write_csv(out, ScanResultStore.FIELDS, rows)
+    else:
+        write_json(out, {
+            "folder": folder,
+            "files": len(store),
+            "errors": errors,
+            "risk_counts": store.risk_counts(),
+            "elapsed_s": report["elapsed_s"],
+            "files_per_s": report["files_per_s"],
+            "mb_per_s": report["mb_per_s"],
+            "report": report.get("report_path"),
+            "results": rows,
+        })
+
+    if args.fail_on and any(code >= RISK_CODES[args.fail_on] for code in store.risks):
+        return EXIT_FOUND
+    return EXIT_ERRORS if errors else EXIT_OK
+
+
+def cmd_dupes(args, out):
+    from walker import iter_files
+    from duplicates import group_duplicates
+    from profiling import Profiler
+
+    paths = [os.path.abspath(p) for p in args.paths]
+    if not check_paths(paths):
+        return EXIT_USAGE
+    profiler = Profiler("Duplicates", {"sources": paths, "cli": True})
+    completed = False
+    try:
+        groups = group_duplicates(iter_files(paths), profiler=profiler)
+        completed = True
+    except KeyboardInterrupt:
+        return EXIT_INTERRUPTED
+    finally:
+        report = profiler.finish(write=completed and not args.no_report)
+
+    result = []
+    for digest, files in groups.items():
+        try:
+            size = os.path.getsize(files[0])
+        except OSError:
+            size = None
+        result.append({"hash": digest, "size": size, "paths": files})
+
+    if args.format == "csv":
+        write_csv(out, ("hash", "size", "path"),
+                  ({"hash": g["hash"], "size": g["size"], "path": p} for g in result for p in g["paths"]))
+    else:
+        write_json(out, {
+            "sources": paths,
+            "files": report["counters"].get("files", 0),
+            "groups": len(result),
+            "wasted_bytes": sum((g["size"] or 0) * (len(g["paths"]) - 1) for g in result),
+            "elapsed_s": report["elapsed_s"],
+            "report": report.get("report_path"),
+            "duplicates": result,
+        })
+    return EXIT_FOUND if args.fail_if_found and result else EXIT_OK
+
+
+def cmd_organize(args, out):
+    from mover import MoveEngine, DEFAULT_TRANSFERS
+    from journal import get_journal
+    from organize import organize_job
+    from profiling import Profiler
+
+    sources = [os.path.abspath(p) for p in args.sources]
+    target = os.path.abspath(args.target)
+    if not check_paths(sources):
+        return EXIT_USAGE
+    engine = MoveEngine(args.workers or DEFAULT_TRANSFERS)
+    profiler = Profiler("Organize", {"sources": sources, "target": target,
+                                     "workers": engine.max_transfers, "cli": True})
+    try:
+        job = organize_job(sources, target, engine, None if args.dry_run else get_journal(),
+                           JOURNAL_OWNER, subfolders=not args.flat, profiler=profiler,
+                           dry_run=args.dry_run)
+        result = run_job(job, args.quiet)
+        profiler.meta["cancelled"] = result.cancelled
+    finally:
+        report = profiler.finish(write=not args.dry_run and not args.no_report)
+
+    if args.dry_run:
+        write_json(out, {
+            "dry_run": True,
+            "target": target,
+            "files": len(job.planned),
+            "errors": result.errors,
+            "moves": [{"src": str(src), "dst": str(dst)} for src, dst in job.planned],
+        })
+        return EXIT_ERRORS if result.errors else EXIT_OK
+
+    write_json(out, {
+        "tx": job.tx,
+        "target": target,
+        "moved": result.done,
+        "errors": result.errors,
+        "bytes": result.bytes_done,
+        "elapsed_s": round(result.elapsed, 3),
+        "cancelled": result.cancelled,
+        "report": report.get("report_path"),
+    })
+    if result.cancelled:
+        return EXIT_INTERRUPTED
+    return EXIT_ERRORS if result.errors else EXIT_OK
+
+
+def cmd_undo(args, out):
+    from mover import MoveEngine
+    from journal import get_journal, rollback_job
+
+    journal = get_journal()
+    txs = journal.transactions(args.owner)
+
+    if args.list:
+        write_json(out, [{
+            "id": tx.id, "name": tx.name, "owner": tx.owner,
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(tx.started)),
+            "steps": tx.steps, "live": tx.live, "ended": tx.ended, "meta": tx.meta,
+        } for tx in reversed(txs)])
+        return EXIT_OK
+
+    if args.tx:
+        matches = [tx for tx in txs if tx.id.startswith(args.tx)]
+        if len(matches) != 1:
+            error(f"{'no' if not matches else 'more than one'} transaction matches {args.tx!r}")
+            return EXIT_USAGE
+        tx = matches[0]
+    else:
+        # newest operation that still has something to undo
+        tx = next((tx for tx in reversed(txs) if tx.live > 0), None)
+        if tx is None:
+            print("nothing to undo", file=sys.stderr)
+            return EXIT_OK
+
+    if tx.ended is None:
+        if not args.force:
+            error(f"transaction {tx.id} never ended; it may still be running in another "
+                  f"process (use --force to roll it back anyway)")
+            return EXIT_USAGE
+        # rollback_job settles the steps left pending by the crash first
+        journal.end(tx.id, "cancelled")
+
+    engine = MoveEngine()
+    result = run_job(rollback_job(journal, tx.id, engine), args.quiet)
+    journal.flush()
+    write_json(out, {
+        "tx": tx.id,
+        "name": tx.name,
+        "owner": tx.owner,
+        "restored": result.done,
+        "errors": result.errors,
+        "elapsed_s": round(result.elapsed, 3),
+        "cancelled": result.cancelled,
+    })
+    if result.cancelled:
+        return EXIT_INTERRUPTED
+    return EXIT_ERRORS if result.errors else EXIT_OK
+
+
+# -------------------- Argument Parsing --------------------
+def add_common_options(parser, **kwargs):
+    parser.add_argument("-q", "--quiet", action="store_true", help="no progress on stderr", **kwargs)
+    parser.add_argument("-o", "--output", help="write results to this file instead of stdout", **kwargs)
+    parser.add_argument("--no-report", action="store_true",
+                        help="do not write a JSON performance report (see profiling.py)", **kwargs)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="cli.py", description="Headless Deep Scan, duplicate search, organize and undo.",
+        epilog=f"exit codes: {EXIT_OK} ok, {EXIT_ERRORS} some files failed, {EXIT_USAGE} usage error, "
+               f"{EXIT_FOUND} --fail-on / --fail-if-found matched, {EXIT_INTERRUPTED} interrupted")
+    add_common_options(parser)
+    # the same options are accepted after the command ("scan DIR -o x.json");
+    # SUPPRESS keeps an option given before the command from being reset
+    common = argparse.ArgumentParser(add_help=False)
+    add_common_options(common, default=argparse.SUPPRESS)
+    sub = parser.add_subparsers(dest="command", metavar="COMMAND")
+    sub.required = True
+
+    p = sub.add_parser("scan", parents=[common],
+                       help="entropy / risk / MD5 of every file below a folder")
+    p.add_argument("folder")
+    p.add_argument("--format", choices=("json", "csv"), default="json")
+    p.add_argument("--workers", type=int, help="hashing workers (default: CPU count, max 8)")
+    p.add_argument("--processes", action="store_true", help="hash in worker processes")
+    p.add_argument("--min-risk", choices=("Low", "Medium", "High"), default="Low",
+                   help="only list files at or above this risk")
+    p.add_argument("--fail-on", choices=("Medium", "High"),
+                   help=f"exit {EXIT_FOUND} if any file is at or above this risk")
+    p.set_defaults(func=cmd_scan)
+
+    p = sub.add_parser("dupes", parents=[common], help="find identical files")
+    p.add_argument("paths", nargs="+")
+    p.add_argument("--format", choices=("json", "csv"), default="json")
+    p.add_argument("--fail-if-found", action="store_true",
+                   help=f"exit {EXIT_FOUND} if any duplicates are found")
+    p.set_defaults(func=cmd_dupes)
+
+    p = sub.add_parser("organize", parents=[common],
+                       help="move files into category folders (journaled, undoable)")
+    p.add_argument("sources", nargs="+")
+    p.add_argument("-t", "--target", required=True)
+    p.add_argument("--flat", action="store_true", help="no category subfolders")
+    p.add_argument("--workers", type=int, help="concurrent transfers")
+    p.add_argument("--dry-run", action="store_true", help="list the planned moves, move nothing")
+    p.set_defaults(func=cmd_organize)
+
+    p = sub.add_parser("undo", parents=[common], help="roll back an operation from the journal")
+    p.add_argument("tx", nargs="?", help="transaction id or prefix (default: the latest one)")
+    p.add_argument("--owner", help="only operations of this owner (cli, organizer, filemanagerpro)")
+    p.add_argument("--list", action="store_true", help="list operations instead of undoing")
+    p.add_argument("--force", action="store_true", help="roll back an operation that never ended")
+    p.set_defaults(func=cmd_undo)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        out = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+    except OSError as e:
+        error(str(e))
+        return EXIT_USAGE
+    try:
+        # engines report problems with print(); keep stdout for results only
+        with contextlib.redirect_stdout(sys.stderr):
+            return args.func(args, out)
+    except KeyboardInterrupt:
+        return EXIT_INTERRUPTED
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,127 +1,39 @@
-import psutil
 import platform
 import time
-import random
 import tkinter as tk
-from tkinter import ttk
-
-# -------------------- Helper Function --------------------
-def get_system_data():
-    cpu = psutil.cpu_percent(interval=0.5)
-    ram = psutil.virtual_memory().percent
-    disk = psutil.disk_usage("/").percent
-    uptime = round((time.time() - psutil.boot_time()) / 3600, 2)
-    integrity = random.randint(80, 100)
-    threats = random.randint(0, 3)
-    risk = "Low" if threats == 0 else "Medium" if threats == 1 else "High"
-    return cpu, ram, disk, uptime, integrity, threats, risk
-
-# -------------------- Dashboard Page --------------------
-class DashboardPage(tk.Frame):
-    def __init__(self, parent):
-        super().__init__(parent)
-        self.create_ui()
-        self.update_dashboard()
-
-    # -------------------- Build UI --------------------
-    def create_ui(self):
-        # Header
-        self.header = tk.Label(self, text="System Analyzer Dashboard", font=("Arial", 24, "bold"))
-        self.header.pack(pady=20)
-
-        # Main frame for cards
-        self.main_frame = tk.Frame(self, bg="#f0f0f0")
-        self.main_frame.pack(fill="both", expand=True, padx=20, pady=20)
-
-        # Grid layout
-        self.main_frame.grid_columnconfigure((0,1,2), weight=1)
-        self.main_frame.grid_rowconfigure((0,1), weight=1)
-
-        # Cards
-        self.cpu_card = self.create_card(self.main_frame, "CPU Usage", 0, 0)
-        self.ram_card = self.create_card(self.main_frame, "RAM Usage", 0, 1)
-        self.disk_card = self.create_card(self.main_frame, "Disk Usage", 0, 2)
-        self.security_card = self.create_card(self.main_frame, "Security Integrity", 1, 0)
-        self.threat_card = self.create_card(self.main_frame, "Threat Level", 1, 1)
-
-        # System Info Card
-        self.info_box = tk.Frame(self.main_frame, bg="#e0e0e0", relief="ridge", bd=2)
-        self.info_box.grid(row=1, column=2, sticky="nsew", padx=10, pady=10)
-        self.info_label = tk.Label(self.info_box, text="", font=("Arial", 14), justify="center")
-        self.info_label.pack(pady=20)
-
-    def create_card(self, parent, title, row, col):
-        card = tk.Frame(parent, bg="#e0e0e0", relief="ridge", bd=2)
-        card.grid(row=row, column=col, padx=10, pady=10, sticky="nsew")
-
-        title_label = tk.Label(card, text=title, font=("Arial", 16, "light"))
-        title_label.pack(pady=10)
-
-        progress = ttk.Progressbar(card, orient="horizontal", length=200, mode="determinate")
-        progress.pack(pady=10)
-
-        value_label = tk.Label(card, text="10%", font=("Arial", 14))
-        value_label.pack(pady=10)
-
-        return {"card": card, "progress": progress, "value_label": value_label}
-
-    # -------------------- Update Dashboard --------------------
-    def update_dashboard(self):
-        cpu, ram, disk, uptime, integrity, threats, risk = get_system_data()
-
-        self.update_card(self.cpu_card, cpu)
-        self.update_card(self.ram_card, ram)
-        self.update_card(self.disk_card, disk)
-        self.update_card(self.security_card, integrity)
-
-        threat_text = f"{threats} ({risk})"
-        self.threat_card["value_label"].configure(text=threat_text)
-        self.threat_card["progress"]["value"] = min(threats / 3 * 100, 100)
-
-        sys_name = platform.node()
-        os_name = platform.system()
-        self.info_label.configure(
-            text=f"System: {sys_name}\nOS: {os_name}\nUptime: {uptime} hrs"
-        )
-
-        # Refresh every 3 seconds
-        self.after(3000, self.update_dashboard)
-
-    def update_card(self, card, value):
-        card["progress"]["value"] = value
-        card["value_label"].configure(text=f"{value}%")
-
-# -------------------- Run --------------------
-def main():
-    root = tk.Tk()
-    root.title("System Dashboard")
-    root.geometry("900x600")
-    app = DashboardPage(root)
-    app.pack(fill="both", expand=True)
-    root.mainloop()
-
-if __name__ == "__main__":
-    main()
-import psutil
-import platform
-import time
-import random
-import tkinter as tk
-from tkinter import ttk
-
-def get_system_data():
-    cpu = psutil.cpu_percent(interval=0.5)
-    ram = psutil.virtual_memory().percent
-    disk = psutil.disk_usage("/").percent
-    uptime = round((time.time() - psutil.boot_time()) / 3600, 2)
-    integrity = random.randint(80, 100)
-    threats = random.randint(0, 3)
-    risk = "Low" if threats == 0 else "Medium" if threats == 1 else "High"
-    return cpu, ram, disk, uptime, integrity, threats, risk
+from tkinter import ttk, filedialog, messagebox
+from metrics import MetricsSampler, take_snapshot
+from timeseries import TimeSeriesStore
+from profiling import active_profilers, recent_reports
+
+REFRESH_MS = 1000  # how often the cards re-read the sampler
+SPARK_SECONDS = 120  # history shown in each card's sparkline
+SPARK_SIZE = (200, 40)
+PERF_PHASES = 4  # phases listed on the Performance card
+MAX_DISKS = 4    # busiest disks listed on the Disk I/O card
+MAX_MOUNTS = 4   # fullest mounts listed next to the system info
+
+def get_system_data(snapshot=None):
+    # never blocks: values come from a sampler snapshot (or one non-blocking reading,
+    # which has no I/O rates yet)
+    snap = snapshot or take_snapshot()
+    return snap.cpu, snap.ram, snap.disk, snap.uptime, snap.disks or {}, snap.mounts or [], snap.process
+
+def fmt_bytes(n):
+    for unit in ("B", "KB", "MB", "GB", "TB"):
+        if abs(n) < 1024 or unit == "TB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
 
 class DashboardPage(tk.Frame):
     def __init__(self, parent):
         super().__init__(parent, bg="#f8f8f8")
+        # psutil runs on the sampler thread; it only samples while this page is visible
+        self.history = TimeSeriesStore(("cpu", "ram", "disk"))
+        self.sampler = MetricsSampler(series=self.history).start()
+        self.bind("<Map>", lambda e: self.sampler.resume())
+        self.bind("<Unmap>", lambda e: self.sampler.pause())
+        self.bind("<Destroy>", lambda e: self.sampler.stop() if e.widget is self else None)
         self.create_ui()
         self.update_dashboard()
 
@@ -132,20 +44,32 @@ class DashboardPage(tk.Frame):
         self.main_frame = tk.Frame(self, bg="#f8f8f8")
         self.main_frame.pack(fill="both", expand=True, padx=20, pady=20)
         self.main_frame.grid_columnconfigure((0,1,2), weight=1)
-        self.main_frame.grid_rowconfigure((0,1), weight=1)
+        self.main_frame.grid_rowconfigure((0,1,2), weight=1)
 
-        self.cpu_card = self.create_card(self.main_frame, "CPU Usage", 0, 0)
-        self.ram_card = self.create_card(self.main_frame, "RAM Usage", 0, 1)
-        self.disk_card = self.create_card(self.main_frame, "Disk Usage", 0, 2)
-        self.security_card = self.create_card(self.main_frame, "Security Integrity", 1, 0)
-        self.threat_card = self.create_card(self.main_frame, "Threat Level", 1, 1)
+        self.cpu_card = self.create_card(self.main_frame, "CPU Usage", 0, 0, metric="cpu")
+        self.ram_card = self.create_card(self.main_frame, "RAM Usage", 0, 1, metric="ram")
+        self.disk_card = self.create_card(self.main_frame, "Disk Usage", 0, 2, metric="disk")
+        # progress bars: busiest disk's utilization, app CPU (one core = 100%)
+        self.io_card = self.create_card(self.main_frame, "Disk I/O", 1, 0)
+        self.process_card = self.create_card(self.main_frame, "App Process", 1, 1)
+        for card in (self.io_card, self.process_card):
+            card["value_label"].configure(text="", font=("Consolas", 11), justify="left")
 
         self.info_box = tk.Frame(self.main_frame, bg="#d9d9d9", relief="ridge", bd=2)
         self.info_box.grid(row=1, column=2, sticky="nsew", padx=10, pady=10)
         self.info_label = tk.Label(self.info_box, text="", font=("Arial", 14), bg="white", justify="center")
         self.info_label.pack(fill="both", expand=True, padx=5, pady=5)
 
-    def create_card(self, parent, title, row, col):
+        # last / running scan, organize or duplicate search (profiling.Profiler)
+        self.perf_box = tk.Frame(self.main_frame, bg="#d9d9d9", relief="ridge", bd=2)
+        self.perf_box.grid(row=2, column=0, columnspan=3, sticky="nsew", padx=10, pady=10)
+        tk.Label(self.perf_box, text="Performance", font=("Arial", 16, "bold"), bg="white").pack(fill="x", padx=5, pady=(5, 0))
+        self.perf_label = tk.Label(self.perf_box, text="No runs yet", font=("Consolas", 11), bg="white", justify="left", anchor="w")
+        self.perf_label.pack(fill="both", expand=True, padx=5, pady=5)
+
+        tk.Button(self, text="Export History (CSV)", command=self.export_history).pack(pady=(0, 10))
+
+    def create_card(self, parent, title, row, col, metric=None):
         card = tk.Frame(parent, bg="#e6e6e6", relief="ridge", bd=2)
         card.grid(row=row, column=col, padx=10, pady=10, sticky="nsew")
 
@@ -158,29 +82,108 @@ class DashboardPage(tk.Frame):
         value_label = tk.Label(card, text="0%", font=("Arial", 14), bg="white")
         value_label.pack(pady=10, fill="x", padx=5)
 
-        return {"card": card, "progress": progress, "value_label": value_label}
+        spark = None
+        if metric:
+            w, h = SPARK_SIZE
+            spark = tk.Canvas(card, width=w, height=h, bg="white", highlightthickness=0)
+            spark.pack(pady=(0, 10))
+            spark.create_line(0, h, w, h, fill="#2563eb", width=1.5, tags="line")
+
+        return {"card": card, "progress": progress, "value_label": value_label,
+                "metric": metric, "spark": spark}
 
     def update_dashboard(self):
-        cpu, ram, disk, uptime, integrity, threats, risk = get_system_data()
+        self.after(REFRESH_MS, self.update_dashboard)
+        snap = self.sampler.latest()
+        if snap is None or self.sampler.paused:
+            return
+        cpu, ram, disk, uptime, disks, mounts, process = get_system_data(snap)
 
         self.update_card(self.cpu_card, cpu)
         self.update_card(self.ram_card, ram)
         self.update_card(self.disk_card, disk)
-        self.update_card(self.security_card, integrity)
-
-        threat_text = f"{threats} ({risk})"
-        self.threat_card["value_label"].configure(text=threat_text)
-        self.threat_card["progress"]["value"] = min(threats / 3 * 100, 100)
+        self.update_io(disks)
+        self.update_process(process)
 
         sys_name = platform.node()
         os_name = platform.system()
-        self.info_label.configure(text=f"System: {sys_name}\nOS: {os_name}\nUptime: {uptime} hrs")
-
-        self.after(3000, self.update_dashboard)
+        lines = [f"System: {sys_name}", f"OS: {os_name}", f"Uptime: {uptime} hrs", ""]
+        for m in sorted(mounts, key=lambda m: -m.percent)[:MAX_MOUNTS]:
+            lines.append(f"{m.mountpoint}: {m.percent:.0f}% of {fmt_bytes(m.total)}")
+        if len(mounts) > MAX_MOUNTS:
+            lines.append(f"(+{len(mounts) - MAX_MOUNTS} more mounts)")
+        self.info_label.configure(text="\n".join(lines))
+        self.update_performance()
 
     def update_card(self, card, value):
         card["progress"]["value"] = value
         card["value_label"].configure(text=f"{value}%")
+        if card.get("spark") is not None:
+            now = time.time()
+            times, values = self.history.series(card["metric"], since=now - SPARK_SECONDS)
+            self.draw_sparkline(card["spark"], times, values, now)
+
+    def update_io(self, disks):
+        busiest = sorted(disks.items(), key=lambda kv: -(kv[1].read_bps + kv[1].write_bps))
+        lines = []
+        for name, d in busiest[:MAX_DISKS]:
+            lines.append(f"{name:<8} R {fmt_bytes(d.read_bps):>9}/s {d.read_iops:>6.0f} IOPS")
+            lines.append(f"{'':<8} W {fmt_bytes(d.write_bps):>9}/s {d.write_iops:>6.0f} IOPS")
+        self.io_card["value_label"].configure(text="\n".join(lines) or "No disk counters")
+        self.io_card["progress"]["value"] = max((d.busy for d in disks.values()), default=0)
+
+    def update_process(self, process):
+        if process is None:
+            return
+        self.process_card["progress"]["value"] = min(process.cpu, 100)
+        self.process_card["value_label"].configure(text=(
+            f"CPU     {process.cpu:>6.1f}%  ({process.threads} threads)\n"
+            f"RSS     {fmt_bytes(process.rss):>10}\n"
+            f"Read    {fmt_bytes(process.read_bps):>10}/s\n"
+            f"Write   {fmt_bytes(process.write_bps):>10}/s"))
+
+    def update_performance(self):
+        active = active_profilers()
+        if active:
+            report = active[-1].report()
+        else:
+            recent = recent_reports()
+            if not recent:
+                return
+            report = recent[-1]
+        state = "finished" if report["finished"] else "running"
+        lines = [f"{report['operation']} ({state}, {report['elapsed_s']:.1f} s): "
+                 f"{report['files_per_s']} files/s, {report['mb_per_s']} MB/s"]
+        for name, p in list(report["phases"].items())[:PERF_PHASES]:
+            lines.append(f"  {name:<14}{p['seconds']:>9.2f} s{p['calls']:>9} calls{p['mean_ms']:>10.3f} ms")
+        workers = report["workers"]
+        if workers:
+            mean = sum(w["utilization"] for w in workers.values()) / len(workers)
+            lines.append(f"  {len(workers)} threads, {mean:.0%} busy on average")
+        if report.get("report_path"):
+            lines.append(f"  Report: {report['report_path']}")
+        self.perf_label.configure(text="\n".join(lines))
+
+    def draw_sparkline(self, canvas, times, values, now):
+        # percentages placed by age, now at the right edge; one canvas item re-pointed each tick
+        w, h = SPARK_SIZE
+        if len(values) < 2:
+            return
+        coords = []
+        for t, v in zip(times, values):
+            coords += [w - w * (now - t) / SPARK_SECONDS, h - 2 - (h - 4) * min(max(v, 0), 100) / 100]
+        canvas.coords("line", *coords)
+
+    def export_history(self):
+        path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV", "*.csv")],
+                                            title="Export metrics history")
+        if not path:
+            return
+        try:
+            rows = self.history.export_csv(path)
+            messagebox.showinfo("Export", f"Wrote {rows} rows to {path}")
+        except OSError as e:
+            messagebox.showerror("Export Error", str(e))
 
 def main():
     root = tk.Tk()
@@ -1,86 +1,40 @@
 import os
-import hashlib
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import csv
-import random
+import queue
 import threading
+from virtualtable import VirtualTable
+from searchindex import TrigramIndex
+from resultstore import ScanResultStore
+from profiling import Profiler
+# the engine lives in scanengine.py (no Tk); re-exported for existing imports
+from scanengine import (ENTROPY_MODE, DEFAULT_WORKERS, calculate_entropy, get_risk_level,
+                        hash_file, scan_file, deep_scan)
 
 
 # -------------------------------
-# Risk & Entropy Simulation Utils
-# -------------------------------
-def calculate_entropy(filename):
-    """Fake entropy calculation: random float between 3.5–8.0"""
-    return round(random.uniform(3.5, 8.0), 2)
-
-
-def get_risk_level(entropy, size):
-    """Simulate risk level using entropy and file size."""
-    if entropy > 7 or size > 5_000_000:
-        return "High"
-    elif entropy > 5:
-        return "Medium"
-    else:
-        return "Low"
-
-
-# -------------------------------
-# Hash Utility
-# -------------------------------
-def hash_file(filepath):
-    """Return MD5 hash of a file."""
-    try:
-        with open(filepath, "rb") as f:
-            return hashlib.md5(f.read()).hexdigest()
-    except:
-        return "Error"
-
-
-# -------------------------------
-# Deep Scan Logic
+# Deep Scan UI Frame
 # -------------------------------
-def deep_scan(folder_path, progress_callback, result_callback, complete_callback):
-    scanned_files = []
-    file_list = []
-
-    for root, _, files in os.walk(folder_path):
-        for name in files:
-            file_list.append(os.path.join(root, name))
-
-    total_files = len(file_list)
-    for i, filepath in enumerate(file_list, 1):
-        try:
-            size = os.path.getsize(filepath)
-            entropy = calculate_entropy(filepath)
-            risk = get_risk_level(entropy, size)
-            file_hash = hash_file(filepath)
-
-            scanned_files.append({
-                "filename": os.path.basename(filepath),
-                "size": size,
-                "risk": risk,
-                "entropy": entropy,
-                "hash": file_hash
-            })
-        except Exception as e:
-            print(f"Error scanning {filepath}: {e}")
+RISK_COLORS = {"High": "#ffcccc", "Medium": "#fff2cc", "Low": "#d9ead3"}
+UI_BATCH_SIZE = 500   # max rows inserted per UI tick
+UI_FRAME_MS = 50      # UI tick interval (20 fps)
+FILTER_DEBOUNCE_MS = 150
 
-        progress_callback(i, total_files)
-        result_callback(scanned_files[-1])
 
-    complete_callback(scanned_files)
-
-
-# -------------------------------
-# Deep Scan UI Frame
-# -------------------------------
 class DeepScanPage(ttk.Frame):
     def __init__(self, parent):
         super().__init__(parent)
-        self.scan_results = []
-        self.filtered_results = []
         self.running = False
+        self.profiler = None
+        self.store = ScanResultStore()
+        self.name_index = TrigramIndex()
+        self.filter_job = None
+        # the scan thread only touches these; the UI drains them on a timer
+        self.ui_queue = queue.Queue()
+        self.latest_progress = None
+        self.scan_done = None
+        self.scan_error = None
         self.configure(style="Card.TFrame")
 
         self.create_ui()
@@ -115,7 +69,7 @@ class DeepScanPage(ttk.Frame):
 
         ttk.Label(frame_filter, text="🔍 Filter:").pack(side='left', padx=5)
         self.filter_var = tk.StringVar()
-        self.filter_var.trace("w", self.apply_filter)
+        self.filter_var.trace("w", self.schedule_filter)
         ttk.Entry(frame_filter, textvariable=self.filter_var, width=30).pack(side='left', padx=5)
 
         ttk.Label(frame_filter, text="Sort By:").pack(side='left', padx=10)
@@ -132,13 +86,20 @@ class DeepScanPage(ttk.Frame):
 
         ttk.Button(frame_filter, text="Apply Sort", command=self.apply_sort).pack(side='left', padx=10)
 
-        # --- Treeview (Results Table) ---
+        # --- Results Table (virtualized; rows live in self.scan_results) ---
         columns = ("filename", "size", "risk", "entropy", "hash")
-        self.tree = ttk.Treeview(self, columns=columns, show='headings')
+        self.table = VirtualTable(self, columns,
+                                  values=lambda f: (f["filename"], f["size"], f["risk"],
+                                                    f["entropy"], f["hash"]),
+                                  tags=lambda f: (f["risk"],))
+        self.table.set_store(self.store)
+        self.tree = self.table.tree
         for col in columns:
             self.tree.heading(col, text=col.capitalize())
             self.tree.column(col, width=160)
-        self.tree.pack(fill='both', expand=True, padx=20, pady=10)
+        for risk, color in RISK_COLORS.items():
+            self.tree.tag_configure(risk, background=color)
+        self.table.pack(fill='both', expand=True, padx=20, pady=10)
 
         # --- Export & Summary ---
         frame_bottom = ttk.Frame(self)
@@ -165,59 +126,104 @@ class DeepScanPage(ttk.Frame):
 
         self.running = True
         self.scan_btn.config(state='disabled')
-        self.tree.delete(*self.tree.get_children())
-        self.scan_results.clear()
-
-        threading.Thread(target=deep_scan, args=(
-            folder,
-            self.update_progress,
-            self.add_result_row,
-            self.scan_complete
-        ), daemon=True).start()
+        self.store = ScanResultStore()
+        self.table.set_store(self.store)
+        self.name_index.clear()
+
+        self.ui_queue = queue.Queue()
+        self.latest_progress = None
+        self.scan_done = None
+        self.scan_error = None
+        self.profiler = Profiler("Deep Scan", {"folder": folder, "workers": DEFAULT_WORKERS})
+        threading.Thread(target=self._run_scan, args=(folder,), daemon=True).start()
+        self.after(UI_FRAME_MS, self.drain_ui_queue)
+
+    # --- called from the scan thread: no Tk calls here ---
+    def _run_scan(self, folder):
+        try:
+            deep_scan(folder, self._on_scan_progress, self.ui_queue.put, self._on_scan_done,
+                      store=self.store, profiler=self.profiler)
+        except Exception as e:
+            # still end the run, so the profiler is finished and the page unlocked
+            self.scan_error = e
+            self.scan_done = self.store
+
+    def _on_scan_progress(self, current, total):
+        self.latest_progress = (current, total)
+
+    def _on_scan_done(self, results):
+        self.scan_done = results
+
+    # --- called on the Tk thread ---
+    def drain_ui_queue(self):
+        """Insert up to UI_BATCH_SIZE queued rows and refresh progress once."""
+        done = self.scan_done
+        batch = []
+        for _ in range(UI_BATCH_SIZE):
+            try:
+                batch.append(self.ui_queue.get_nowait())
+            except queue.Empty:
+                break
+        if batch:
+            with self.profiler.phase("ui"):
+                self.add_result_rows(batch)
+
+        if self.latest_progress:
+            self.update_progress(*self.latest_progress)
+
+        if done is not None and self.ui_queue.empty():
+            self.scan_complete(done)
+        else:
+            self.after(UI_FRAME_MS, self.drain_ui_queue)
 
     def update_progress(self, current, total):
         percent = (current / total) * 100
         self.progress_var.set(percent)
-        self.update_idletasks()
+
+    @property
+    def scan_results(self):
+        return self.store
+
+    def add_result_rows(self, rows):
+        """Show ScanRows that the scan thread already appended to the store."""
+        filenames = self.store.filenames
+        for row in rows:
+            self.name_index.add(filenames[row.index])
+        query = self.filter_var.get().lower()
+        self.table.extend_view(row.index for row in rows
+                               if not query or query in filenames[row.index].lower())
 
     def add_result_row(self, file_data):
-        color = {"High": "#ffcccc", "Medium": "#fff2cc", "Low": "#d9ead3"}[file_data["risk"]]
-        self.tree.insert("", "end",
-                         values=(file_data["filename"], file_data["size"], file_data["risk"],
-                                 file_data["entropy"], file_data["hash"]),
-                         tags=(file_data["risk"],))
-        self.tree.tag_configure(file_data["risk"], background=color)
-        self.scan_results.append(file_data)
-        self.filtered_results = self.scan_results
+        self.add_result_rows([file_data])
 
     def scan_complete(self, results):
         self.running = False
         self.scan_btn.config(state='normal')
-        messagebox.showinfo("Scan Complete", f"Scanned {len(results)} files successfully!")
+        report = self.profiler.finish(write=self.scan_error is None)
+        if self.scan_error is not None:
+            messagebox.showerror("Scan Failed", f"The scan stopped after {len(results)} files: "
+                                                f"{self.scan_error}")
+            return
+        messagebox.showinfo("Scan Complete", f"Scanned {len(results)} files successfully!\n"
+                            f"({report['files_per_s']:.0f} files/s, {report['mb_per_s']:.1f} MB/s)")
+
+    def schedule_filter(self, *args):
+        """Debounce keystrokes: filter once typing pauses for FILTER_DEBOUNCE_MS."""
+        if self.filter_job is not None:
+            self.after_cancel(self.filter_job)
+        self.filter_job = self.after(FILTER_DEBOUNCE_MS, self.apply_filter)
 
     def apply_filter(self, *args):
-        query = self.filter_var.get().lower()
-        self.tree.delete(*self.tree.get_children())
-        for item in self.scan_results:
-            if query in item["filename"].lower():
-                self.tree.insert("", "end",
-                                 values=(item["filename"], item["size"], item["risk"],
-                                         item["entropy"], item["hash"]))
-        self.filtered_results = [f for f in self.scan_results if query in f["filename"].lower()]
+        self.filter_job = None
+        self.table.set_view(self.name_index.search(self.filter_var.get()))
 
     def apply_sort(self):
         key = self.sort_key.get()
         reverse = self.sort_order.get() == "desc"
-        self.filtered_results.sort(
-            key=lambda x: x[key] if key != "risk" else {"High": 3, "Medium": 2, "Low": 1}[x["risk"]],
-            reverse=reverse)
-        self.tree.delete(*self.tree.get_children())
-        for f in self.filtered_results:
-            self.tree.insert("", "end",
-                             values=(f["filename"], f["size"], f["risk"], f["entropy"], f["hash"]))
+        self.table.sort_view(self.store.sort_key(key), reverse)
 
     def export_csv(self):
-        if not self.filtered_results:
+        if not len(self.table):
             messagebox.showwarning("Warning", "No data to export!")
             return
         filepath = filedialog.asksaveasfilename(defaultextension=".csv",
@@ -225,15 +231,14 @@ class DeepScanPage(ttk.Frame):
         if not filepath:
             return
         with open(filepath, "w", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=self.filtered_results[0].keys())
+            writer = csv.DictWriter(f, fieldnames=ScanResultStore.FIELDS)
             writer.writeheader()
-            writer.writerows(self.filtered_results)
+            writer.writerows(self.store.record(i) for i in self.table.view)
         messagebox.showinfo("Export Complete", f"Data exported to {filepath}")
 
     def show_summary(self):
-        high = sum(1 for f in self.scan_results if f["risk"] == "High")
-        med = sum(1 for f in self.scan_results if f["risk"] == "Medium")
-        low = sum(1 for f in self.scan_results if f["risk"] == "Low")
+        counts = self.store.risk_counts()
+        high, med, low = counts["High"], counts["Medium"], counts["Low"]
         messagebox.showinfo("AI Summary",
                             f"🧠 AI Summary:\n\nHigh Risk Files: {high}\nMedium Risk Files: {med}\nLow Risk Files: {low}")
 
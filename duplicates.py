@@ -0,0 +1,113 @@
+import os
+import time
+import hashlib
+from hashcache import file_md5
+
+# -------------------- Configuration --------------------
+# Bytes read from the head and from the tail of a file for the partial hash.
+PARTIAL_BLOCK = 64 * 1024
+
+
+# -------------------- Hash Helpers --------------------
+def partial_hash(path, size, block=PARTIAL_BLOCK):
+    """Hash the first and last `block` bytes of a file.
+
+    Files no larger than two blocks are hashed completely (through the
+    hash cache), so for them the result is already the full MD5.
+    """
+    if size <= 2 * block:
+        return file_md5(path)
+    h = hashlib.md5()
+    with open(path, "rb") as f:
+        h.update(f.read(block))
+        f.seek(-block, os.SEEK_END)
+        h.update(f.read(block))
+    return h.hexdigest()
+
+
+# -------------------- Duplicate Engine --------------------
+def group_duplicates(paths, block=PARTIAL_BLOCK, profiler=None):
+    """Return {md5: [paths]} for every set of identical files in `paths`.
+
+    `paths` may hold strings, Paths or walker entries.
+
+    Files are grouped by size first, size collisions are narrowed with a
+    head+tail partial hash, and only the survivors are fully hashed.
+    Paths keep their input order inside a group, groups are ordered by
+    the first path of each group. Unreadable files are skipped.
+
+    A profiling.Profiler receives the "walk", "stat", "partial_hash" and
+    "full_hash" phases and the "files" / "bytes_read" counters (bytes
+    hashed, including files served from the hash cache).
+    """
+    clock = time.perf_counter
+    if profiler is not None:
+        paths = profiler.timed_iter(paths, "walk")
+    by_size = {}
+    order = {}
+    t_stat = 0.0
+    for item in paths:
+        path = os.fspath(item)
+        if path in order:
+            continue
+        t0 = clock()
+        try:
+            # DirEntry / PathEntry items carry a cached stat result
+            size = (item.stat() if hasattr(item, "stat") else os.stat(path)).st_size
+        except OSError:
+            continue
+        finally:
+            t_stat += clock() - t0
+        order[path] = len(order)
+        by_size.setdefault(size, []).append(path)
+    if profiler is not None:
+        profiler.add_time("stat", t_stat, len(order))
+        profiler.count("files", len(order))
+
+    groups = {}
+    for size, candidates in by_size.items():
+        if len(candidates) < 2:
+            continue
+
+        by_partial = {}
+        t0 = clock()
+        for path in candidates:
+            try:
+                by_partial.setdefault(partial_hash(path, size, block), []).append(path)
+            except OSError:
+                continue
+        if profiler is not None:
+            profiler.add_time("partial_hash", clock() - t0, len(candidates))
+            profiler.count("bytes_read", len(candidates) * min(size, 2 * block))
+
+        for key, survivors in by_partial.items():
+            if len(survivors) < 2:
+                continue
+            if size <= 2 * block:
+                # partial hash covered the whole file
+                groups.setdefault(key, []).extend(survivors)
+                continue
+            t0 = clock()
+            for path in survivors:
+                try:
+                    groups.setdefault(file_md5(path), []).append(path)
+                except OSError:
+                    continue
+            if profiler is not None:
+                profiler.add_time("full_hash", clock() - t0, len(survivors))
+                profiler.count("bytes_read", len(survivors) * size)
+
+    dupes = {h: sorted(p, key=order.get) for h, p in groups.items() if len(p) > 1}
+    return dict(sorted(dupes.items(), key=lambda kv: order[kv[1][0]]))
+
+
+def find_duplicates(paths, block=PARTIAL_BLOCK, profiler=None):
+    """Return a list of (duplicate, original) path pairs.
+
+    The original is the first path of its group in input order.
+    """
+    pairs = []
+    for group in group_duplicates(paths, block, profiler).values():
+        original = group[0]
+        pairs.extend((dup, original) for dup in group[1:])
+    return pairs
@@ -0,0 +1,96 @@
+import os
+import math
+from collections import Counter
+
+from hashcache import read_chunks, READ_BLOCK
+
+try:
+    import numpy as np
+except ImportError:  # optional, only speeds up the histogram
+    np = None
+
+# -------------------- Configuration --------------------
+ENTROPY_MODES = ("full", "headtail", "stride")
+DEFAULT_MODE = "headtail"
+# Upper bound on bytes read by the sampling modes.
+DEFAULT_SAMPLE_BYTES = 1024 * 1024
+STRIDE_WINDOW = 64 * 1024
+
+
+# -------------------- Byte Histogram --------------------
+class ByteHistogram:
+    """Running count of byte values fed through update()."""
+
+    def __init__(self):
+        self.counts = np.zeros(256, dtype=np.int64) if np is not None else Counter()
+        self.total = 0
+
+    def update(self, chunk):
+        if not chunk:
+            return
+        if np is not None:
+            self.counts += np.bincount(np.frombuffer(chunk, dtype=np.uint8), minlength=256)
+        else:
+            self.counts.update(chunk)
+        self.total += len(chunk)
+
+    def entropy(self):
+        """Shannon entropy in bits per byte (0.0 – 8.0)."""
+        values = self.counts.tolist() if np is not None else self.counts.values()
+        return shannon_entropy(values, self.total)
+
+
+def shannon_entropy(counts, total):
+    if not total:
+        return 0.0
+    result = 0.0
+    for c in counts:
+        if c:
+            p = c / total
+            result -= p * math.log2(p)
+    return result
+
+
+# -------------------- Sampling --------------------
+def sample_ranges(size, mode=DEFAULT_MODE, sample_bytes=DEFAULT_SAMPLE_BYTES):
+    """Return the (offset, length) ranges of a file read by `mode`.
+
+    "full" covers the whole file, "headtail" the first and last
+    sample_bytes/2, "stride" evenly spaced windows adding up to at most
+    sample_bytes. Small files are always read completely.
+    """
+    if mode not in ENTROPY_MODES:
+        raise ValueError(f"Unknown entropy mode: {mode}")
+    if mode == "full" or size <= sample_bytes:
+        return [(0, size)] if size else []
+    if mode == "headtail":
+        half = sample_bytes // 2
+        return [(0, half), (size - half, half)]
+    # at least two windows, so the samples always reach the end of the file
+    window = max(1, min(STRIDE_WINDOW, sample_bytes // 2))
+    count = max(2, sample_bytes // window)
+    step = (size - window) / max(1, count - 1)
+    return [(int(i * step), window) for i in range(count)]
+
+
+def file_entropy(path, mode=DEFAULT_MODE, sample_bytes=DEFAULT_SAMPLE_BYTES):
+    """Shannon entropy of a file's bytes, reading at most what `mode` allows."""
+    hist = ByteHistogram()
+    if mode == "full":
+        for chunk in read_chunks(path):
+            hist.update(chunk)
+        return hist.entropy()
+
+    size = os.path.getsize(path)
+    buf = bytearray(min(READ_BLOCK, max(1, sample_bytes)))
+    view = memoryview(buf)
+    with open(path, "rb", buffering=0) as f:
+        for offset, length in sample_ranges(size, mode, sample_bytes):
+            f.seek(offset)
+            while length > 0:
+                n = f.readinto(view[:min(length, len(buf))])
+                if not n:
+                    break
+                hist.update(view[:n])
+                length -= n
+    return hist.entropy()
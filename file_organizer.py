@@ -1,11 +1,19 @@
 import os
-import shutil
 from pathlib import Path
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
-import hashlib
 import json
 import customtkinter as ctk
+from duplicates import find_duplicates
+from hashcache import file_md5
+from walker import iter_files
+from jobpanel import JobPanel, run_in_background
+from mover import MoveEngine
+from nameindex import NameIndex
+from categories import get_engine
+from journal import get_journal, rollback_job
+from organize import organize_job
+from profiling import Profiler
 
 
 # --------------------------
@@ -15,46 +23,39 @@ class FileOrganizerPage(ctk.CTkFrame):
     def __init__(self, parent):
         super().__init__(parent)
         import json
-        import hashlib
-        import shutil
         from pathlib import Path
 
         # -------------------- Configuration --------------------
-        self.CATEGORIES = {
-            "Documents": [".pdf", ".docx", ".txt", ".pptx", ".xlsx", ".csv"],
-            "Images": [".jpg", ".jpeg", ".png", ".gif", ".bmp", ".tiff"],
-            "Videos": [".mp4", ".mkv", ".avi", ".mov"],
-            "Music": [".mp3", ".wav", ".flac"],
-            "Archives": [".zip", ".rar", ".7z", ".tar", ".gz"],
-            "Programs": [".exe", ".msi", ".bat", ".sh"],
-        }
-        self.UNDO_LOG_FILE = "undo_log.json"
+        # shared with File Manager Pro; user rules come from ~/.dmanager/categories.json
+        self.categories = get_engine()
+        self.UNDO_LOG_FILE = "undo_log.json"  # pre-journal format, still honoured by undo
+        self.JOURNAL_OWNER = "organizer"
 
         self.sources = []
         self.target_folder = ""
-        self.undo_log = []
+        self.journal = get_journal()
+        self.tx = None
+        self.profiler = None
+        self.engine = MoveEngine()
 
         self.subfolders_var = tk.IntVar(value=1)
 
         self.create_ui()
+        self.after(500, self.check_interrupted)
 
     # -------------------- Helper Functions --------------------
     def hash_file(self, file_path):
-        h = hashlib.md5()
-        with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                h.update(chunk)
-        return h.hexdigest()
-
-    def move_file(self, src, dst):
-        dst_path = Path(dst)
-        if dst_path.exists():
-            base, ext = dst_path.stem, dst_path.suffix
-            counter = 1
-            while dst_path.exists():
-                dst_path = dst_path.with_name(f"{base}({counter}){ext}")
-                counter += 1
-        shutil.move(src, dst_path)
+        return file_md5(file_path)
+
+    def move_file(self, src, dst, names=None):
+        # `names` is the batch's NameIndex; a one-off move gets a fresh one
+        names = names or NameIndex()
+        dst_path = names.reserve(dst)
+        try:
+            self.engine.move(src, dst_path)
+        except Exception:
+            names.discard(dst_path)
+            raise
         return str(dst_path)
 
     def add_folder(self, folder_path):
@@ -101,41 +102,20 @@ class FileOrganizerPage(ctk.CTkFrame):
 
     def preview_files(self):
         self.preview_listbox.delete(0, tk.END)
-        files = []
-        for path in self.sources:
-            p = Path(path)
-            if p.is_dir():
-                for f in p.rglob("*"):
-                    if f.is_file():
-                        files.append(str(f))
-            elif p.is_file():
-                files.append(str(p))
-        for f in files:
-            self.preview_listbox.insert(tk.END, f)
-        messagebox.showinfo("Preview", f"{len(files)} files detected for organization.")
+        count = 0
+        for entry in iter_files(self.sources):
+            self.preview_listbox.insert(tk.END, entry.path)
+            count += 1
+        messagebox.showinfo("Preview", f"{count} files detected for organization.")
 
     def detect_duplicates(self):
-        file_hashes = {}
-        duplicates = []
-        for path in self.sources:
-            p = Path(path)
-            if p.is_dir():
-                for f in p.rglob("*"):
-                    if f.is_file():
-                        h = self.hash_file(f)
-                        if h in file_hashes:
-                            duplicates.append((str(f), file_hashes[h]))
-                        else:
-                            file_hashes[h] = str(f)
-            elif p.is_file():
-                h = self.hash_file(p)
-                if h in file_hashes:
-                    duplicates.append((str(p), file_hashes[h]))
-                else:
-                    file_hashes[h] = str(p)
-        return duplicates
-
-    def organize_files(self):
+        profiler = Profiler("Duplicates", {"sources": self.sources})
+        try:
+            return find_duplicates(iter_files(self.sources), profiler=profiler)
+        finally:
+            profiler.finish()
+
+    def organize_files(self, resume_tx=None):
         if not self.target_folder:
             messagebox.showerror("Error", "Target folder not set!")
             return
@@ -143,51 +123,129 @@ class FileOrganizerPage(ctk.CTkFrame):
             messagebox.showerror("Error", "No source files/folders selected!")
             return
 
-        self.undo_log = []
-        for path in self.sources:
-            p = Path(path)
-            if p.is_dir():
-                for f in p.rglob("*"):
-                    if f.is_file():
-                        self._move_file(f)
-            elif p.is_file():
-                self._move_file(p)
+        if self.job_panel.busy:
+            messagebox.showwarning("Organize", "An operation is already running.")
+            return
 
-        with open(self.UNDO_LOG_FILE, "w") as f:
-            json.dump(self.undo_log, f, indent=2)
+        # Tk variables must not be read from the worker thread
+        use_subfolders = bool(self.subfolders_var.get())
+        self.profiler = Profiler("Organize", {"sources": self.sources, "target": self.target_folder,
+                                              "workers": self.engine.max_transfers})
+        job = organize_job(self.sources, self.target_folder, self.engine, self.journal,
+                           self.JOURNAL_OWNER, subfolders=use_subfolders, profiler=self.profiler,
+                           resume=resume_tx)
+        self.tx = job.tx
+        self.job_panel.run(job, on_done=self._organize_done)
+
+    def _organize_done(self, result):
+        self.tx = None
+        self.profiler.meta["cancelled"] = result.cancelled
+        self.profiler.finish()
 
         self.preview_listbox.delete(0, tk.END)
-        messagebox.showinfo("Organize", f"Files organized successfully! ({len(self.undo_log)} files moved)")
-
-    def _move_file(self, file_path):
-        target = Path(self.target_folder)
-        category_folder = None
-        if self.subfolders_var.get():
-            for cat, exts in self.CATEGORIES.items():
-                if file_path.suffix.lower() in exts:
-                    category_folder = target / cat
-                    category_folder.mkdir(exist_ok=True)
-                    break
-            if not category_folder:
-                category_folder = target / "Others"
-                category_folder.mkdir(exist_ok=True)
-        dst = category_folder / file_path.name if category_folder else target / file_path.name
-        new_dst = self.move_file(file_path, dst)
-        self.undo_log.append({"src": new_dst, "dst": str(file_path)})
+        failed = f", {result.errors} failed" if result.errors else ""
+        if result.cancelled:
+            messagebox.showinfo("Organize", f"Organize cancelled. ({result.done} files moved{failed})")
+        elif result.errors:
+            messagebox.showwarning("Organize", f"Organize finished with errors. "
+                                               f"({result.done} files moved{failed})")
+        else:
+            messagebox.showinfo("Organize", f"Files organized successfully! ({result.done} files moved)")
+
+    # -------------------- Undo / Recovery --------------------
+    def _last_transaction(self):
+        for tx in reversed(self.journal.transactions(self.JOURNAL_OWNER)):
+            if tx.live > 0:
+                return tx
+        return None
 
     def undo(self):
-        if not Path(self.UNDO_LOG_FILE).exists():
-            messagebox.showinfo("Undo", "No undo log found!")
+        if self.job_panel.busy:
+            messagebox.showwarning("Undo", "An operation is already running.")
+            return
+        # reading the journal can take a while: off the Tk thread
+        run_in_background(self, self._last_transaction, self._undo_transaction)
+
+    def _undo_transaction(self, tx):
+        if self.job_panel.busy:
             return
+        if tx is None:
+            if Path(self.UNDO_LOG_FILE).exists():
+                self._undo_legacy_log()
+            else:
+                messagebox.showinfo("Undo", "Nothing to undo!")
+            return
+        self.rollback(tx)
+
+    def rollback(self, tx):
+        """Move every completed step of `tx` back as a background job."""
+        def done(result):
+            self.journal.flush()
+            messagebox.showinfo("Undo", f"Undo completed! ({result.done} files restored"
+                                + (f", {result.errors} failed)" if result.errors else ")"))
+
+        self.job_panel.run(rollback_job(self.journal, tx.id, self.engine), on_done=done)
+
+    def _undo_legacy_log(self):
         with open(self.UNDO_LOG_FILE, "r") as f:
-            self.undo_log = json.load(f)
-        for move in reversed(self.undo_log):
+            undo_log = json.load(f)
+        names = NameIndex()
+        for move in reversed(undo_log):
             src = move["src"]
             dst = move["dst"]
             if Path(src).exists():
-                self.move_file(src, dst)
+                self.move_file(src, dst, names)
         os.remove(self.UNDO_LOG_FILE)
-        messagebox.showinfo("Undo", f"Undo completed! ({len(self.undo_log)} files restored)")
+        messagebox.showinfo("Undo", f"Undo completed! ({len(undo_log)} files restored)")
+
+    def check_interrupted(self):
+        """Offer to resume or roll back an organize cut short by a crash."""
+        if self.job_panel.busy:
+            return
+        # incomplete() leaves out transactions begun by this process, so an
+        # organize started in the meantime is never taken for an interrupted one
+        run_in_background(self, lambda: self.journal.incomplete(self.JOURNAL_OWNER),
+                          self._offer_recovery)
+
+    def _offer_recovery(self, interrupted):
+        # nothing is settled before the user answers: steps still pending are
+        # resolved from disk by the chosen action
+        if self.job_panel.busy:
+            return
+        for tx in interrupted:
+            answer = messagebox.askyesnocancel(
+                "Interrupted Organize",
+                f"An organize into {tx.meta.get('target', '?')} was interrupted "
+                f"after {tx.live} files.\n\nYes: resume it\nNo: roll it back\n"
+                f"Cancel: keep the files where they are")
+            if answer is None:
+                self._keep_interrupted(tx)
+            elif answer:
+                self.clear_sources()
+                for src in tx.meta.get("sources", []):
+                    if Path(src).is_dir():
+                        self.add_folder(src)
+                    else:
+                        self.add_file(src)
+                self.set_target(tx.meta.get("target", ""))
+                self.subfolders_var.set(1 if tx.meta.get("subfolders", True) else 0)
+                # partial copies are removed before the walk starts again
+                run_in_background(self, lambda: self.journal.settle(tx.id),
+                                  lambda settled: self.organize_files(resume_tx=tx.id))
+                return
+            else:
+                # rollback_job settles the pending steps first
+                self.journal.end(tx.id, "cancelled")
+                self.rollback(tx)
+                return
+
+    def _keep_interrupted(self, tx):
+        def close():
+            # worker thread: resolve pending steps from disk, then close the transaction
+            self.journal.settle(tx.id)
+            self.journal.end(tx.id, "cancelled")
+
+        run_in_background(self, close, lambda result: None)
 
     def show_duplicates(self):
         duplicates = self.detect_duplicates()
@@ -237,6 +295,10 @@ class FileOrganizerPage(ctk.CTkFrame):
         ctk.CTkButton(action_frame, text="Organize Files", command=self.organize_files).pack(side="left", padx=5)
         ctk.CTkButton(action_frame, text="Undo Last Operation", command=self.undo).pack(side="left", padx=5)
 
+        # Background job progress
+        self.job_panel = JobPanel(self)
+        self.job_panel.pack(fill="x", padx=20, pady=5)
+
         # Preview List
         preview_frame = ctk.CTkFrame(self, fg_color="#2a2a2a", corner_radius=0)
         preview_frame.pack(fill="both", expand=True, padx=20, pady=10)
@@ -2,11 +2,22 @@
 import os
 import sys
 import time
-import shutil
-import hashlib
+from collections import namedtuple
 from pathlib import Path
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, simpledialog
+from duplicates import group_duplicates
+from hashcache import file_md5
+from virtualtable import VirtualTable
+from walker import iter_files
+from jobs import Job
+from jobpanel import JobPanel, run_in_background
+from mover import MoveEngine
+from nameindex import NameIndex
+from categories import get_engine, FOLDER_CATEGORY
+from journal import get_journal, rollback_job, apply_step
+from organize import organize_job
+from profiling import Profiler
 
 # -------------------- Helpers --------------------
 def human_size(n):
@@ -33,33 +44,37 @@ def list_drives():
         drives = [str(Path.home())]
     return drives
 
-def md5_for_file(path, block_size=65536):
-    h = hashlib.md5()
+def md5_for_file(path):
+    # goes through the shared hash cache, so unchanged files are not re-read
     try:
-        with open(path, "rb") as f:
-            for block in iter(lambda: f.read(block_size), b""):
-                h.update(block)
-        return h.hexdigest()
+        return file_md5(path)
     except Exception:
         return None
 
-# mapping of categories -> extensions (lowercase)
-CATEGORY_EXT = {
-    "Images": {".png", ".jpg", ".jpeg", ".gif", ".bmp", ".tiff", ".webp", ".svg"},
-    "Videos": {".mp4", ".mkv", ".mov", ".avi", ".flv", ".wmv", ".webm"},
-    "Documents": {".pdf", ".doc", ".docx", ".xls", ".xlsx", ".ppt", ".pptx", ".txt", ".md", ".odt"},
-    "Archives": {".zip", ".rar", ".7z", ".tar", ".gz", ".bz2"},
-    "Music": {".mp3", ".wav", ".aac", ".flac", ".m4a", ".ogg"},
-}
-
-def categorize_path(p: Path):
-    if p.is_dir():
-        return "Folders"
-    ext = p.suffix.lower()
-    for cat, exts in CATEGORY_EXT.items():
-        if ext in exts:
-            return cat
-    return "Files"
+# files that match no category rule
+FILES_CATEGORY = "Files"
+
+JOURNAL_OWNER = "filemanagerpro"
+HISTORY_LIMIT = 50  # operations listed in the undo history
+
+# renamed copies look like "name (1).ext"
+UNIQUE_PATTERN = "{stem} ({n}){ext}"
+
+# one row of the directory listing (size is None for folders)
+DirEntryRow = namedtuple("DirEntryRow", "name type size mtime path category")
+
+
+def entry_values(row):
+    size = "" if row.size is None else human_size(row.size)
+    mtime = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(row.mtime))
+    return (row.name, row.type, size, mtime)
+
+
+def categorize_path(p: Path, is_dir=None):
+    # pass is_dir when already known to skip the stat
+    if is_dir is None:
+        is_dir = p.is_dir()
+    return get_engine().classify(p.name, is_dir, FILES_CATEGORY)
 
 # -------------------- FileManagerPro Page --------------------
 class FileManagerProPage(ttk.Frame):
@@ -72,8 +87,9 @@ class FileManagerProPage(ttk.Frame):
 
         # sources stored as list of Path strings
         self.sources = []
-        # undo stack: list of ops to reverse. Each op is dict: {"type":"move"/"copy", "src":Path, "dst":Path}
-        self.undo_stack = []
+        # undo history lives in the journal: one transaction per organize / move / upload
+        self.journal = get_journal()
+        self.engine = MoveEngine()
 
         self._build_ui()
         self._populate_drives()
@@ -122,11 +138,12 @@ class FileManagerProPage(ttk.Frame):
         self.target_entry.pack(side="left", padx=5)
         ttk.Button(tgt_frame, text="Browse Target", command=self.browse_target).pack(side="left", padx=5)
         ttk.Button(tgt_frame, text="Undo Last Operation", command=self.undo_last).pack(side="left", padx=5)
+        ttk.Button(tgt_frame, text="History", command=self.show_history).pack(side="left", padx=5)
 
         # Categories
         cat_frame = ttk.LabelFrame(self, text="Categories")
         cat_frame.pack(fill="x", padx=5, pady=5)
-        cats = ["All", "Images", "Videos", "Documents", "Archives", "Music", "Folders", "Files"]
+        cats = ["All", *get_engine().categories, FOLDER_CATEGORY, FILES_CATEGORY]
         for c in cats:
             ttk.Radiobutton(cat_frame, text=c, value=c, variable=self.cat_var, command=self.on_category_change).pack(side="left", padx=5, pady=2)
 
@@ -135,12 +152,15 @@ class FileManagerProPage(ttk.Frame):
         tree_frame.pack(fill="both", expand=True, padx=5, pady=5)
 
         cols = ("Name", "Type", "Size", "Modified")
-        self.tree = ttk.Treeview(tree_frame, columns=cols, show="headings", selectmode="extended")
+        # virtualized: only the visible rows exist as Treeview items
+        self.table = VirtualTable(tree_frame, cols, values=entry_values)
+        self.tree = self.table.tree
+        self.sort_state = ("Name", False)
         for c in cols:
-            self.tree.heading(c, text=c)
+            self.tree.heading(c, text=c, command=lambda col=c: self.sort_by(col))
             # adjust widths a bit
             self.tree.column(c, width=200 if c=="Name" else 120)
-        self.tree.pack(fill="both", expand=True)
+        self.table.pack(fill="both", expand=True)
         self.tree.bind("<Double-1>", self.on_item_open)
 
         # Bottom Buttons
@@ -152,6 +172,10 @@ class FileManagerProPage(ttk.Frame):
                           ("Preview Selected", self.preview_selected)]:
             ttk.Button(bottom_frame, text=text, command=cmd).pack(side="left", padx=5)
 
+        # Background job progress (organize / move / upload)
+        self.job_panel = JobPanel(self)
+        self.job_panel.pack(fill="x", padx=5, pady=2)
+
         # Info
         info_frame = ttk.Frame(self)
         info_frame.pack(fill="x", padx=5, pady=5)
@@ -190,30 +214,58 @@ class FileManagerProPage(ttk.Frame):
 
     def _populate_tree(self):
         try:
-            self.tree.delete(*self.tree.get_children())
-            items = sorted(self.current_path.iterdir(), key=lambda x: (not x.is_dir(), x.name.lower()))
-            filter_cat = self.cat_var.get()
-            count = 0
-            for e in items:
-                cat = categorize_path(e)
-                if filter_cat != "All" and cat != filter_cat:
-                    continue
-                typ = "Folder" if e.is_dir() else e.suffix
-                size = "" if e.is_dir() else human_size(e.stat().st_size)
-                mtime = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(e.stat().st_mtime))
-                self.tree.insert("", "end", values=(e.name, typ, size, mtime), iid=str(e))
-                count += 1
-            self.info_var.set(f"{count} items in {self.current_path}")
+            entries = []
+            # scandir entries cache is_dir(); one stat per entry for size/mtime
+            with os.scandir(self.current_path) as it:
+                for e in it:
+                    try:
+                        is_dir = e.is_dir()
+                        st = e.stat()
+                    except OSError:
+                        continue
+                    ext = os.path.splitext(e.name)[1]
+                    entries.append(DirEntryRow(
+                        e.name,
+                        "Folder" if is_dir else ext,
+                        None if is_dir else st.st_size,
+                        st.st_mtime,
+                        e.path,
+                        get_engine().classify(e.name, is_dir, FILES_CATEGORY),
+                    ))
+            self.table.set_rows(entries)
+            self._apply_category_filter()
         except Exception as e:
             messagebox.showerror("Error", str(e))
 
+    def _apply_category_filter(self):
+        filter_cat = self.cat_var.get()
+        if filter_cat == "All":
+            self.table.set_view(range(len(self.table.rows)))
+        else:
+            self.table.filter(lambda r: r.category == filter_cat)
+        self.sort_by(*self.sort_state)
+        self.info_var.set(f"{len(self.table)} items in {self.current_path}")
+
+    def sort_by(self, col, reverse=None):
+        """Sort the listing by a column (folders first); clicking again reverses."""
+        if reverse is None:
+            reverse = not self.sort_state[1] if self.sort_state[0] == col else False
+        self.sort_state = (col, reverse)
+        field = {"Name": lambda r: r.name.lower(),
+                 "Type": lambda r: r.type.lower(),
+                 "Size": lambda r: r.size or 0,
+                 "Modified": lambda r: r.mtime}[col]
+        self.table.sort(field, reverse)
+        # keep folders on top whatever the direction
+        self.table.sort(lambda r: r.size is not None)
+
     def on_category_change(self):
-        self._populate_tree()
+        self._apply_category_filter()
 
     def on_item_open(self, event=None):
-        sel = self.tree.focus()
-        if sel:
-            p = Path(sel)
+        row = self.table.focused_row()
+        if row:
+            p = Path(row.path)
             if p.is_dir():
                 self.change_directory(p)
             else:
@@ -257,25 +309,13 @@ class FileManagerProPage(ttk.Frame):
         if not self.sources:
             messagebox.showinfo("Info", "No sources added.")
             return
-        # gather files
-        file_map = {}  # md5 -> list of paths
-        total = 0
-        for s in list(self.sources):
-            p = Path(s)
-            if p.is_dir():
-                for root, _, files in os.walk(p):
-                    for fname in files:
-                        fpath = Path(root) / fname
-                        total += 1
-                        h = md5_for_file(fpath)
-                        if h:
-                            file_map.setdefault(h, []).append(str(fpath))
-            elif p.is_file():
-                total += 1
-                h = md5_for_file(p)
-                if h:
-                    file_map.setdefault(h, []).append(str(p))
-        duplicates = {k:v for k,v in file_map.items() if len(v) > 1}
+        profiler = Profiler("Duplicates", {"sources": self.sources})
+        try:
+            # group_duplicates times the walk itself ("walk" phase)
+            duplicates = group_duplicates(iter_files(self.sources), profiler=profiler)
+        finally:
+            report = profiler.finish()
+        total = report["counters"].get("files", 0)
         if not duplicates:
             messagebox.showinfo("Duplicates", f"No duplicates found in {len(self.sources)} sources ({total} files scanned).")
             return
@@ -320,41 +360,23 @@ class FileManagerProPage(ttk.Frame):
             messagebox.showinfo("Info", "No sources to organize.")
             return
 
-        moved = 0
-        for s in list(self.sources):
-            p = Path(s)
-            if p.is_dir():
-                for root, _, files in os.walk(p):
-                    for fname in files:
-                        src = Path(root) / fname
-                        cat = categorize_path(src)
-                        dest_dir = Path(target) / cat
-                        dest_dir.mkdir(parents=True, exist_ok=True)
-                        dst = dest_dir / src.name
-                        # avoid overwrite: if exists, rename
-                        dst = self._unique_path(dst)
-                        try:
-                            shutil.move(str(src), str(dst))
-                            self.undo_stack.append({"type":"move", "src":dst, "dst":src})  # to undo, move back
-                            moved += 1
-                        except Exception as e:
-                            print("organize move error:", e)
-            elif p.is_file():
-                cat = categorize_path(p)
-                dest_dir = Path(target) / cat
-                dest_dir.mkdir(parents=True, exist_ok=True)
-                dst = dest_dir / p.name
-                dst = self._unique_path(dst)
-                try:
-                    shutil.move(str(p), str(dst))
-                    self.undo_stack.append({"type":"move", "src":dst, "dst":p})
-                    moved += 1
-                except Exception as e:
-                    print("organize move error:", e)
-
-        messagebox.showinfo("Organize", f"Organized {moved} files into {target} (by category).")
-        # refresh tree (if current path changed by moves)
-        self._populate_tree()
+        if not self._job_idle():
+            return
+
+        profiler = Profiler("Organize", {"sources": self.sources, "target": target,
+                                         "workers": self.engine.max_transfers})
+        job = organize_job(self.sources, target, self.engine, self.journal, JOURNAL_OWNER,
+                           profiler=profiler, pattern=UNIQUE_PATTERN, default=FILES_CATEGORY)
+
+        def done(result):
+            profiler.meta["cancelled"] = result.cancelled
+            profiler.finish()
+            messagebox.showinfo("Organize", f"Organized {result.done} files into {target} (by category)"
+                                + (f", {result.errors} failed." if result.errors else "."))
+            # refresh tree (if current path changed by moves)
+            self._populate_tree()
+
+        self.job_panel.run(job, done)
 
     def browse_target(self):
         d = filedialog.askdirectory(title="Select target folder")
@@ -363,49 +385,92 @@ class FileManagerProPage(ttk.Frame):
             self.target_entry.insert(0, str(Path(d)))
 
     def undo_last(self):
-        if not self.undo_stack:
+        # reading the journal can take a while: off the Tk thread
+        run_in_background(self, self._undo_history, self._undo_latest)
+
+    def _undo_latest(self, history):
+        if not history:
             messagebox.showinfo("Undo", "No operations to undo.")
             return
-        op = self.undo_stack.pop()
-        try:
-            if op["type"] == "move":
-                # op stored as {"type":"move","src":dstPathAfterMove,"dst":originalSrcPath}
-                src = Path(op["src"])
-                dst = Path(op["dst"])
-                # if the original parent doesn't exist, create it
-                dst.parent.mkdir(parents=True, exist_ok=True)
-                shutil.move(str(src), str(dst))
-                messagebox.showinfo("Undo", f"Moved back {src} -> {dst}")
-            elif op["type"] == "copy":
-                # delete the copied file
-                src = Path(op["src"])
-                if src.exists():
-                    src.unlink()
-                    messagebox.showinfo("Undo", f"Removed copied file {src}")
-            else:
-                messagebox.showinfo("Undo", "Unknown operation to undo.")
-        except Exception as e:
-            messagebox.showerror("Undo Error", str(e))
-        finally:
+        self.undo_operation(history[0])
+
+    def undo_operation(self, tx):
+        """Revert a whole organize / move / upload in the background."""
+        if not self._job_idle():
+            return
+        if tx.ended is None:
+            # interrupted (crash): rollback_job settles its pending steps first
+            self.journal.end(tx.id, "cancelled")
+
+        def done(result):
+            self.journal.flush()
+            messagebox.showinfo("Undo", f"Undid {tx.name}: {result.done} items restored"
+                                + (f", {result.errors} failed" if result.errors else ""))
             self._populate_tree()
 
+        self.job_panel.run(rollback_job(self.journal, tx.id, self.engine, UNIQUE_PATTERN), done)
+
+    def _undo_history(self):
+        # newest first, only operations that still have something to undo
+        txs = [tx for tx in self.journal.transactions(JOURNAL_OWNER) if tx.live > 0]
+        return txs[::-1][:HISTORY_LIMIT]
+
+    def show_history(self):
+        run_in_background(self, self._undo_history, self._show_history)
+
+    def _show_history(self, history):
+        d = tk.Toplevel(self)
+        d.title("Operation History")
+        cols = ("time", "operation", "items", "target", "state")
+        tree = ttk.Treeview(d, columns=cols, show="headings", height=15)
+        for c, w in zip(cols, (140, 90, 70, 360, 80)):
+            tree.heading(c, text=c.capitalize())
+            tree.column(c, width=w, anchor="w")
+        tree.pack(fill="both", expand=True, padx=5, pady=5)
+        for i, tx in enumerate(history):
+            started = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(tx.started))
+            tree.insert("", "end", iid=str(i), values=(
+                started, tx.name, tx.live, tx.meta.get("target", ""), tx.ended or "interrupted"))
+
+        def undo_selected():
+            sel = tree.selection()
+            if not sel:
+                return
+            d.destroy()
+            self.undo_operation(history[int(sel[0])])
+
+        btns = ttk.Frame(d)
+        btns.pack(fill="x", padx=5, pady=5)
+        ttk.Button(btns, text="Undo Selected", command=undo_selected).pack(side="left", padx=5)
+        ttk.Button(btns, text="Close", command=d.destroy).pack(side="right", padx=5)
+
     def upload_here(self):
         files = filedialog.askopenfilenames(title="Select file(s) to upload into current folder")
         if not files:
             return
-        copied = 0
-        for f in files:
+        if not self._job_idle():
+            return
+        dest = self.current_path
+        names = NameIndex(UNIQUE_PATTERN)
+        tx = self.journal.begin("Upload", JOURNAL_OWNER, {"target": str(dest)})
+
+        def plan_one(f):
             src = Path(f)
-            dst = self.current_path / src.name
-            dst = self._unique_path(dst)
-            try:
-                shutil.copy2(str(src), str(dst))
-                self.undo_stack.append({"type":"copy", "src":dst})
-                copied += 1
-            except Exception as e:
-                print("upload error:", e)
-        messagebox.showinfo("Upload", f"Copied {copied} files to {self.current_path}")
-        self._populate_tree()
+            dst = names.reserve(dest / src.name)
+            return src, dst
+
+        def upload_one(plan):
+            return apply_step(self.journal, tx, "copy", *plan, self.engine, names=names)
+
+        def done(result):
+            self.journal.end(tx, "cancelled" if result.cancelled else "commit")
+            messagebox.showinfo("Upload", f"Copied {result.done} files to {dest}"
+                                + (f", {result.errors} failed" if result.errors else ""))
+            self._populate_tree()
+
+        job = Job("Upload", list(files), upload_one, total=len(files),
+                  workers=self.engine.max_transfers, prepare=plan_one)
+        self.job_panel.run(job, done)
 
     def create_folder(self):
         name = simpledialog.askstring("Create folder", "Enter new folder name:", parent=self)
@@ -425,37 +490,45 @@ class FileManagerProPage(ttk.Frame):
         target = self._get_target_folder()
         if not target:
             return
-        sel = self.tree.selection()
+        sel = self.table.selected_rows()
         if not sel:
             messagebox.showinfo("Move", "No items selected.")
             return
-        moved = 0
-        for item_iid in sel:
-            src = Path(item_iid)
+        if not self._job_idle():
+            return
+
+        names = NameIndex(UNIQUE_PATTERN)
+        tx = self.journal.begin("Move", JOURNAL_OWNER, {"target": target})
+
+        def plan_one(row):
+            src = Path(row.path)
             if not src.exists():
-                continue
-            dst = Path(target) / src.name
-            dst = self._unique_path(dst)
-            try:
-                if src.is_dir():
-                    shutil.move(str(src), str(dst))
-                else:
-                    shutil.move(str(src), str(dst))
-                # store undo as moving back
-                self.undo_stack.append({"type":"move", "src":dst, "dst":src})
-                moved += 1
-            except Exception as e:
-                print("move_selected error:", e)
-        messagebox.showinfo("Move", f"Moved {moved} items to {target}")
-        self._populate_tree()
+                return None
+            dst = names.reserve(Path(target) / src.name)
+            return src, dst
+
+        def move_one(plan):
+            if plan is None:
+                return 0
+            return apply_step(self.journal, tx, "move", *plan, self.engine, names=names)
+
+        def done(result):
+            self.journal.end(tx, "cancelled" if result.cancelled else "commit")
+            messagebox.showinfo("Move", f"Moved {result.done} items to {target}"
+                                + (f", {result.errors} failed" if result.errors else ""))
+            self._populate_tree()
+
+        job = Job("Move", sel, move_one, total=len(sel),
+                  workers=self.engine.max_transfers, prepare=plan_one)
+        self.job_panel.run(job, done)
 
     def preview_selected(self):
-        sel = self.tree.selection()
+        sel = self.table.selected_rows()
         if not sel:
             messagebox.showinfo("Preview", "No item selected.")
             return
         # preview first selected
-        p = Path(sel[0])
+        p = Path(sel[0].path)
         if not p.exists():
             messagebox.showwarning("Preview", "Selected item does not exist.")
             return
@@ -490,21 +563,11 @@ class FileManagerProPage(ttk.Frame):
                 return None
         return str(tp)
 
-    def _unique_path(self, path: Path) -> Path:
-        # If path exists, append suffix like (1), (2)...
-        p = Path(path)
-        if not p.exists():
-            return p
-        base = p.stem
-        suffix = p.suffix
-        parent = p.parent
-        i = 1
-        while True:
-            new_name = f"{base} ({i}){suffix}"
-            cand = parent / new_name
-            if not cand.exists():
-                return cand
-            i += 1
+    def _job_idle(self):
+        if self.job_panel.busy:
+            messagebox.showwarning("Busy", "Another operation is still running.")
+            return False
+        return True
 
     def _open_with_default(self, p: Path):
         try:
@@ -0,0 +1,273 @@
+import os
+import time
+import atexit
+import hashlib
+import mmap
+import sqlite3
+import threading
+from pathlib import Path
+
+# -------------------- Configuration --------------------
+DEFAULT_CACHE_PATH = Path.home() / ".dmanager" / "hash_cache.db"
+DEFAULT_MAX_ENTRIES = 500_000
+READ_BLOCK = 1024 * 1024
+COMMIT_EVERY = 500      # buffered writes / LRU touches per commit
+COMMIT_INTERVAL = 2.0   # ... or seconds since the last commit, whichever comes first
+BUSY_TIMEOUT = 5.0      # seconds to wait for another process's commit
+
+
+# -------------------- Hashing --------------------
+def read_chunks(path, block_size=READ_BLOCK, use_mmap=False):
+    """Yield the file contents as memoryviews of at most `block_size` bytes.
+
+    A single buffer is reused for the whole file, so memory use is bounded
+    by `block_size` whatever the file size. Each view is only valid until
+    the next one is produced. With `use_mmap` the file is mapped instead
+    of copied into the buffer.
+    """
+    with open(path, "rb", buffering=0) as f:
+        if use_mmap:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                if hasattr(m, "madvise"):
+                    m.madvise(mmap.MADV_SEQUENTIAL)
+                view = memoryview(m)
+                try:
+                    for offset in range(0, size, block_size):
+                        chunk = view[offset:offset + block_size]
+                        try:
+                            yield chunk
+                        finally:
+                            chunk.release()
+                finally:
+                    view.release()
+            return
+        buf = bytearray(block_size)
+        view = memoryview(buf)
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                break
+            yield view[:n]
+
+
+def compute_md5(path, block_size=READ_BLOCK, use_mmap=False):
+    """Stream the file and return its MD5 hex digest (no caching)."""
+    h = hashlib.md5()
+    for chunk in read_chunks(path, block_size, use_mmap):
+        h.update(chunk)
+    return h.hexdigest()
+
+
+def stat_key(st):
+    """Cache key for a stat result: (device, inode, size, mtime_ns)."""
+    return (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+# -------------------- Hash Cache --------------------
+class HashCache:
+    """On-disk digest cache keyed on (device, inode, size, mtime_ns).
+
+    A file whose key is unchanged is never read again. The store is a
+    single SQLite file holding at most `max_entries` rows; the least
+    recently used rows are evicted first. Safe to share between threads.
+
+    Several processes may share the file (the app and a cron cli.py run):
+    the connection is in autocommit mode, new digests and LRU touches are
+    buffered in memory and written in one short transaction every
+    COMMIT_EVERY changes / COMMIT_INTERVAL seconds, so no lock is held
+    between batches. A cache that cannot be read or written (locked,
+    corrupt, read-only) only costs re-hashing: errors are reported once
+    and lookups behave as misses.
+    """
+
+    def __init__(self, db_path=DEFAULT_CACHE_PATH, max_entries=DEFAULT_MAX_ENTRIES,
+                 mmap_threshold=None):
+        self.db_path = str(db_path)
+        self.max_entries = max_entries
+        # files at least this large are hashed through mmap (None: never)
+        self.mmap_threshold = mmap_threshold
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._puts = {}     # (dev, ino, size, mtime_ns, algo) -> (digest, last_used), not yet written
+        self._touches = {}  # same key -> last_used of hits not yet written
+        self._last_commit = time.monotonic()
+        self._warned = False
+        self._clock = 0
+        self._conn = self._connect()
+
+    def _connect(self):
+        if self.db_path != ":memory:":
+            try:
+                Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+                return self._open(self.db_path)
+            except (OSError, sqlite3.Error) as e:
+                print(f"Hash cache unavailable ({e}), using memory only")
+        self.db_path = ":memory:"
+        return self._open(":memory:")
+
+    def _open(self, db_path):
+        # isolation_level=None: autocommit, transactions only where _commit opens one
+        conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None,
+                               timeout=BUSY_TIMEOUT)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS hashes ("
+            " dev INTEGER, ino INTEGER, size INTEGER, mtime_ns INTEGER,"
+            " algo TEXT, digest TEXT, last_used INTEGER,"
+            " PRIMARY KEY (dev, ino, size, mtime_ns, algo))"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS hashes_lru ON hashes (last_used)")
+        row = conn.execute("SELECT MAX(last_used) FROM hashes").fetchone()
+        self._clock = row[0] or 0
+        return conn
+
+    # ---------- Lookup / Store ----------
+    def get(self, st, algo="md5"):
+        """Return the cached digest for a stat result, or None."""
+        key = stat_key(st) + (algo,)
+        with self._lock:
+            pending = self._puts.get(key)
+            if pending is not None:
+                digest = pending[0]
+            else:
+                try:
+                    row = self._conn.execute(
+                        "SELECT digest FROM hashes WHERE dev=? AND ino=? AND size=? AND mtime_ns=? AND algo=?",
+                        key).fetchone()
+                except sqlite3.Error as e:
+                    self._report(e)
+                    row = None
+                digest = row[0] if row is not None else None
+            if digest is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._clock += 1
+            if pending is not None:
+                self._puts[key] = (digest, self._clock)
+            else:
+                self._touches[key] = self._clock
+            self._maybe_commit()
+            return digest
+
+    def put(self, st, digest, algo="md5"):
+        key = stat_key(st) + (algo,)
+        with self._lock:
+            self._clock += 1
+            self._puts[key] = (digest, self._clock)
+            self._touches.pop(key, None)
+            self._maybe_commit()
+
+    def file_md5(self, path):
+        """Return the MD5 hex digest of `path`, hashing only on a cache miss."""
+        st = os.stat(path)
+        digest = self.get(st)
+        if digest is None:
+            use_mmap = self.mmap_threshold is not None and st.st_size >= self.mmap_threshold
+            digest = compute_md5(path, use_mmap=use_mmap)
+            self.put(st, digest)
+        return digest
+
+    # ---------- Maintenance ----------
+    def _report(self, error):
+        if not self._warned:
+            self._warned = True
+            print(f"Hash cache error ({error}); affected files are hashed without the cache")
+
+    def _maybe_commit(self):
+        pending = len(self._puts) + len(self._touches)
+        if pending >= COMMIT_EVERY or \
+                (pending and time.monotonic() - self._last_commit >= COMMIT_INTERVAL):
+            self._commit()
+
+    def _commit(self):
+        puts, touches = self._puts, self._touches
+        self._puts, self._touches = {}, {}
+        self._last_commit = time.monotonic()
+        if not puts and not touches:
+            return
+        conn = self._conn
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany("INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                 [key + value for key, value in puts.items()])
+                conn.executemany(
+                    "UPDATE hashes SET last_used=? WHERE dev=? AND ino=? AND size=? AND mtime_ns=? AND algo=?",
+                    [(clock,) + key for key, clock in touches.items()])
+                self._evict()
+                conn.execute("COMMIT")
+            except BaseException:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+        except sqlite3.Error as e:
+            # the batch is dropped; those files are simply hashed again next time
+            self._report(e)
+
+    def _evict(self):
+        count = self._conn.execute("SELECT COUNT(*) FROM hashes").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM hashes WHERE rowid IN "
+                "(SELECT rowid FROM hashes ORDER BY last_used LIMIT ?)", (excess,))
+
+    def flush(self):
+        with self._lock:
+            self._commit()
+
+    def close(self):
+        with self._lock:
+            self._commit()
+            self._conn.close()
+
+    def stats(self):
+        with self._lock:
+            try:
+                entries = self._conn.execute("SELECT COUNT(*) FROM hashes").fetchone()[0]
+            except sqlite3.Error:
+                entries = None
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": entries,
+        }
+
+
+# -------------------- Shared Instance --------------------
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """Return the process-wide cache (path overridable via DMANAGER_HASH_CACHE)."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = HashCache(os.environ.get("DMANAGER_HASH_CACHE", DEFAULT_CACHE_PATH))
+            atexit.register(_cache.close)
+        return _cache
+
+
+def _forget_cache():
+    # a forked worker must not reuse the parent's SQLite connection
+    global _cache, _cache_lock
+    _cache = None
+    _cache_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_cache)
+
+
+def file_md5(path):
+    """MD5 hex digest of `path` through the shared cache."""
+    return get_cache().file_md5(path)
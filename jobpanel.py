@@ -0,0 +1,137 @@
+import queue
+import threading
+import tkinter as tk
+from tkinter import ttk
+
+# -------------------- Configuration --------------------
+POLL_MS = 100
+
+
+# -------------------- Job Panel --------------------
+class JobPanel(ttk.Frame):
+    """Progress bar, throughput readout and Pause / Cancel for a jobs.Job.
+
+    The panel polls the job's event queue on the Tk thread with after(),
+    so job actions never call into Tk themselves.
+    """
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.job = None
+        self.on_done = None
+        self.on_error = None
+        self.errors = 0  # item errors of the running job, shown in the status line
+
+        self.progress_var = tk.DoubleVar()
+        self.progress = ttk.Progressbar(self, variable=self.progress_var, maximum=100)
+        self.progress.pack(side="left", fill="x", expand=True, padx=5)
+        self.status_var = tk.StringVar(value="Idle")
+        ttk.Label(self, textvariable=self.status_var, width=48).pack(side="left", padx=5)
+        self.pause_btn = ttk.Button(self, text="Pause", command=self.toggle_pause, state="disabled")
+        self.pause_btn.pack(side="left", padx=2)
+        self.cancel_btn = ttk.Button(self, text="Cancel", command=self.cancel, state="disabled")
+        self.cancel_btn.pack(side="left", padx=2)
+
+    @property
+    def busy(self):
+        return self.job is not None
+
+    def run(self, job, on_done=None, on_error=None):
+        """Start `job`; on_done(result) / on_error(item, exc) run on the Tk thread."""
+        self.job = job
+        self.on_done = on_done
+        self.on_error = on_error
+        self.errors = 0
+        self.progress_var.set(0)
+        self.status_var.set(f"{job.name}: starting…")
+        self.pause_btn.config(state="normal", text="Pause")
+        self.cancel_btn.config(state="normal")
+        job.start()
+        self.after(POLL_MS, self._poll)
+
+    def toggle_pause(self):
+        if not self.job:
+            return
+        if self.job.status == "paused":
+            self.job.resume()
+            self.pause_btn.config(text="Pause")
+        else:
+            self.job.pause()
+            self.pause_btn.config(text="Resume")
+            self.status_var.set(f"{self.job.name}: paused")
+
+    def cancel(self):
+        if self.job:
+            self.job.cancel()
+            self.status_var.set(f"{self.job.name}: cancelling…")
+
+    def _poll(self):
+        job = self.job
+        latest = None
+        result = None
+        while True:
+            try:
+                event = job.events.get_nowait()
+            except queue.Empty:
+                break
+            if event[0] == "progress":
+                latest = event[1]
+            elif event[0] == "error":
+                self.errors += 1
+                print(f"{job.name} error on {event[1]}: {event[2]}")
+                if self.on_error:
+                    self.on_error(event[1], event[2])
+            elif event[0] == "done":
+                result = event[1]
+
+        if latest and job.status != "paused":
+            percent = latest.done / latest.total * 100 if latest.total else 0
+            self.progress_var.set(percent)
+            self.status_var.set(f"{job.name}: {latest.done}/{latest.total} files · "
+                                f"{latest.files_per_s:.0f} files/s · {latest.mb_per_s:.1f} MB/s"
+                                + (f" · {self.errors} failed" if self.errors else ""))
+
+        if result is None:
+            self.after(POLL_MS, self._poll)
+            return
+
+        state = "cancelled" if result.cancelled else "done"
+        self.status_var.set(f"{job.name} {state}: {result.done} files, "
+                            + (f"{result.errors} failed, " if result.errors else "")
+                            + f"{result.bytes_done / 1e6:.1f} MB in {result.elapsed:.1f}s")
+        if not result.cancelled:
+            self.progress_var.set(100)
+        self.pause_btn.config(state="disabled", text="Pause")
+        self.cancel_btn.config(state="disabled")
+        self.job = None
+        if self.on_done:
+            self.on_done(result)
+
+
+def run_in_background(widget, func, on_done):
+    """Call func() on a worker thread; on_done(result) runs on the Tk thread.
+
+    For short blocking reads (e.g. journal queries) that must not freeze
+    the UI but do not warrant a progress panel. Exceptions are printed.
+    """
+    results = queue.Queue(maxsize=1)
+
+    def work():
+        try:
+            results.put((True, func()))
+        except Exception as e:
+            results.put((False, e))
+
+    def poll():
+        try:
+            ok, value = results.get_nowait()
+        except queue.Empty:
+            widget.after(POLL_MS, poll)
+            return
+        if ok:
+            on_done(value)
+        else:
+            print(f"Background task failed: {value}")
+
+    threading.Thread(target=work, daemon=True).start()
+    widget.after(POLL_MS, poll)
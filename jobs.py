@@ -0,0 +1,182 @@
+import time
+import queue
+import threading
+from collections import deque, namedtuple
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# -------------------- Configuration --------------------
+REPORT_INTERVAL = 0.1  # seconds between progress events
+
+JobProgress = namedtuple("JobProgress", "done total bytes_done elapsed files_per_s mb_per_s current")
+JobResult = namedtuple("JobResult", "done errors bytes_done elapsed cancelled")
+
+
+# -------------------- Background Job --------------------
+class Job:
+    """Run `action(item)` for every item on a background thread.
+
+    `action` returns the number of bytes it processed (or None). The job
+    never touches the UI: it reports through `events`, a thread-safe queue
+    of ("progress", JobProgress), ("error", item, exception) and finally
+    ("done", JobResult). `total` is an int or a callable returning the
+    current (estimated) item count, for item streams of unknown length.
+
+    With `workers` > 1, actions run concurrently on a thread pool (at most
+    2 per worker in flight). `prepare(item)`, if given, always runs on the
+    job thread in item order and its return value is passed to `action`;
+    use it for steps that must not race, such as picking destination names.
+
+    `precompute(item)`, if given, runs on the worker pool a few items
+    ahead of prepare, and prepare receives (item, precomputed value); use
+    it for the slow, independent part of planning (e.g. reading file
+    headers) so the ordered step stays cheap.
+
+    `finish(result)`, if given, runs on the job thread once every action
+    has completed, before the "done" event; use it to close what the job
+    opened (e.g. end a journal transaction).
+    """
+
+    def __init__(self, name, items, action, total=None, workers=1, prepare=None, precompute=None,
+                 finish=None):
+        self.name = name
+        self.items = items
+        self.action = action
+        self.total = total
+        self.workers = max(1, workers)
+        self.prepare = prepare
+        self.precompute = precompute
+        self.finish = finish
+        self.events = queue.Queue()
+        self.status = "idle"
+        self._running = threading.Event()
+        self._running.set()
+        self._cancel = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.status = "running"
+        self._thread = threading.Thread(target=self._run, name=f"job-{self.name}", daemon=True)
+        self._thread.start()
+        return self
+
+    def pause(self):
+        if self.status == "running":
+            self.status = "paused"
+            self._running.clear()
+
+    def resume(self):
+        if self.status == "paused":
+            self.status = "running"
+            self._running.set()
+
+    def cancel(self):
+        self._cancel.set()
+        self._running.set()
+
+    def join(self, timeout=None):
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _current_total(self, done):
+        total = self.total() if callable(self.total) else self.total
+        return max(total or 0, done)
+
+    def _run(self):
+        self._done = self._errors = self._bytes = 0
+        self._start = self._last_report = time.monotonic()
+        self._paused_for = 0.0
+        item = None
+        pool = ThreadPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+        pending = set()
+        items = self._ahead(self.items, pool) if self.precompute else self.items
+        try:
+            for item in items:
+                if self.precompute:
+                    item, result = item
+                if not self._running.is_set():
+                    t = time.monotonic()
+                    self._running.wait()
+                    self._paused_for += time.monotonic() - t
+                if self._cancel.is_set():
+                    break
+                try:
+                    if self.precompute:
+                        task = self.prepare(item, result()) if self.prepare else result()
+                    else:
+                        task = self.prepare(item) if self.prepare else item
+                except Exception as e:
+                    self._record(item, error=e)
+                    continue
+                if pool is None:
+                    try:
+                        self._record(item, self.action(task))
+                    except Exception as e:
+                        self._record(item, error=e)
+                    continue
+                if len(pending) >= self.workers * 2:
+                    pending = self._collect(pending)
+                future = pool.submit(self.action, task)
+                future.item = item
+                pending.add(future)
+        except Exception as e:
+            # the item stream itself failed (e.g. walker error)
+            self._record(item, error=e)
+        finally:
+            while pending:
+                pending = self._collect(pending)
+            if pool is not None:
+                pool.shutdown()
+        elapsed = time.monotonic() - self._start - self._paused_for
+        self._report(self._done, self._bytes, elapsed, item)
+        cancelled = self._cancel.is_set()
+        result = JobResult(self._done, self._errors, self._bytes, elapsed, cancelled)
+        if self.finish is not None:
+            try:
+                self.finish(result)
+            except Exception as e:
+                self.events.put(("error", self.name, e))
+        self.status = "cancelled" if cancelled else "done"
+        self.events.put(("done", result))
+
+    def _ahead(self, items, pool):
+        # (item, callable returning precompute(item)) in item order; with a
+        # pool, up to 2 per worker are computed ahead of the consumer
+        if pool is None:
+            for item in items:
+                yield item, partial(self.precompute, item)
+            return
+        window = deque()
+        for item in items:
+            window.append((item, pool.submit(self.precompute, item).result))
+            if len(window) >= self.workers * 2:
+                yield window.popleft()
+        while window:
+            yield window.popleft()
+
+    def _collect(self, pending):
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            try:
+                self._record(future.item, future.result())
+            except Exception as e:
+                self._record(future.item, error=e)
+        return pending
+
+    def _record(self, item, nbytes=None, error=None):
+        if error is not None:
+            self._errors += 1
+            self.events.put(("error", item, error))
+        else:
+            self._done += 1
+            self._bytes += nbytes or 0
+        now = time.monotonic()
+        if now - self._last_report >= REPORT_INTERVAL:
+            self._last_report = now
+            self._report(self._done, self._bytes, now - self._start - self._paused_for, item)
+
+    def _report(self, done, bytes_done, elapsed, current):
+        elapsed = max(elapsed, 1e-9)
+        self.events.put(("progress", JobProgress(
+            done, self._current_total(done), bytes_done, elapsed,
+            done / elapsed, bytes_done / elapsed / 1e6, current)))
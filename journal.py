@@ -0,0 +1,488 @@
+import os
+import json
+import time
+import uuid
+import atexit
+import shutil
+import threading
+import contextlib
+from collections import namedtuple
+from pathlib import Path
+
+from jobs import Job
+from mover import copy_file, move_path
+from nameindex import NameIndex, DEFAULT_PATTERN
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: os.replace cannot swap a file another process has open, so
+    # compact() fails safely there instead of being locked out up front
+    fcntl = None
+
+# -------------------- Configuration --------------------
+DEFAULT_JOURNAL_PATH = os.path.join(os.path.expanduser("~"), ".dmanager", "journal.jsonl")
+SYNC_EVERY = 256      # records between fsyncs
+SYNC_INTERVAL = 1.0   # seconds between fsyncs
+COMPACT_BYTES = 32 * 1024 * 1024  # compact in the background once the file is this large
+KEEP_TRANSACTIONS = 500           # ended, still undoable transactions kept by compact()
+
+# one line of the journal is one record:
+#   {"op": "begin", "id", "name", "owner", "t", "meta"}  a transaction (one operation) starts
+#   {"op": "step", "id", "seq", "kind", "src", "dst"}    intent, written before the file is touched
+#   {"op": "ok", "id", "seq"}                           the step completed
+#   {"op": "fail", "id", "seq"}                         the step never happened (error / crash)
+#   {"op": "undo", "id", "seq"}                         the completed step was reverted
+#   {"op": "resume", "id"}                              an interrupted transaction continues
+#   {"op": "end", "id", "state"}                        "commit" or "cancelled"
+Step = namedtuple("Step", "tx seq kind src dst state")  # state: pending / done / failed / undone
+TxInfo = namedtuple("TxInfo", "id name owner started meta steps live ended")
+
+
+# -------------------- Journal --------------------
+class Journal:
+    """Append-only write-ahead log of file operations (JSON Lines).
+
+    Every move or copy is recorded as an intent before it happens and
+    confirmed afterwards, so an operation interrupted by a crash can be
+    settled, resumed or rolled back from the log alone. Records are only
+    ever appended: the file is never rewritten while in use. Each intent is
+    flushed to the OS before the caller proceeds (a crashed process loses
+    nothing); fsync runs every SYNC_EVERY records / SYNC_INTERVAL seconds
+    and when a transaction ends. Safe to share between threads.
+
+    transactions() folds the file into an in-memory summary incrementally,
+    so each query only reads the records appended since the previous one.
+    compact() drops transactions that can no longer be undone or resumed;
+    it runs in the background when the file passes COMPACT_BYTES, and only
+    while no other process has the journal open.
+    """
+
+    def __init__(self, path=DEFAULT_JOURNAL_PATH):
+        self.path = str(path)
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # every process holds a shared lock on the side file while it has the
+        # journal open; compact() needs it exclusively
+        self._lockfile = open(self.path + ".lock", "ab")
+        if fcntl is not None:
+            fcntl.flock(self._lockfile, fcntl.LOCK_SH)
+        self._file = open(self.path, "ab")
+        if self._file.tell() and not self._ends_with_newline():
+            # terminate a line torn by a crash so the next record starts clean
+            self._file.write(b"\n")
+        self._seq = {}
+        self._opened = set()  # transactions begun / resumed here: running, never "interrupted"
+        self._offsets = {}  # tx -> byte offset of its begin record, so steps() can seek
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._read_lock = threading.Lock()  # summary state; taken before _lock, never after
+        self._summary = {}   # tx -> summary dict (see transactions)
+        self._scanned = 0    # bytes of the file already folded into _summary
+        self._compacting = False
+
+    def _ends_with_newline(self):
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    # ---------- Writing ----------
+    def _write(self, record, flush=False, sync=False):
+        line = (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
+        with self._lock:
+            if record["op"] == "begin":
+                self._offsets[record["id"]] = self._file.tell()
+            self._file.write(line)
+            self._unsynced += 1
+            if sync or self._unsynced >= SYNC_EVERY or \
+                    time.monotonic() - self._last_sync >= SYNC_INTERVAL:
+                self._sync()
+            elif flush:
+                self._file.flush()
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def begin(self, name, owner, meta=None):
+        """Start a transaction; returns its id."""
+        tx = uuid.uuid4().hex[:16]
+        with self._lock:
+            self._seq[tx] = 0
+            self._opened.add(tx)
+        self._write({"op": "begin", "id": tx, "name": name, "owner": owner,
+                     "t": time.time(), "meta": meta or {}}, sync=True)
+        return tx
+
+    def intent(self, tx, kind, src, dst):
+        """Record that `kind` ("move" / "copy") of src -> dst is about to run; returns its seq."""
+        with self._lock:
+            seq = self._seq[tx] = self._seq.get(tx, 0) + 1
+        self._write({"op": "step", "id": tx, "seq": seq, "kind": kind,
+                     "src": os.fspath(src), "dst": os.fspath(dst)}, flush=True)
+        return seq
+
+    def ok(self, tx, seq):
+        self._write({"op": "ok", "id": tx, "seq": seq})
+
+    def failed(self, tx, seq):
+        self._write({"op": "fail", "id": tx, "seq": seq}, flush=True)
+
+    def undone(self, tx, seq):
+        self._write({"op": "undo", "id": tx, "seq": seq}, flush=True)
+
+    def resume(self, tx):
+        """Continue an interrupted transaction; new steps get fresh seqs."""
+        last = max((s.seq for s in self.steps(tx)), default=0)
+        with self._lock:
+            self._seq[tx] = last
+            self._opened.add(tx)
+        self._write({"op": "resume", "id": tx}, sync=True)
+
+    def end(self, tx, state="commit"):
+        self._write({"op": "end", "id": tx, "state": state}, sync=True)
+        with self._lock:
+            self._seq.pop(tx, None)
+        self.maybe_compact()
+
+    def flush(self):
+        with self._lock:
+            self._sync()
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._sync()
+                self._file.close()
+                self._lockfile.close()
+
+    # ---------- Reading ----------
+    def _lines(self, start=0):
+        # yields (offset, op, tx, line) without decoding the JSON
+        with self._lock:
+            self._file.flush()
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            offset = start
+            for line in f:
+                op = tx = None
+                # records are written as {"op":"<op>","id":"<tx>",...}\n;
+                # anything else is a line torn by a crash and is skipped
+                if line.startswith(b'{"op":"') and line.endswith(b"}\n"):
+                    end = line.find(b'"', 7)
+                    op = line[7:end].decode("ascii", "replace")
+                    if line.startswith(b',"id":"', end + 1):
+                        tx = line[end + 8:line.find(b'"', end + 8)].decode("ascii", "replace")
+                yield offset, op, tx, line
+                offset += len(line)
+
+    def _records(self, start=0, tx=None):
+        # yields (offset, record), optionally only those of one transaction
+        for offset, op, rec_tx, line in self._lines(start):
+            if op is None or (tx is not None and rec_tx != tx):
+                continue
+            try:
+                yield offset, json.loads(line)
+            except ValueError:
+                pass
+
+    def transactions(self, owner=None):
+        """Summaries of all transactions, oldest first.
+
+        Memory is per transaction, not per step, so the journal can hold
+        millions of steps; only begin / end records are fully decoded, and
+        only records appended since the last call are read.
+        """
+        with self._read_lock:
+            self._scan()
+            return [TxInfo(**tx) for tx in self._summary.values()
+                    if owner is None or tx["owner"] == owner]
+
+    def _scan(self):
+        # fold records appended since the last scan into _summary (caller holds _read_lock)
+        txs = self._summary
+        for offset, op, tx_id, line in self._lines(self._scanned):
+            if not line.endswith(b"\n"):
+                break  # still being written; read it next time
+            self._scanned = offset + len(line)
+            if op == "begin":
+                try:
+                    r = json.loads(line)
+                except ValueError:
+                    continue
+                self._offsets[r["id"]] = offset
+                txs[r["id"]] = {"id": r["id"], "name": r["name"], "owner": r["owner"],
+                                "started": r["t"], "meta": r.get("meta", {}),
+                                "steps": 0, "live": 0, "ended": None}
+                continue
+            tx = txs.get(tx_id)
+            if tx is None:
+                continue
+            if op == "step":
+                tx["steps"] += 1
+            elif op == "ok":
+                tx["live"] += 1
+            elif op == "undo":
+                tx["live"] -= 1
+            elif op == "resume":
+                tx["ended"] = None
+            elif op == "end":
+                try:
+                    tx["ended"] = json.loads(line)["state"]
+                except ValueError:
+                    pass
+
+    def steps(self, tx):
+        """All steps of one transaction in seq order."""
+        start = self._offsets.get(tx, 0)
+        steps = self._steps(tx, start)
+        if steps is None:
+            # the offset went stale (the journal was compacted): read it all
+            steps = self._steps(tx, 0)
+        return [Step(tx, seq, *steps[seq]) for seq in sorted(steps or {})]
+
+    def _steps(self, tx, start):
+        steps = {}
+        states = {"ok": "done", "fail": "failed", "undo": "undone"}
+        begun = False
+        for _, r in self._records(start, tx):
+            op = r["op"]
+            if op == "begin":
+                begun = True
+            elif op == "step":
+                steps[r["seq"]] = [r["kind"], r["src"], r["dst"], "pending"]
+            elif op in states and r["seq"] in steps:
+                steps[r["seq"]][3] = states[op]
+        return steps if begun or start == 0 else None
+
+    def incomplete(self, owner=None):
+        """Transactions that never ended (the app stopped mid-operation).
+
+        Transactions begun or resumed through this instance are left out:
+        an unended one is still running, not interrupted.
+        """
+        txs = self.transactions(owner)
+        with self._lock:
+            opened = set(self._opened)
+        return [tx for tx in txs if tx.ended is None and tx.id not in opened]
+
+    # ---------- Compaction ----------
+    def maybe_compact(self):
+        """Start compact() on a background thread if the file has grown past COMPACT_BYTES."""
+        with self._lock:
+            if self._compacting or self._file.closed or self._file.tell() < COMPACT_BYTES:
+                return
+            self._compacting = True
+        threading.Thread(target=self.compact, name="journal-compact", daemon=True).start()
+
+    def compact(self, keep=KEEP_TRANSACTIONS):
+        """Rewrite the journal without transactions that no longer matter.
+
+        Dropped: ended transactions with nothing left to undo, and ended
+        ones older than the `keep` newest undoable ones. Transactions that
+        never ended (running, or waiting for recovery) always stay. The
+        copy is written without blocking writers; records appended in the
+        meantime are carried over under the lock just before the files are
+        swapped. Returns False (and changes nothing) while another process
+        has the journal open.
+        """
+        try:
+            with self._read_lock:
+                if not self._lock_exclusive():
+                    return False
+                try:
+                    return self._compact(keep)
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(self._lockfile, fcntl.LOCK_SH)
+        finally:
+            self._compacting = False
+
+    def _lock_exclusive(self):
+        if fcntl is None:
+            return True
+        try:
+            fcntl.flock(self._lockfile, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            # a failed conversion drops the shared lock; take it back
+            fcntl.flock(self._lockfile, fcntl.LOCK_SH)
+            return False
+
+    def _compact(self, keep):
+        self._scan()
+        undoable = [tx["id"] for tx in self._summary.values() if tx["ended"] is not None and tx["live"] > 0]
+        kept = {tx["id"] for tx in self._summary.values() if tx["ended"] is None}
+        kept.update(undoable[-keep:] if keep > 0 else ())
+        tmp = self.path + ".compact"
+        try:
+            with open(tmp, "wb") as out:
+                copied = 0
+                for offset, op, tx_id, line in self._lines():
+                    if not line.endswith(b"\n"):
+                        break
+                    copied = offset + len(line)
+                    if op is not None and tx_id in kept:
+                        out.write(line)
+                with self._lock:
+                    # records written while the copy was made
+                    self._file.flush()
+                    with open(self.path, "rb") as f:
+                        f.seek(copied)
+                        shutil.copyfileobj(f, out)
+                    out.flush()
+                    os.fsync(out.fileno())
+                    self._file.close()
+                    try:
+                        os.replace(tmp, self.path)
+                    finally:
+                        self._file = open(self.path, "ab")
+                        self._unsynced = 0
+                    self._offsets = {}
+            self._summary = {}
+            self._scanned = 0
+            return True
+        except OSError as e:
+            print(f"Journal compaction skipped: {e}")
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return False
+
+    # ---------- Recovery ----------
+    def settle(self, tx):
+        """Resolve steps left pending by a crash from what is on disk.
+
+        A move whose destination exists and whose source is gone happened;
+        otherwise it did not, and a partial copy at the destination (its name
+        was reserved as free) is removed. A pending copy is always removed.
+        Returns the number of steps that turned out to be done.
+        """
+        done = 0
+        for step in self.steps(tx):
+            if step.state != "pending":
+                continue
+            src_exists = os.path.lexists(step.src)
+            dst_exists = os.path.lexists(step.dst)
+            if step.kind == "move" and dst_exists and not src_exists:
+                self.ok(tx, step.seq)
+                done += 1
+                continue
+            if dst_exists and (step.kind == "copy" or src_exists):
+                try:
+                    os.remove(step.dst)
+                except OSError as e:
+                    print(f"Could not remove partial copy {step.dst}: {e}")
+                    continue
+            self.failed(tx, step.seq)
+        self.flush()
+        return done
+
+
+# -------------------- Steps --------------------
+def apply_step(journal, tx, kind, src, dst, engine, names=None, profiler=None):
+    """Journal and perform one move or copy of transaction `tx`; returns the bytes.
+
+    Write-ahead: the intent is in the journal before the file is touched
+    and confirmed afterwards. On failure the step is marked failed, a
+    partial copy is removed and `dst` is released from `names` (the
+    NameIndex that reserved it). A profiling.Profiler gets the "journal"
+    and "move" phases and the "files" / "bytes_moved" counters.
+    """
+    phase = profiler.phase if profiler is not None else _no_phase
+    with phase("journal"):
+        seq = journal.intent(tx, kind, src, dst)
+    try:
+        with phase("move"):
+            if kind == "copy":
+                size = copy_file(src, dst, engine.buffer_size)
+            else:
+                size = engine.move(src, dst)
+    except Exception:
+        if kind == "copy" and os.path.lexists(dst):
+            # the name was reserved as free, so this is our partial copy
+            try:
+                os.remove(dst)
+            except OSError:
+                pass
+        journal.failed(tx, seq)
+        if names is not None:
+            names.discard(dst)
+        raise
+    journal.ok(tx, seq)
+    if profiler is not None:
+        profiler.count("files")
+        profiler.count("bytes_moved", size)
+    return size
+
+
+def _no_phase(name):
+    return contextlib.nullcontext()
+
+
+def revert_step(step, move=move_path, dst=None):
+    """Undo one completed step: move the file back / delete the copy.
+
+    `dst` overrides where a moved file goes back to (e.g. a free name when
+    the original path has been taken since). Returns the bytes involved.
+    """
+    if step.kind == "copy":
+        size = os.lstat(step.dst).st_size
+        os.remove(step.dst)
+        return size
+    target = Path(dst or step.src)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    return move(step.dst, target)
+
+
+def rollback_job(journal, tx, engine, pattern=DEFAULT_PATTERN):
+    """Job that reverts every completed step of transaction `tx`, newest first.
+
+    Steps run concurrently on `engine.max_transfers` workers through the
+    engine's rename-first moves. A file whose original path has been
+    taken since is restored under a free name (`pattern`, see NameIndex);
+    one that no longer exists at its destination is skipped. Each revert
+    is journaled, so an interrupted rollback can simply be started again.
+    The journal is read on the job thread; steps left pending by a crash
+    are settled first, so partial copies are removed, not left behind.
+    """
+    names = NameIndex(pattern)
+    found = []
+
+    def done_steps():
+        # a generator: its body first runs when the job thread iterates it
+        steps = journal.steps(tx)
+        if any(s.state == "pending" for s in steps):
+            journal.settle(tx)
+            steps = journal.steps(tx)
+        found.extend(s for s in reversed(steps) if s.state == "done")
+        yield from found
+
+    def revert(step):
+        size = 0
+        if os.path.lexists(step.dst):
+            back = names.reserve(step.src) if step.kind == "move" else None
+            size = revert_step(step, engine.move, back)
+        journal.undone(tx, step.seq)
+        return size
+
+    return Job("Undo", done_steps(), revert, total=lambda: len(found), workers=engine.max_transfers)
+
+
+# -------------------- Shared Instance --------------------
+_journal = None
+_journal_lock = threading.Lock()
+
+
+def get_journal():
+    """Return the process-wide journal (path overridable via DMANAGER_JOURNAL)."""
+    global _journal
+    with _journal_lock:
+        if _journal is None:
+            _journal = Journal(os.environ.get("DMANAGER_JOURNAL", DEFAULT_JOURNAL_PATH))
+            atexit.register(_journal.close)
+            _journal.maybe_compact()
+        return _journal
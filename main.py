@@ -1,10 +1,10 @@
+import time
+_START = time.perf_counter()  # `python main.py --startup-time` reports time to first paint
+
+import sys
+import importlib
 import tkinter as tk
 from tkinter import messagebox
-from PIL import Image, ImageTk
-import dashboard
-import file_organizer
-import filemanagerpro
-import deepscan
 
 # ---------------------- CONFIGURATION ----------------------
 CONFIG = {
@@ -44,37 +44,56 @@ CONFIG = {
         "Files Organizer": "icons/organizer.png",
         "My Files": "icons/files.png",
         "Deep Scan": "icons/scan.png"
+    },
+    # page -> (module, factory); the module is imported and the page built
+    # the first time it is shown, so psutil / customtkinter / PIL stay out of startup
+    "pages": {
+        "Dashboard": ("dashboard", "DashboardPage"),
+        "Files Organizer": ("file_organizer", "FileOrganizerPage"),
+        "My Files": ("filemanagerpro", "FileManagerProPage"),
+        "Deep Scan": ("deepscan", "create_deepscan_frame"),
     }
 }
 
 # ---------------------- MAIN APP ----------------------
 class MainApp(tk.Tk):
-    def __init__(self):
+    def __init__(self, report_startup=False):
         super().__init__()
         self.title(CONFIG["window"]["title"])
         self.geometry(CONFIG["window"]["size"])
         self.configure(bg=CONFIG["window"]["bg"])
 
-        # Pages and active button
+        # Pages (built on first show) and active button
         self.pages = {}
+        self.page_factories = {}
         self.active_button = None
         self.sidebar_buttons = {}
         self.icons = {}
+        self.icon_labels = {}
+        self.report_startup = report_startup
+        self.first_paint = None
 
-        self.load_icons()
         self.create_sidebar()
         self.create_topbar()
         self.create_main_frame()
         self.initialize_pages()
+        # icons need PIL; load them once the window is on screen
+        self.after_idle(self.load_icons)
 
     # ---------------------- Load Icons ----------------------
     def load_icons(self):
+        try:
+            from PIL import Image, ImageTk
+        except ImportError:
+            return
         for name, path in CONFIG["icons"].items():
             try:
                 img = Image.open(path).resize((20, 20), Image.ANTIALIAS)
                 self.icons[name] = ImageTk.PhotoImage(img)
             except Exception:
                 self.icons[name] = None
+            if self.icons[name] is not None:
+                self.icon_labels[name].config(image=self.icons[name])
 
     # ---------------------- Sidebar ----------------------
     def create_sidebar(self):
@@ -105,8 +124,9 @@ class MainApp(tk.Tk):
             frame.pack_propagate(False)  # Keep button height
             frame.pack(fill="x", pady=cfg["padding_y"], padx=cfg["padding_x"])
 
-            icon_label = tk.Label(frame, image=self.icons.get(text), bg=cfg["button_bg"])
+            icon_label = tk.Label(frame, bg=cfg["button_bg"])
             icon_label.pack(side="left", padx=8)
+            self.icon_labels[text] = icon_label
 
             btn = tk.Label(
                 frame,
@@ -159,16 +179,43 @@ class MainApp(tk.Tk):
 
     # ---------------------- Pages ----------------------
     def initialize_pages(self):
-        try:
-            self.pages["Dashboard"] = dashboard.DashboardPage(self.main_frame)
-            self.pages["Files Organizer"] = file_organizer.FileOrganizerPage(self.main_frame)
-            self.pages["My Files"] = filemanagerpro.FileManagerProPage(self.main_frame)
-            self.pages["Deep Scan"] = deepscan.create_deepscan_frame(self.main_frame)
-        except Exception as e:
-            messagebox.showerror("Initialization Error", f"Failed to load UI: {e}")
-
-        # Show default page
+        for name, (module, factory) in CONFIG["pages"].items():
+            self.register_page(name, module, factory)
+
+        # Show default page once the shell has been painted
+        self.sidebar.bind("<Expose>", self._on_first_paint)
+
+    def _on_first_paint(self, event=None):
+        if self.first_paint is not None:
+            return
+        self.first_paint = time.perf_counter()
+        self.after_idle(self._show_default_page)
+
+    def _show_default_page(self):
         self.set_active(self.show_dashboard, self.sidebar_buttons["Dashboard"], "Dashboard")
+        if self.report_startup:
+            # --startup-time: report and quit
+            self.update_idletasks()
+            print(f"First paint after {(self.first_paint - _START) * 1000:.0f} ms, "
+                  f"Dashboard ready after {(time.perf_counter() - _START) * 1000:.0f} ms")
+            self.destroy()
+
+    def register_page(self, name, module, factory):
+        """Make page `name` available; `module.factory(main_frame)` runs on first show."""
+        self.page_factories[name] = (module, factory)
+
+    def get_page(self, name):
+        frame = self.pages.get(name)
+        if frame is None and name in self.page_factories:
+            module, factory = self.page_factories[name]
+            try:
+                frame = getattr(importlib.import_module(module), factory)(self.main_frame)
+            except Exception as e:
+                messagebox.showerror("Initialization Error", f"Failed to load {name}: {e}")
+                # forget it so the next click retries
+                return None
+            self.pages[name] = frame
+        return frame
 
     # ---------------------- Navigation ----------------------
     def set_active(self, command, button, page_name):
@@ -185,31 +232,25 @@ class MainApp(tk.Tk):
             widget.pack_forget()
 
     # ---------------------- Show Pages ----------------------
-    def show_dashboard(self):
+    def show_page(self, name):
         self.clear_main()
-        frame = self.pages.get("Dashboard")
+        frame = self.get_page(name)
         if frame:
             frame.pack(fill="both", expand=True)
 
+    def show_dashboard(self):
+        self.show_page("Dashboard")
+
     def show_fileorganizer(self):
-        self.clear_main()
-        frame = self.pages.get("Files Organizer")
-        if frame:
-            frame.pack(fill="both", expand=True)
+        self.show_page("Files Organizer")
 
     def show_files(self):
-        self.clear_main()
-        frame = self.pages.get("My Files")
-        if frame:
-            frame.pack(fill="both", expand=True)
+        self.show_page("My Files")
 
     def show_deepscan(self):
-        self.clear_main()
-        frame = self.pages.get("Deep Scan")
-        if frame:
-            frame.pack(fill="both", expand=True)
+        self.show_page("Deep Scan")
 
 
 if __name__ == "__main__":
-    app = MainApp()
+    app = MainApp(report_startup="--startup-time" in sys.argv)
     app.mainloop()
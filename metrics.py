@@ -0,0 +1,237 @@
+import time
+import threading
+from collections import deque, namedtuple
+
+import psutil
+
+# -------------------- Configuration --------------------
+SAMPLE_INTERVAL = 1.0   # seconds between samples
+IDLE_INTERVAL = 5.0     # while paused, history-only samples (when a series store is attached)
+RING_SIZE = 300         # samples kept (5 minutes at 1 s)
+MOUNT_REFRESH = 30.0    # seconds between re-listing mounted partitions
+SKIP_DISKS = ("loop", "ram", "zram")  # pseudo block devices left out of per-disk I/O
+
+# disks: {name: DiskIO}, mounts: [MountUsage], process: ProcessStats of this app;
+# the three are None in a one-off take_snapshot() (rates need a previous reading)
+Snapshot = namedtuple("Snapshot", "t cpu ram disk uptime disks mounts process",
+                      defaults=(None, None, None))
+DiskIO = namedtuple("DiskIO", "read_bps write_bps read_iops write_iops busy")
+MountUsage = namedtuple("MountUsage", "mountpoint device fstype total used percent")
+ProcessStats = namedtuple("ProcessStats", "cpu rss threads read_bps write_bps")
+
+
+# -------------------- Sampling --------------------
+def take_snapshot(disk_path="/"):
+    """One non-blocking reading; cpu is the usage since the previous call."""
+    return Snapshot(
+        time.time(),
+        psutil.cpu_percent(interval=None),
+        psutil.virtual_memory().percent,
+        psutil.disk_usage(disk_path).percent,
+        round((time.time() - psutil.boot_time()) / 3600, 2),
+    )
+
+
+def mount_usage(partitions):
+    """Usage of each mounted partition; unreadable mounts are skipped."""
+    mounts = []
+    for part in partitions:
+        try:
+            usage = psutil.disk_usage(part.mountpoint)
+        except OSError:
+            continue
+        mounts.append(MountUsage(part.mountpoint, part.device, part.fstype,
+                                 usage.total, usage.used, usage.percent))
+    return mounts
+
+
+class Collector:
+    """Takes full snapshots, turning psutil's cumulative counters into rates.
+
+    Disk I/O (per disk, from disk_io_counters(perdisk=True)) and this
+    process's CPU and I/O are totals since boot / process start; each
+    collect() reports their change since the previous collect(), per
+    second. The first call has no previous reading and reports zeros.
+    Counters a platform does not provide (e.g. process I/O on macOS) are
+    reported as 0.
+    """
+
+    def __init__(self, disk_path="/"):
+        self.disk_path = disk_path
+        self.process = psutil.Process()
+        self._t = None
+        self._disks = {}
+        self._proc_io = None
+        self._partitions = []
+        self._partitions_at = None
+        # prime the CPU counters so the first real sample has a delta
+        psutil.cpu_percent(interval=None)
+        self.process.cpu_percent(interval=None)
+
+    def reset(self):
+        """Forget the previous reading (the next rates start from here)."""
+        self._t = None
+        psutil.cpu_percent(interval=None)
+        self.process.cpu_percent(interval=None)
+
+    def collect(self):
+        now = time.monotonic()
+        dt = now - self._t if self._t is not None else None
+        self._t = now
+        return Snapshot(
+            time.time(),
+            psutil.cpu_percent(interval=None),
+            psutil.virtual_memory().percent,
+            psutil.disk_usage(self.disk_path).percent,
+            round((time.time() - psutil.boot_time()) / 3600, 2),
+            self._disk_rates(dt),
+            self._mounts(now),
+            self._process_stats(dt),
+        )
+
+    def _disk_rates(self, dt):
+        try:
+            counters = psutil.disk_io_counters(perdisk=True) or {}
+        except (OSError, RuntimeError):
+            counters = {}
+        rates = {}
+        for name, c in counters.items():
+            if name.startswith(SKIP_DISKS):
+                continue
+            prev = self._disks.get(name)
+            if prev is None or not dt:
+                rates[name] = DiskIO(0.0, 0.0, 0.0, 0.0, 0.0)
+                continue
+            # busy_time (ms) is Linux-only
+            busy = (getattr(c, "busy_time", 0) - getattr(prev, "busy_time", 0)) / (dt * 10)
+            rates[name] = DiskIO(
+                max(c.read_bytes - prev.read_bytes, 0) / dt,
+                max(c.write_bytes - prev.write_bytes, 0) / dt,
+                max(c.read_count - prev.read_count, 0) / dt,
+                max(c.write_count - prev.write_count, 0) / dt,
+                min(max(busy, 0.0), 100.0),
+            )
+        self._disks = {name: c for name, c in counters.items() if not name.startswith(SKIP_DISKS)}
+        return rates
+
+    def _mounts(self, now):
+        if self._partitions_at is None or now - self._partitions_at >= MOUNT_REFRESH:
+            try:
+                parts = psutil.disk_partitions(all=False)
+            except OSError:
+                parts = []
+            seen = set()
+            self._partitions = []
+            for part in parts:
+                if part.mountpoint in seen or part.device.startswith("/dev/loop"):
+                    continue
+                seen.add(part.mountpoint)
+                self._partitions.append(part)
+            self._partitions_at = now
+        return mount_usage(self._partitions)
+
+    def _process_stats(self, dt):
+        proc = self.process
+        try:
+            with proc.oneshot():
+                cpu = proc.cpu_percent(interval=None)
+                rss = proc.memory_info().rss
+                threads = proc.num_threads()
+                io = proc.io_counters() if hasattr(proc, "io_counters") else None
+        except (psutil.Error, OSError):
+            return ProcessStats(0.0, 0, 0, 0.0, 0.0)
+        read_bps = write_bps = 0.0
+        if io is not None and self._proc_io is not None and dt:
+            # read_chars / write_chars (Linux) include page-cache hits, which is
+            # what a scan actually pulls through; bytes is what reached the disk
+            read = getattr(io, "read_chars", io.read_bytes)
+            write = getattr(io, "write_chars", io.write_bytes)
+            prev_read = getattr(self._proc_io, "read_chars", self._proc_io.read_bytes)
+            prev_write = getattr(self._proc_io, "write_chars", self._proc_io.write_bytes)
+            read_bps = max(read - prev_read, 0) / dt
+            write_bps = max(write - prev_write, 0) / dt
+        self._proc_io = io
+        return ProcessStats(cpu, rss, threads, read_bps, write_bps)
+
+
+class MetricsSampler:
+    """Collects system metrics on a background thread.
+
+    A snapshot is taken every `interval` seconds into a ring buffer of the
+    last `size` samples; the UI thread only calls latest() / history(),
+    which never block on psutil. CPU usage, disk I/O and the app's own
+    process counters are deltas between two samples (see Collector), so
+    no sample sleeps. pause() stops sampling (e.g. while the Dashboard is
+    hidden) until resume().
+
+    If a `series` store (timeseries.TimeSeriesStore over Snapshot fields)
+    is attached, every sample is also recorded there, and while paused the
+    sampler keeps feeding it every `idle_interval` seconds so the history
+    has no holes.
+    """
+
+    def __init__(self, interval=SAMPLE_INTERVAL, size=RING_SIZE, disk_path="/",
+                 series=None, idle_interval=IDLE_INTERVAL):
+        self.interval = interval
+        self.idle_interval = idle_interval
+        self.series = series
+        self.disk_path = disk_path
+        self.collector = None
+        self.samples = deque(maxlen=size)
+        self._running = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self.collector = Collector(self.disk_path)
+            self._running.set()
+            self._thread = threading.Thread(target=self._run, name="metrics", daemon=True)
+            self._thread.start()
+        return self
+
+    def pause(self):
+        self._running.clear()
+
+    def resume(self):
+        self._running.set()
+
+    @property
+    def paused(self):
+        return not self._running.is_set()
+
+    def stop(self):
+        self._stop.set()
+        self._running.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            if self._running.is_set():
+                wait = self.interval
+            elif self.series is not None and self.idle_interval:
+                wait = self.idle_interval
+            else:
+                self._running.wait()
+                # deltas across the pause are meaningless; start fresh ones
+                self.collector.reset()
+                continue
+            if self._stop.wait(wait):
+                break
+            try:
+                snap = self.collector.collect()
+            except Exception as e:
+                print(f"Metrics sample failed: {e}")
+                continue
+            self.samples.append(snap)
+            if self.series is not None:
+                self.series.add(snap.t, [getattr(snap, m) for m in self.series.metrics])
+
+    def latest(self):
+        """Most recent snapshot, or None before the first sample."""
+        try:
+            return self.samples[-1]
+        except IndexError:
+            return None
+
+    def history(self):
+        return list(self.samples)
@@ -0,0 +1,148 @@
+import os
+import sys
+import errno
+import shutil
+
+# -------------------- Configuration --------------------
+COPY_BUFFER = 8 * 1024 * 1024
+DEFAULT_TRANSFERS = 4
+# errors after which the kernel copy paths are abandoned for a plain buffer copy
+_FALLBACK_ERRNOS = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP,
+                    getattr(errno, "ENOTSUP", errno.EOPNOTSUPP), errno.EBADF}
+
+
+# -------------------- Copy --------------------
+def _copy_range(fin, fout, size):
+    # kernel-side copy; returns bytes copied, raises OSError when unsupported
+    copied = 0
+    if hasattr(os, "copy_file_range"):
+        while copied < size:
+            n = os.copy_file_range(fin, fout, size - copied)
+            if n == 0:
+                break
+            copied += n
+        return copied
+    while copied < size:
+        n = os.sendfile(fout, fin, copied, min(size - copied, 1 << 30))
+        if n == 0:
+            break
+        copied += n
+    return copied
+
+
+def copy_file(src, dst, buffer_size=COPY_BUFFER):
+    """Copy file data and metadata; returns the number of bytes copied.
+
+    Uses copy_file_range / sendfile on Linux and falls back to a large
+    reusable buffer elsewhere or when the kernel path is unsupported.
+    """
+    with open(src, "rb", buffering=0) as fsrc, open(dst, "wb", buffering=0) as fdst:
+        size = os.fstat(fsrc.fileno()).st_size
+        copied = 0
+        if sys.platform.startswith("linux") and size:
+            try:
+                copied = _copy_range(fsrc.fileno(), fdst.fileno(), size)
+            except OSError as e:
+                if e.errno not in _FALLBACK_ERRNOS:
+                    raise
+                fsrc.seek(0)
+                fdst.seek(0)
+                fdst.truncate()
+                copied = 0
+        if copied < size or not size:
+            fsrc.seek(copied)
+            fdst.seek(copied)
+            buf = bytearray(min(buffer_size, max(size - copied, 1)))
+            view = memoryview(buf)
+            while True:
+                n = fsrc.readinto(buf)
+                if not n:
+                    break
+                fdst.write(view[:n])
+                copied += n
+    shutil.copystat(src, dst)
+    return copied
+
+
+# -------------------- Move --------------------
+def same_device(src, dst):
+    """True if `src` and the directory that will hold `dst` share a filesystem."""
+    try:
+        return os.stat(src).st_dev == os.stat(os.path.dirname(os.path.abspath(dst))).st_dev
+    except OSError:
+        return False
+
+
+def tree_size(path):
+    """(entries, bytes) below a folder, not counting folders; symlinks are not followed."""
+    count = size = 0
+    stack = [path]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                else:
+                    count += 1
+                    size += entry.stat(follow_symlinks=False).st_size
+    return count, size
+
+
+def move_path(src, dst, buffer_size=COPY_BUFFER):
+    """Move a file or folder; returns the number of bytes moved.
+
+    Same-device moves are a single os.rename (a renamed folder reports 0
+    bytes: its contents are not walked). Cross-device files are copied
+    with copy_file and folders with copytree; the copy's size (and, for
+    folders, its file count) is checked against the source, and only then
+    is the source deleted. `dst` must not exist.
+    """
+    src, dst = os.fspath(src), os.fspath(dst)
+    if os.path.lexists(dst):
+        raise FileExistsError(errno.EEXIST, "Destination exists", dst)
+    st = os.lstat(src)
+    if same_device(src, dst):
+        try:
+            os.rename(src, dst)
+            return 0 if os.path.isdir(dst) and not os.path.islink(dst) else st.st_size
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+
+    if os.path.isdir(src) and not os.path.islink(src):
+        files, size = tree_size(src)
+        try:
+            shutil.copytree(src, dst, symlinks=True,
+                            copy_function=lambda s, d: copy_file(s, d, buffer_size))
+            copied_files, copied = tree_size(dst)
+        except BaseException:
+            shutil.rmtree(dst, ignore_errors=True)
+            raise
+        if (copied_files, copied) != (files, size):
+            shutil.rmtree(dst, ignore_errors=True)
+            raise OSError(errno.EIO, f"Folder copy incomplete ({copied_files} of {files} files, "
+                                     f"{copied} of {size} bytes)", src)
+        shutil.rmtree(src)
+        return copied
+
+    copied = copy_file(src, dst, buffer_size)
+    if os.stat(dst).st_size != st.st_size or copied != st.st_size:
+        os.remove(dst)
+        raise OSError(errno.EIO, f"Size mismatch after copy ({copied} of {st.st_size} bytes)", src)
+    os.remove(src)
+    return copied
+
+
+class MoveEngine:
+    """Move settings shared by one batch (see move_path).
+
+    `max_transfers` is how many moves run at once: callers size their
+    worker pools with it. `buffer_size` is the cross-device copy buffer.
+    """
+
+    def __init__(self, max_transfers=DEFAULT_TRANSFERS, buffer_size=COPY_BUFFER):
+        self.max_transfers = max(1, max_transfers)
+        self.buffer_size = buffer_size
+
+    def move(self, src, dst):
+        return move_path(src, dst, self.buffer_size)
@@ -0,0 +1,80 @@
+import os
+import threading
+from pathlib import Path
+
+# -------------------- Configuration --------------------
+DEFAULT_PATTERN = "{stem}({n}){ext}"
+
+
+# -------------------- Name Index --------------------
+class NameIndex:
+    """Hands out collision-free destination names without probing the disk.
+
+    Each target directory is listed once with os.scandir; afterwards every
+    name handed out is recorded in memory, and a per-(directory, stem, ext)
+    counter remembers the last suffix used, so the next free "name(n).ext"
+    is found in constant time instead of one exists() call per candidate.
+    `pattern` formats the renamed candidates ("{stem}({n}){ext}" gives
+    "photo(1).jpg"). Safe to share between threads.
+
+    The index trusts its own bookkeeping: create one per batch of moves,
+    not per application, so files created by others are picked up again.
+    """
+
+    def __init__(self, pattern=DEFAULT_PATTERN):
+        self.pattern = pattern
+        self._names = {}     # directory -> set of normcased names
+        self._counters = {}  # (directory, stem, ext) -> last suffix handed out
+        self._lock = threading.Lock()
+
+    def _dir_names(self, directory):
+        names = self._names.get(directory)
+        if names is None:
+            names = set()
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        names.add(os.path.normcase(entry.name))
+            except OSError:
+                pass
+            self._names[directory] = names
+        return names
+
+    def reserve(self, path):
+        """Return `path` or the first free renamed variant, and mark it taken."""
+        path = Path(path)
+        directory = os.path.abspath(path.parent)
+        with self._lock:
+            names = self._dir_names(directory)
+            name = path.name
+            if os.path.normcase(name) in names:
+                stem, ext = path.stem, path.suffix
+                key = (directory, stem, ext)
+                n = self._counters.get(key, 0)
+                while True:
+                    n += 1
+                    name = self.pattern.format(stem=stem, n=n, ext=ext)
+                    if os.path.normcase(name) not in names:
+                        break
+                self._counters[key] = n
+            names.add(os.path.normcase(name))
+        return path.with_name(name)
+
+    def add(self, path):
+        """Record a name that appeared by other means (e.g. a folder we created)."""
+        path = Path(path)
+        with self._lock:
+            self._dir_names(os.path.abspath(path.parent)).add(os.path.normcase(path.name))
+
+    def discard(self, path):
+        """Forget a name, e.g. a reservation whose move failed or a moved-away source."""
+        path = Path(path)
+        with self._lock:
+            names = self._names.get(os.path.abspath(path.parent))
+            if names is not None:
+                names.discard(os.path.normcase(path.name))
+
+    def clear(self):
+        with self._lock:
+            self._names.clear()
+            self._counters.clear()
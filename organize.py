@@ -0,0 +1,82 @@
+import contextlib
+from pathlib import Path
+
+from jobs import Job
+from walker import ParallelWalker
+from nameindex import NameIndex, DEFAULT_PATTERN
+from categories import get_engine, OTHER_CATEGORY
+from journal import apply_step
+
+
+# -------------------- Organize --------------------
+def organize_job(sources, target, engine, journal, owner, subfolders=True, profiler=None,
+                 pattern=DEFAULT_PATTERN, default=OTHER_CATEGORY, resume=None, dry_run=False):
+    """Job that moves every file below `sources` into `target`, by category.
+
+    The organize pipeline of both file managers and cli.py. Files are
+    classified by content on the transfer pool (CategoryEngine.classify_file,
+    `default` when nothing matches), given a free name in walk order
+    (NameIndex with `pattern`) and moved through `engine` as journaled
+    steps (see apply_step) of one transaction, `job.tx`, which is ended
+    when the job finishes. `resume` continues an interrupted transaction
+    instead of beginning a new one. Without `subfolders` every file goes
+    straight into `target`.
+
+    With `dry_run` nothing is created, moved or journaled: the planned
+    (src, dst) pairs are collected in `job.planned`, in walk order.
+
+    A profiling.Profiler gets the "walk", "classify", "plan", "journal"
+    and "move" phases and the "files" / "bytes_moved" counters; the
+    caller finishes it.
+    """
+    categories = get_engine()
+    names = NameIndex(pattern)
+    target = Path(target)
+    # the target is excluded so files already moved are not picked up again
+    walker = ParallelWalker(sources, exclude=[target])
+    entries = profiler.timed_iter(walker) if profiler is not None else walker
+    phase = profiler.phase if profiler is not None else (lambda name: contextlib.nullcontext())
+
+    def classify(entry):
+        # transfer pool, a few items ahead of plan: reads the file header
+        with phase("classify"):
+            return categories.classify_file(entry.path, default=default, st=entry.stat())
+
+    def plan(entry, category=None):
+        # job thread, in walk order: reserve a free name before any move starts
+        src = Path(entry.path)
+        folder = target / category if category else target
+        if not dry_run:
+            folder.mkdir(parents=True, exist_ok=True)
+        with phase("plan"):
+            return src, names.reserve(folder / src.name)
+
+    precompute = classify if subfolders else None
+    if dry_run:
+        planned = []
+        job = Job("Organize", entries, lambda p: None, total=walker.estimated_total,
+                  workers=engine.max_transfers, precompute=precompute,
+                  prepare=lambda entry, category=None: planned.append(plan(entry, category)))
+        job.tx = None
+        job.planned = planned
+        return job
+
+    if resume:
+        tx = resume
+        journal.resume(tx)
+    else:
+        tx = journal.begin("Organize", owner, {
+            "sources": [str(s) for s in sources], "target": str(target), "subfolders": subfolders})
+
+    def move(plan):
+        # transfer pool
+        return apply_step(journal, tx, "move", *plan, engine, names=names, profiler=profiler)
+
+    def finish(result):
+        names.clear()
+        journal.end(tx, "cancelled" if result.cancelled else "commit")
+
+    job = Job("Organize", entries, move, total=walker.estimated_total, workers=engine.max_transfers,
+              precompute=precompute, prepare=plan, finish=finish)
+    job.tx = tx
+    return job
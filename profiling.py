@@ -0,0 +1,167 @@
+import os
+import json
+import time
+import threading
+from collections import deque, defaultdict
+
+# -------------------- Configuration --------------------
+DEFAULT_REPORT_DIR = os.path.join(os.path.expanduser("~"), ".dmanager", "reports")
+KEEP_RECENT = 10  # finished reports kept in memory for the Dashboard
+
+
+# -------------------- Profiler --------------------
+class _Phase:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.add_time(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class Profiler:
+    """Phase timers and counters for one run (a scan, an organize, ...).
+
+    Code under measurement wraps work in `with profiler.phase("hash"):`
+    or reports durations it timed itself with add_time(); both also add
+    to the calling thread's busy time, which gives per-worker utilization
+    (time spent waiting, e.g. on the walker, is recorded with busy=False).
+    Counters ("files", "bytes_read", ...) are free-form. finish() freezes
+    the run, writes a JSON report and keeps it for recent_reports().
+    Safe to use from any number of threads; avoid nesting phases, or
+    busy time is counted twice.
+    """
+
+    def __init__(self, operation, meta=None):
+        self.operation = operation
+        self.meta = dict(meta or {})
+        self.started = time.time()
+        self._t0 = time.perf_counter()
+        self._elapsed = None
+        self._lock = threading.Lock()
+        self._seconds = defaultdict(float)
+        self._calls = defaultdict(int)
+        self._counters = defaultdict(int)
+        self._busy = defaultdict(float)
+        self.report_path = None
+        with _registry_lock:
+            _active.append(self)
+
+    def phase(self, name):
+        return _Phase(self, name)
+
+    def add_time(self, name, seconds, calls=1, busy=True):
+        thread = threading.current_thread().name
+        with self._lock:
+            self._seconds[name] += seconds
+            self._calls[name] += calls
+            if busy:
+                self._busy[thread] += seconds
+
+    def count(self, name, n=1):
+        with self._lock:
+            self._counters[name] += n
+
+    def timed_iter(self, iterable, name="walk"):
+        """Yield from `iterable`, timing how long each next() blocks."""
+        it = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(it)
+            except StopIteration:
+                self.add_time(name, time.perf_counter() - start, busy=False)
+                return
+            self.add_time(name, time.perf_counter() - start, busy=False)
+            yield item
+
+    @property
+    def elapsed(self):
+        if self._elapsed is not None:
+            return self._elapsed
+        return time.perf_counter() - self._t0
+
+    def report(self):
+        """The run so far as a JSON-ready dict."""
+        elapsed = max(self.elapsed, 1e-9)
+        with self._lock:
+            seconds = dict(self._seconds)
+            calls = dict(self._calls)
+            counters = dict(self._counters)
+            busy = dict(self._busy)
+        return {
+            "operation": self.operation,
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+            "elapsed_s": round(elapsed, 3),
+            "finished": self._elapsed is not None,
+            "meta": self.meta,
+            "phases": {
+                name: {"seconds": round(s, 4), "calls": calls[name],
+                       "mean_ms": round(s / calls[name] * 1000, 3) if calls[name] else 0.0}
+                for name, s in sorted(seconds.items(), key=lambda kv: -kv[1])
+            },
+            "counters": counters,
+            "files_per_s": round(counters.get("files", 0) / elapsed, 1),
+            "mb_per_s": round((counters.get("bytes_read", 0) or counters.get("bytes_moved", 0))
+                              / elapsed / 1e6, 2),
+            "workers": {
+                thread: {"busy_s": round(b, 3), "utilization": round(min(b / elapsed, 1.0), 3)}
+                for thread, b in sorted(busy.items())
+            },
+        }
+
+    def finish(self, write=True):
+        """End the run; returns the report (also written as JSON when `write`)."""
+        if self._elapsed is None:
+            self._elapsed = time.perf_counter() - self._t0
+        report = self.report()
+        if write:
+            try:
+                self.report_path = write_report(report)
+                report["report_path"] = self.report_path
+            except OSError as e:
+                print(f"Could not write performance report: {e}")
+        with _registry_lock:
+            if self in _active:
+                _active.remove(self)
+            _recent.append(report)
+        return report
+
+
+# -------------------- Reports --------------------
+_registry_lock = threading.Lock()
+_active = []
+_recent = deque(maxlen=KEEP_RECENT)
+
+
+def write_report(report, directory=None):
+    """Write `report` as JSON into the report directory; returns the path.
+
+    The directory is DMANAGER_REPORTS or ~/.dmanager/reports.
+    """
+    directory = directory or os.environ.get("DMANAGER_REPORTS", DEFAULT_REPORT_DIR)
+    os.makedirs(directory, exist_ok=True)
+    stamp = report["started"].replace(":", "").replace("-", "")
+    slug = report["operation"].lower().replace(" ", "_")
+    path = os.path.join(directory, f"{slug}-{stamp}-{os.getpid()}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    return path
+
+
+def active_profilers():
+    with _registry_lock:
+        return list(_active)
+
+
+def recent_reports():
+    """Finished reports, newest last."""
+    with _registry_lock:
+        return list(_recent)
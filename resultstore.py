@@ -0,0 +1,92 @@
+from array import array
+
+# -------------------- Configuration --------------------
+RISK_LABELS = ("Low", "Medium", "High")
+RISK_CODES = {label: code for code, label in enumerate(RISK_LABELS)}
+DIGEST_SIZE = 16  # MD5
+
+
+# -------------------- Result Store --------------------
+class ScanRow:
+    """Lightweight view of one stored result; supports row["field"] access."""
+
+    __slots__ = ("store", "index")
+
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+
+    def __getitem__(self, field):
+        return self.store.value(self.index, field)
+
+    def keys(self):
+        return ScanResultStore.FIELDS
+
+
+class ScanResultStore:
+    """Column-oriented Deep Scan results.
+
+    Each field is one column: filenames in a list, sizes / risk codes /
+    entropies in typed arrays and MD5 digests packed as 16 raw bytes per
+    row. Rows are addressed by index; store[i] returns a ScanRow view.
+    """
+
+    FIELDS = ("filename", "size", "risk", "entropy", "hash")
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.filenames = []
+        self.sizes = array("q")
+        self.risks = array("B")
+        self.entropies = array("f")
+        self.digests = bytearray()
+
+    def append(self, filename, size, risk, entropy, md5_hex):
+        """Add one result and return its index."""
+        self.sizes.append(size)
+        self.risks.append(RISK_CODES[risk])
+        self.entropies.append(entropy)
+        self.digests += bytes.fromhex(md5_hex) if md5_hex else bytes(DIGEST_SIZE)
+        # filename last: len(self) only grows once the row is complete
+        self.filenames.append(filename)
+        return len(self.filenames) - 1
+
+    def __len__(self):
+        return len(self.filenames)
+
+    def __getitem__(self, index):
+        return ScanRow(self, index)
+
+    def __iter__(self):
+        return (ScanRow(self, i) for i in range(len(self)))
+
+    # ---------- Column access ----------
+    def value(self, index, field):
+        if field == "filename":
+            return self.filenames[index]
+        if field == "size":
+            return self.sizes[index]
+        if field == "risk":
+            return RISK_LABELS[self.risks[index]]
+        if field == "entropy":
+            return round(self.entropies[index], 2)
+        if field == "hash":
+            return self.digests[index * DIGEST_SIZE:(index + 1) * DIGEST_SIZE].hex()
+        raise KeyError(field)
+
+    def record(self, index):
+        """Result as a plain dict (for export)."""
+        return {field: self.value(index, field) for field in self.FIELDS}
+
+    def sort_key(self, field):
+        """Return index -> sort value for a column (risk sorts Low < Medium < High)."""
+        column = {"filename": self.filenames, "size": self.sizes,
+                  "risk": self.risks, "entropy": self.entropies}.get(field)
+        if column is None:
+            return lambda i: self.value(i, field)
+        return column.__getitem__
+
+    def risk_counts(self):
+        return {label: self.risks.count(code) for code, label in enumerate(RISK_LABELS)}
@@ -0,0 +1,190 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from hashcache import file_md5, get_cache, stat_key
+from entropy import DEFAULT_MODE, file_entropy
+from analyzer import analyze_file
+from resultstore import ScanResultStore
+from walker import ParallelWalker
+
+# Deep Scan engine: no UI imports, shared by deepscan.py (Tk page) and cli.py
+
+
+# -------------------------------
+# Risk & Entropy Utils
+# -------------------------------
+ENTROPY_MODE = DEFAULT_MODE
+
+
+def calculate_entropy(filename, mode=None):
+    """Shannon entropy (bits per byte) of a file, sampled per ENTROPY_MODE."""
+    return round(file_entropy(filename, mode or ENTROPY_MODE), 2)
+
+
+def get_risk_level(entropy, size):
+    """Estimate risk level from entropy and file size."""
+    if entropy > 7 or size > 5_000_000:
+        return "High"
+    elif entropy > 5:
+        return "Medium"
+    else:
+        return "Low"
+
+
+# -------------------------------
+# Hash Utility
+# -------------------------------
+def hash_file(filepath):
+    """Return MD5 hash of a file, streamed in fixed-size blocks.
+
+    Unchanged files are served from the hash cache without being read.
+    """
+    try:
+        return file_md5(filepath)
+    except Exception:
+        return "Error"
+
+
+# -------------------------------
+# Deep Scan Logic
+# -------------------------------
+DEFAULT_WORKERS = min(8, os.cpu_count() or 1)
+
+
+def scan_file(filepath, profiler=None, cache=None):
+    """Analyze a single file (one read pass).
+
+    Returns (filename, size, risk, entropy, md5) in ScanResultStore.append order.
+    """
+    record = analyze_file(filepath, ENTROPY_MODE, cache=cache, profiler=profiler)
+    entropy = round(record.entropy, 2)
+    risk = get_risk_level(entropy, record.size)
+    return (os.path.basename(filepath), record.size, risk, entropy, record.md5)
+
+
+class WorkerCache:
+    """Hash cache stand-in for worker processes.
+
+    Workers never open the SQLite file (several processes writing it
+    would contend for its lock, and a worker's unflushed rows are lost
+    because multiprocessing children skip atexit). The parent looks the
+    file up before submitting it (`known`) and stores what the worker
+    computed (`new`, a list of (stat, digest, algo)) when the result
+    comes back.
+    """
+
+    def __init__(self, known=None):
+        self.known = known or {}
+        self.new = []
+
+    def get(self, st, algo="md5"):
+        return self.known.get(stat_key(st) + (algo,))
+
+    def put(self, st, digest, algo="md5"):
+        self.new.append((st, digest, algo))
+
+
+def scan_file_in_process(filepath, known):
+    """scan_file for a worker process; returns (result, new cache entries)."""
+    cache = WorkerCache(known)
+    return scan_file(filepath, cache=cache), cache.new
+
+
+def known_digests(entry, cache):
+    """Cached digests of a walker entry, as WorkerCache expects them."""
+    try:
+        # not entry.stat(): on Windows it has no device or inode, and the
+        # worker keys its results on fstat of the opened file
+        st = os.stat(entry.path)
+    except OSError:
+        return {}
+    digest = cache.get(st)
+    return {stat_key(st) + ("md5",): digest} if digest is not None else {}
+
+
+def deep_scan(folder_path, progress_callback, result_callback, complete_callback,
+              workers=DEFAULT_WORKERS, queue_size=None, use_processes=False, store=None,
+              profiler=None, error_callback=None):
+    """Scan `folder_path` with a pool of `workers` hashing threads (or processes).
+
+    Files are hashed as soon as the walker finds them, and at most
+    `queue_size` files (default: 4 per worker) are in flight at once.
+    The total passed to progress_callback is an estimate until the walk
+    has finished.
+
+    Results are appended to `store` (a new ScanResultStore by default) in
+    completion order and each new ScanRow is passed to result_callback;
+    complete_callback receives the store. Callbacks are always invoked
+    from the calling thread. A file that cannot be analyzed is passed to
+    error_callback(filepath, exception), or reported with print() if none
+    is given.
+
+    A profiling.Profiler gets the "walk" (waiting for the walker), "wait"
+    (waiting for workers) and "store" phases from the calling thread and,
+    with threads, the per-file stat / read / hash phases from the workers
+    (worker processes cannot report back).
+
+    Worker processes do not use the hash cache themselves: this thread
+    looks each file up before submitting it and stores the digests the
+    workers return (see WorkerCache).
+    """
+    scanned_files = store if store is not None else ScanResultStore()
+    # files are submitted while the tree is still being listed
+    walker = ParallelWalker(folder_path)
+
+    workers = max(1, workers)
+    queue_size = queue_size or workers * 4
+    pool_cls = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    done_count = 0
+
+    def drain(pending, return_when):
+        nonlocal done_count
+        t0 = time.perf_counter()
+        done, pending = wait(pending, return_when=return_when)
+        t1 = time.perf_counter()
+        for future in done:
+            done_count += 1
+            try:
+                result = future.result()
+                if use_processes:
+                    result, new = result
+                    for st, digest, algo in new:
+                        cache.put(st, digest, algo)
+            except Exception as e:
+                if error_callback is not None:
+                    error_callback(future.filepath, e)
+                else:
+                    print(f"Error scanning {future.filepath}: {e}")
+                result = None
+            row = None
+            if result is not None:
+                row = scanned_files[scanned_files.append(*result)]
+            progress_callback(done_count, max(done_count, walker.estimated_total()))
+            if row is not None:
+                result_callback(row)
+        if profiler is not None:
+            profiler.add_time("wait", t1 - t0, busy=False)
+            profiler.add_time("store", time.perf_counter() - t1)
+        return pending
+
+    # worker processes get no profiler (it cannot be shared across processes)
+    task_args = () if use_processes or profiler is None else (profiler,)
+    entries = profiler.timed_iter(walker, "walk") if profiler is not None else walker
+    pool_kwargs = {} if use_processes else {"thread_name_prefix": "scan"}
+    cache = get_cache() if use_processes else None
+    with pool_cls(max_workers=workers, **pool_kwargs) as pool:
+        pending = set()
+        for entry in entries:
+            filepath = entry.path
+            if len(pending) >= queue_size:
+                pending = drain(pending, FIRST_COMPLETED)
+            if use_processes:
+                future = pool.submit(scan_file_in_process, filepath, known_digests(entry, cache))
+            else:
+                future = pool.submit(scan_file, filepath, *task_args)
+            future.filepath = filepath
+            pending.add(future)
+        while pending:
+            pending = drain(pending, FIRST_COMPLETED)
+
+    complete_callback(scanned_files)
@@ -0,0 +1,75 @@
+from array import array
+from bisect import bisect_left
+
+
+# -------------------- Trigram Index --------------------
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TrigramIndex:
+    """Case-insensitive substring index over a growing list of names.
+
+    Names get consecutive ids in the order they are added. search() looks
+    up the rarest trigram of the query and verifies only its postings.
+    When a query contains the previous one (the user kept typing), only
+    the previous matches and names added since are checked.
+    """
+
+    def __init__(self):
+        self.names = []
+        self.postings = {}
+        self._last_query = ""
+        self._last_ids = None
+        self._last_count = 0
+
+    def add(self, name):
+        doc_id = len(self.names)
+        name = name.lower()
+        self.names.append(name)
+        for gram in trigrams(name):
+            posting = self.postings.get(gram)
+            if posting is None:
+                posting = self.postings[gram] = array("I")
+            posting.append(doc_id)
+        return doc_id
+
+    def clear(self):
+        self.names = []
+        self.postings = {}
+        self._last_query = ""
+        self._last_ids = None
+        self._last_count = 0
+
+    def __len__(self):
+        return len(self.names)
+
+    def search(self, query):
+        """Return the ids (ascending) of names containing `query`."""
+        query = query.lower()
+        names = self.names
+        if not query:
+            ids = list(range(len(names)))
+        elif self._last_ids is not None and self._last_query and self._last_query in query:
+            ids = [i for i in self._last_ids if query in names[i]]
+            ids.extend(self._scan(query, self._last_count))
+        else:
+            ids = self._scan(query, 0)
+        self._last_query = query
+        self._last_ids = ids
+        self._last_count = len(names)
+        return ids
+
+    def _scan(self, query, start):
+        # ids >= start whose name contains query
+        names = self.names
+        if len(query) < 3:
+            return [i for i in range(start, len(names)) if query in names[i]]
+        rarest = None
+        for gram in trigrams(query):
+            posting = self.postings.get(gram)
+            if posting is None:
+                return []
+            if rarest is None or len(posting) < len(rarest):
+                rarest = posting
+        return [i for i in rarest[bisect_left(rarest, start):] if query in names[i]]
@@ -0,0 +1,21 @@
+import os
+import sys
+
+import pytest
+
+# the modules live flat in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import hashcache  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def hash_cache(tmp_path_factory, monkeypatch):
+    """A private shared hash cache per test, never the user's ~/.dmanager one."""
+    path = tmp_path_factory.mktemp("cache") / "hash_cache.db"
+    monkeypatch.setenv("DMANAGER_HASH_CACHE", str(path))
+    hashcache._forget_cache()
+    yield
+    if hashcache._cache is not None:
+        hashcache._cache.flush()
+    hashcache._forget_cache()
@@ -0,0 +1,113 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from analyzer import analyze_file, detect_magic
+from categories import CategoryEngine, sniff
+from hashcache import HashCache
+
+BMP = b"BM" + (1000).to_bytes(4, "little") + bytes(4) + (54).to_bytes(4, "little") \
+    + (40).to_bytes(4, "little") + bytes(40)
+PE = b"MZ" + bytes(58) + (64).to_bytes(4, "little") + b"PE\0\0" + bytes(20)
+ID3 = b"ID3\x03\x00\x00\x00\x00\x10\x7f" + bytes(20)
+MPEG = b"\xff\xfb\x90\x64" + bytes(20)
+GZIP = b"\x1f\x8b\x08\x00" + bytes(20)
+BZIP2 = b"BZh91AY&SY" + bytes(20)
+
+
+def make(path, data):
+    path.write_bytes(data)
+    return path
+
+
+# ---------- Magic Bytes ----------
+@pytest.mark.parametrize("header, kind", [
+    (BMP, "bmp"), (PE, "exe"), (ID3, "mp3"), (MPEG, "mp3"), (GZIP, "gz"), (BZIP2, "bz2"),
+    (b"%PDF-1.7\n", "pdf"), (b"\x89PNG\r\n\x1a\n" + bytes(8), "png"),
+    (bytes(257) + b"ustar\x0000", "tar"), (b"PK\x03\x04" + bytes(26), "zip"),
+])
+def test_detect_magic(header, kind):
+    assert detect_magic(header) == kind
+
+
+@pytest.mark.parametrize("text", [
+    b"BMW service invoice, 2024\n",
+    b"MZ hotel booking confirmation for two nights\n" * 3,
+    b"MZ" + bytes(62),                       # DOS stub without a PE header
+    b"ID3 tags explained: a short guide\n",
+    b"\xff\xfb\x00\x00",                     # free-format bitrate: not a frame we accept
+    b"\x1f\x8b\x07\x00",                     # not deflate
+    b"BZh is how bzip2 files start\n",
+])
+def test_short_signatures_need_confirmation(text):
+    assert detect_magic(text) is None
+
+
+# ---------- Content Sniffing ----------
+def test_sniff_caches_on_the_opened_file(tmp_path):
+    cache = HashCache(":memory:")
+    png = make(tmp_path / "a", b"\x89PNG\r\n\x1a\n" + bytes(8))
+    assert sniff(png, cache=cache) == "png"
+    assert cache.get(os.stat(png), "magic:2") == "png"
+    png.write_bytes(b"%PDF-1.7\n" + bytes(7))  # same size, new mtime
+    os.utime(png, ns=(1, 1))
+    assert sniff(png, cache=cache) == "pdf"
+
+
+def test_sniff_ignores_inode_less_stat_results(tmp_path):
+    # a Windows DirEntry.stat() has st_dev == st_ino == 0: two different files
+    # with the same size and mtime must not share a cached kind
+    cache = HashCache(":memory:")
+    pdf = make(tmp_path / "a", b"%PDF-1.7\n" + bytes(7))
+    png = make(tmp_path / "b", b"\x89PNG\r\n\x1a\n" + bytes(8))
+    for path in (pdf, png):
+        os.utime(path, ns=(10**18, 10**18))
+    for path, kind in ((pdf, "pdf"), (png, "png")):
+        st = os.stat(path)
+        entry_stat = SimpleNamespace(st_dev=0, st_ino=0, st_size=st.st_size,
+                                     st_mtime_ns=st.st_mtime_ns)
+        assert sniff(path, entry_stat, cache=cache) == kind
+
+
+def test_sniff_reuses_kinds_stored_by_deep_scan(tmp_path, monkeypatch):
+    cache = HashCache(":memory:")
+    png = make(tmp_path / "a", b"\x89PNG\r\n\x1a\n" + bytes(8))
+    analyze_file(png, cache=cache)
+    monkeypatch.setattr("categories.detect_magic", lambda header: pytest.fail("re-read"))
+    assert sniff(png, cache=cache) == "png"
+
+
+def test_sniff_skips_empty_files_without_opening(tmp_path):
+    assert sniff(tmp_path / "missing", SimpleNamespace(st_size=0)) is None
+
+
+# ---------- Classification ----------
+@pytest.fixture
+def engine():
+    return CategoryEngine()
+
+
+def test_content_wins_over_missing_or_wrong_extension(tmp_path, engine):
+    assert engine.classify_file(make(tmp_path / "scan", b"%PDF-1.4\n")) == "Documents"
+    assert engine.classify_file(make(tmp_path / "photo.txt", b"\x89PNG\r\n\x1a\n")) == "Images"
+    assert engine.classify_file(make(tmp_path / "bmp_noext", BMP)) == "Images"
+
+
+def test_text_starting_like_a_signature_stays_text(tmp_path, engine):
+    assert engine.classify_file(make(tmp_path / "cars", b"BMW service invoice\n")) == "Others"
+    assert engine.classify_file(make(tmp_path / "trip.txt", b"MZ hotel\n" * 10)) == "Documents"
+
+
+def test_ambiguous_kinds_trust_a_known_extension(tmp_path, engine):
+    zip_header = b"PK\x03\x04" + bytes(26)
+    assert engine.classify_file(make(tmp_path / "report.docx", zip_header)) == "Documents"
+    assert engine.classify_file(make(tmp_path / "bundle", zip_header)) == "Archives"
+    assert engine.classify_file(make(tmp_path / "setup.msi", PE)) == "Programs"
+    assert engine.classify_file(make(tmp_path / "song.m4a", b"\0\0\0\x20ftypM4A ")) == "Music"
+
+
+def test_unreadable_file_falls_back_to_extension(tmp_path, engine):
+    assert engine.classify_file(tmp_path / "missing.mp3") == "Music"
+    assert engine.classify_file(tmp_path / "missing", default="Files") == "Files"
+    assert engine.classify_file(tmp_path, is_dir=True) == "Folders"
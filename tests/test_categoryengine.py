@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+import categories
+from categories import CategoryEngine, load_rules
+
+
+@pytest.fixture
+def engine():
+    return CategoryEngine()
+
+
+@pytest.mark.parametrize("name, category", [
+    ("photo.JPG", "Images"),
+    ("backup.tar.gz", "Archives"),
+    ("backup.TAR.GZ", "Archives"),
+    ("notes.gz", "Archives"),
+    ("/some/dir.with.dots/clip.mp4", "Videos"),
+    ("archive.tar", "Archives"),
+    (".bashrc", "Others"),
+    ("README", "Others"),
+    ("trailing.", "Others"),
+])
+def test_classify_by_suffix(engine, name, category):
+    assert engine.classify(name) == category
+
+
+def test_longest_suffix_wins(engine):
+    engine.update({"Backups": [".tar.gz"]})
+    assert engine.classify("home.tar.gz") == "Backups"
+    assert engine.classify("log.gz") == "Archives"
+    assert ".tar.gz" not in engine.rules["Archives"]
+
+
+def test_later_rules_override_and_suffixes_are_normalised(engine):
+    engine.update({"Code": ["py", ".SH"]})
+    assert engine.classify("run.sh") == "Code"
+    assert engine.classify("x.py") == "Code"
+    assert ".sh" not in engine.rules["Programs"]
+
+
+def test_folders_and_defaults(engine):
+    assert engine.classify("anything.jpg", is_dir=True) == "Folders"
+    assert engine.classify("noext", default=None) is None
+    assert "Folders" not in engine.categories
+    assert CategoryEngine({"Only": [".x"]}).categories == ["Only"]
+
+
+def test_user_rule_file(tmp_path, monkeypatch):
+    rules = tmp_path / "categories.json"
+    rules.write_text(json.dumps({"Ebooks": [".epub"]}))
+    monkeypatch.setenv("DMANAGER_CATEGORIES", str(rules))
+    monkeypatch.setattr(categories, "_engine", None)
+    assert categories.categorize("book.epub") == "Ebooks"
+    assert categories.categorize("a.png") == "Images"
+
+    rules.write_text(json.dumps(["not", "a", "dict"]))
+    with pytest.raises(ValueError):
+        load_rules(rules)
@@ -0,0 +1,57 @@
+import os
+
+import pytest
+
+from duplicates import find_duplicates, group_duplicates, partial_hash
+from profiling import Profiler
+from walker import TreeWalker
+
+BLOCK = 1024
+
+
+def make(path, data):
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_same_head_and_tail_but_different_middle(tmp_path):
+    head, tail = os.urandom(BLOCK), os.urandom(BLOCK)
+    a = make(tmp_path / "a", head + b"a" * 5000 + tail)
+    b = make(tmp_path / "b", head + b"b" * 5000 + tail)
+    c = make(tmp_path / "c", head + b"a" * 5000 + tail)
+    assert partial_hash(a, 7048, BLOCK) == partial_hash(b, 7048, BLOCK)
+    assert list(group_duplicates([a, b, c], block=BLOCK).values()) == [[a, c]]
+
+
+@pytest.mark.parametrize("size", [2 * BLOCK - 1, 2 * BLOCK, 2 * BLOCK + 1])
+def test_two_block_boundary(tmp_path, size):
+    # files up to 2*block are hashed whole; one byte more needs a full pass
+    # to tell apart a difference hidden between head and tail
+    data = os.urandom(size)
+    a = make(tmp_path / "a", data)
+    b = make(tmp_path / "b", data)
+    middle = bytearray(data)
+    middle[size // 2] ^= 0xFF
+    c = make(tmp_path / "c", bytes(middle))
+    profiler = Profiler("test")
+    assert list(group_duplicates([a, b, c], block=BLOCK, profiler=profiler).values()) == [[a, b]]
+    read = profiler.finish(write=False)["counters"]["bytes_read"]
+    assert read == 3 * min(size, 2 * BLOCK) + (3 * size if size > 2 * BLOCK else 0)
+
+
+def test_sizes_pair_files_and_order_is_kept(tmp_path):
+    x = make(tmp_path / "x", b"same")
+    lone = make(tmp_path / "lone", b"unique size")
+    y = make(tmp_path / "y", b"same")
+    z = make(tmp_path / "z", b"diff")
+    w = make(tmp_path / "w", b"same")
+    groups = group_duplicates([w, x, lone, y, z, x])  # repeated paths count once
+    assert list(groups.values()) == [[w, x, y]]
+    assert find_duplicates([w, x, y]) == [(x, w), (y, w)]
+
+
+def test_walker_entries_and_unreadable_files(tmp_path):
+    make(tmp_path / "a", b"1234")
+    make(tmp_path / "b", b"1234")
+    entries = list(TreeWalker([tmp_path]))
+    assert len(group_duplicates(entries + [str(tmp_path / "missing")])) == 1
@@ -0,0 +1,65 @@
+import math
+import os
+
+import pytest
+
+import entropy
+from entropy import ByteHistogram, STRIDE_WINDOW, file_entropy, sample_ranges, shannon_entropy
+
+MB = 1024 * 1024
+
+
+def test_shannon_entropy():
+    assert shannon_entropy([], 0) == 0.0
+    assert shannon_entropy([10], 10) == 0.0
+    assert shannon_entropy([1] * 256, 256) == 8.0
+    assert math.isclose(shannon_entropy([1, 1], 2), 1.0)
+
+
+@pytest.mark.parametrize("numpy", [True, False])
+def test_histogram_backends_agree(monkeypatch, numpy):
+    if numpy and entropy.np is None:
+        pytest.skip("NumPy not installed")
+    if not numpy:
+        monkeypatch.setattr(entropy, "np", None)
+    hist = ByteHistogram()
+    hist.update(bytes(range(256)) * 4)
+    hist.update(memoryview(b"\0" * 1024)[:0])
+    assert hist.total == 1024 and hist.entropy() == 8.0
+
+
+def covered(ranges):
+    return sum(length for _, length in ranges)
+
+
+@pytest.mark.parametrize("mode", ["full", "headtail", "stride"])
+def test_small_files_are_read_completely(mode):
+    assert sample_ranges(0, mode) == []
+    assert sample_ranges(1000, mode) == [(0, 1000)]
+
+
+@pytest.mark.parametrize("sample_bytes", [2, 1000, 100_000, 2 * STRIDE_WINDOW - 1,
+                                          2 * STRIDE_WINDOW, MB, 3 * MB + 17])
+def test_stride_spans_the_file(sample_bytes):
+    size = 64 * MB
+    ranges = sample_ranges(size, "stride", sample_bytes)
+    assert len(ranges) >= 2
+    assert ranges[0][0] == 0 and sum(ranges[-1]) == size
+    assert covered(ranges) <= sample_bytes
+    assert all(a + n <= b for (a, n), (b, _) in zip(ranges, ranges[1:]))
+
+
+def test_headtail_and_unknown_mode():
+    assert sample_ranges(10 * MB, "headtail", MB) == [(0, MB // 2), (10 * MB - MB // 2, MB // 2)]
+    assert covered(sample_ranges(10 * MB, "full")) == 10 * MB
+    with pytest.raises(ValueError):
+        sample_ranges(10, "bogus")
+
+
+def test_stride_sees_more_than_the_head(tmp_path):
+    # zeros followed by random data: a head-only sample would report 0 bits
+    path = tmp_path / "f.bin"
+    path.write_bytes(bytes(MB) + os.urandom(MB))
+    assert file_entropy(path, "stride", sample_bytes=100_000) > 3
+    assert file_entropy(path, "headtail", sample_bytes=100_000) > 3
+    assert file_entropy(path, "full") > 4
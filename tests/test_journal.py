@@ -0,0 +1,296 @@
+import os
+import time
+
+import pytest
+
+import journal as journal_mod
+from journal import Journal, rollback_job, revert_step
+from mover import MoveEngine, move_path
+
+
+@pytest.fixture
+def journal(tmp_path):
+    j = Journal(tmp_path / "journal.jsonl")
+    yield j
+    j.close()
+
+
+def make(path, data=b"data"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return path
+
+
+def run(job):
+    job.start()
+    job.join(10)
+    events = []
+    while not job.events.empty():
+        events.append(job.events.get())
+    assert events[-1][0] == "done"
+    return events[-1][1]
+
+
+def moved(journal, tx, src, dst):
+    seq = journal.intent(tx, "move", src, dst)
+    move_path(src, dst)
+    journal.ok(tx, seq)
+    return seq
+
+
+# ---------- Summaries ----------
+def test_transactions_summary_is_incremental(journal, tmp_path):
+    src = make(tmp_path / "a" / "f.txt")
+    tx = journal.begin("Organize", "test", {"target": "t"})
+    moved(journal, tx, src, tmp_path / "f.txt")
+    [info] = journal.transactions()
+    assert (info.id, info.steps, info.live, info.ended) == (tx, 1, 1, None)
+    assert info.meta == {"target": "t"}
+
+    journal.end(tx)
+    other = journal.begin("Move", "other")
+    assert [t.id for t in journal.transactions()] == [tx, other]
+    assert [t.id for t in journal.transactions("test")] == [tx]
+    assert journal.transactions("test")[0].ended == "commit"
+    assert journal.incomplete() == []  # `other` is running in this process
+
+
+def test_torn_line_is_ignored_and_terminated(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    j = Journal(path)
+    tx = j.begin("Organize", "test")
+    j.intent(tx, "move", "a", "b")
+    j.close()
+    with open(path, "ab") as f:
+        f.write(b'{"op":"ok","id":"' + tx.encode() + b'","se')  # crash mid-record
+
+    j = Journal(path)
+    try:
+        assert j.transactions()[0].live == 0
+        j.ok(tx, 1)
+        assert j.transactions()[0].live == 1
+        assert [s.state for s in j.steps(tx)] == ["done"]
+    finally:
+        j.close()
+
+
+def test_reopened_journal_lists_interrupted_transaction(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    j = Journal(path)
+    tx = j.begin("Organize", "test")
+    j.intent(tx, "move", "a", "b")
+    j.close()  # no end record: the app stopped mid-operation
+
+    j = Journal(path)
+    try:
+        assert [t.id for t in j.incomplete("test")] == [tx]
+        assert [s.state for s in j.steps(tx)] == ["pending"]
+    finally:
+        j.close()
+
+
+def test_running_transactions_are_not_interrupted(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    crashed = Journal(path)
+    old = crashed.begin("Organize", "test")
+    crashed.intent(old, "move", "a", "b")
+    crashed.close()
+
+    j = Journal(path)
+    try:
+        assert [t.id for t in j.incomplete("test")] == [old]
+        running = j.begin("Organize", "test")  # e.g. started before the recovery check
+        assert [t.id for t in j.incomplete("test")] == [old]
+        j.resume(old)
+        assert j.incomplete("test") == []
+        other = Journal(path)  # another process sees both as unended
+        try:
+            assert {t.id for t in other.incomplete("test")} == {old, running}
+        finally:
+            other.close()
+    finally:
+        j.close()
+
+
+# ---------- Settle / Resume ----------
+def test_settle_resolves_pending_steps_from_disk(journal, tmp_path):
+    tx = journal.begin("Organize", "test")
+    # the move happened before the crash, but its ok was never written
+    done_src = make(tmp_path / "src" / "done.txt")
+    done_dst = tmp_path / "dst" / "done.txt"
+    journal.intent(tx, "move", done_src, done_dst)
+    done_dst.parent.mkdir()
+    os.rename(done_src, done_dst)
+    # a cross-device move that crashed mid-copy: source intact, partial destination
+    half_src = make(tmp_path / "src" / "half.txt", b"0123456789")
+    half_dst = make(tmp_path / "dst" / "half.txt", b"0123")
+    journal.intent(tx, "move", half_src, half_dst)
+    # a copy that crashed midway
+    copy_src = make(tmp_path / "src" / "copy.txt")
+    copy_dst = make(tmp_path / "dst" / "copy.txt", b"da")
+    journal.intent(tx, "copy", copy_src, copy_dst)
+    # a move that never started
+    todo_src = make(tmp_path / "src" / "todo.txt")
+    journal.intent(tx, "move", todo_src, tmp_path / "dst" / "todo.txt")
+
+    assert journal.settle(tx) == 1
+    assert [s.state for s in journal.steps(tx)] == ["done", "failed", "failed", "failed"]
+    assert done_dst.exists()
+    assert half_src.read_bytes() == b"0123456789" and not half_dst.exists()
+    assert copy_src.exists() and not copy_dst.exists()
+    assert todo_src.exists()
+    assert journal.transactions()[0].live == 1
+    assert journal.settle(tx) == 0  # nothing left pending
+
+
+def test_resume_continues_sequence(journal, tmp_path):
+    tx = journal.begin("Organize", "test")
+    moved(journal, tx, make(tmp_path / "a.txt"), tmp_path / "b.txt")
+    journal.end(tx, "cancelled")
+    assert journal.transactions()[0].ended == "cancelled"
+
+    journal.resume(tx)
+    assert journal.transactions()[0].ended is None
+    seq = moved(journal, tx, make(tmp_path / "c.txt"), tmp_path / "d.txt")
+    assert seq == 2
+    journal.end(tx)
+    info = journal.transactions()[0]
+    assert (info.steps, info.live, info.ended) == (2, 2, "commit")
+    assert [s.seq for s in journal.steps(tx)] == [1, 2]
+
+
+# ---------- Rollback ----------
+def test_rollback_restores_files_newest_first(journal, tmp_path):
+    tx = journal.begin("Organize", "test")
+    pairs = []
+    for i in range(5):
+        src = make(tmp_path / "src" / f"f{i}.txt", str(i).encode())
+        dst = tmp_path / "dst" / f"f{i}.txt"
+        dst.parent.mkdir(exist_ok=True)
+        moved(journal, tx, src, dst)
+        pairs.append((src, dst))
+    journal.end(tx)
+
+    result = run(rollback_job(journal, tx, MoveEngine(2)))
+    assert (result.done, result.errors) == (5, 0)
+    for i, (src, dst) in enumerate(pairs):
+        assert src.read_bytes() == str(i).encode() and not dst.exists()
+    assert {s.state for s in journal.steps(tx)} == {"undone"}
+    assert journal.transactions()[0].live == 0
+
+
+def test_rollback_uses_free_name_when_original_is_taken(journal, tmp_path):
+    tx = journal.begin("Organize", "test")
+    src = make(tmp_path / "src" / "f.txt", b"moved")
+    dst = tmp_path / "dst" / "f.txt"
+    dst.parent.mkdir()
+    moved(journal, tx, src, dst)
+    journal.end(tx)
+    make(src, b"new file")
+
+    run(rollback_job(journal, tx, MoveEngine(1)))
+    assert src.read_bytes() == b"new file"
+    assert (tmp_path / "src" / "f(1).txt").read_bytes() == b"moved"
+
+
+def test_rollback_settles_interrupted_copy_first(journal, tmp_path):
+    tx = journal.begin("Upload", "test")
+    done_src = make(tmp_path / "src" / "a.txt")
+    done_dst = tmp_path / "dst" / "a.txt"
+    seq = journal.intent(tx, "copy", done_src, done_dst)
+    make(done_dst)
+    journal.ok(tx, seq)
+    partial = make(tmp_path / "dst" / "b.txt", b"par")
+    journal.intent(tx, "copy", make(tmp_path / "src" / "b.txt"), partial)
+
+    result = run(rollback_job(journal, tx, MoveEngine(1)))
+    assert result.done == 1
+    assert not done_dst.exists() and not partial.exists()
+    assert done_src.exists()
+    assert [s.state for s in journal.steps(tx)] == ["undone", "failed"]
+
+
+def test_rollback_skips_files_gone_from_destination(journal, tmp_path):
+    tx = journal.begin("Organize", "test")
+    src = make(tmp_path / "src" / "f.txt")
+    dst = tmp_path / "dst" / "f.txt"
+    dst.parent.mkdir()
+    moved(journal, tx, src, dst)
+    journal.end(tx)
+    dst.unlink()
+
+    result = run(rollback_job(journal, tx, MoveEngine(1)))
+    assert (result.done, result.errors) == (1, 0)
+    assert not src.exists()
+    assert journal.steps(tx)[0].state == "undone"
+
+
+def test_revert_step_deletes_copies(journal, tmp_path):
+    tx = journal.begin("Upload", "test")
+    src = make(tmp_path / "a.txt", b"12345")
+    dst = make(tmp_path / "b.txt", b"12345")
+    seq = journal.intent(tx, "copy", src, dst)
+    journal.ok(tx, seq)
+    assert revert_step(journal.steps(tx)[0]) == 5
+    assert src.exists() and not dst.exists()
+
+
+# ---------- Compaction ----------
+def test_compact_keeps_only_transactions_that_matter(journal, tmp_path):
+    undone = journal.begin("Organize", "test")
+    moved(journal, undone, make(tmp_path / "u.txt"), tmp_path / "u2.txt")
+    journal.end(undone)
+    run(rollback_job(journal, undone, MoveEngine(1)))
+
+    empty = journal.begin("Move", "test")
+    journal.end(empty, "cancelled")
+
+    old = journal.begin("Organize", "test")
+    moved(journal, old, make(tmp_path / "o.txt"), tmp_path / "o2.txt")
+    journal.end(old)
+
+    recent = journal.begin("Organize", "test")
+    moved(journal, recent, make(tmp_path / "r.txt"), tmp_path / "r2.txt")
+    journal.end(recent)
+
+    running = journal.begin("Organize", "test")
+    journal.intent(running, "move", tmp_path / "x.txt", tmp_path / "y.txt")
+
+    size = os.path.getsize(journal.path)
+    assert journal.compact(keep=1)
+    assert os.path.getsize(journal.path) < size
+    assert [t.id for t in journal.transactions()] == [recent, running]
+    assert [s.state for s in journal.steps(recent)] == ["done"]
+    assert [s.state for s in journal.steps(running)] == ["pending"]
+
+    # the file is still appended to after the swap
+    journal.ok(running, 1)
+    journal.end(running)
+    assert journal.transactions()[-1].ended == "commit"
+    with open(journal.path, "rb") as f:
+        assert all(line.endswith(b"}\n") for line in f)
+
+
+@pytest.mark.skipif(journal_mod.fcntl is None, reason="needs flock")
+def test_compact_waits_for_other_users(journal, tmp_path):
+    tx = journal.begin("Move", "test")
+    journal.end(tx)
+    other = Journal(journal.path)  # e.g. a cli.py run using the same journal
+    try:
+        assert not journal.compact()
+        assert [t.id for t in journal.transactions()] == [tx]
+    finally:
+        other.close()
+    assert journal.compact()
+    assert journal.transactions() == []
+
+
+def test_compact_runs_in_background_past_threshold(journal, tmp_path, monkeypatch):
+    monkeypatch.setattr(journal_mod, "COMPACT_BYTES", 1)
+    tx = journal.begin("Move", "test")
+    journal.end(tx)  # triggers maybe_compact
+    for _ in range(100):
+        if not journal._compacting:
+            break
+        time.sleep(0.05)
+    assert journal.transactions() == []
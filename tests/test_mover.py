@@ -0,0 +1,131 @@
+import errno
+import os
+
+import pytest
+
+import mover
+from mover import MoveEngine, copy_file, move_path, tree_size
+
+
+def make(path, data=b"data"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return path
+
+
+@pytest.fixture
+def folder(tmp_path):
+    src = tmp_path / "src" / "folder"
+    make(src / "a.txt", b"12345")
+    make(src / "sub" / "b.txt", b"1234567890")
+    make(src / "sub" / "deeper" / "c.txt", b"")
+    return src
+
+
+@pytest.fixture
+def cross_device(monkeypatch):
+    # make every move take the copy-then-delete path
+    monkeypatch.setattr(mover, "same_device", lambda src, dst: False)
+
+
+def test_rename_returns_file_size_and_zero_for_folders(tmp_path, folder):
+    src = make(tmp_path / "f.txt", b"12345")
+    assert move_path(src, tmp_path / "g.txt") == 5
+    assert not src.exists() and (tmp_path / "g.txt").read_bytes() == b"12345"
+    assert move_path(folder, tmp_path / "moved") == 0
+    assert tree_size(tmp_path / "moved") == (3, 15)
+
+
+def test_existing_destination_is_never_overwritten(tmp_path, cross_device):
+    src = make(tmp_path / "f.txt", b"new")
+    dst = make(tmp_path / "g.txt", b"old")
+    with pytest.raises(FileExistsError):
+        move_path(src, dst)
+    assert src.read_bytes() == b"new" and dst.read_bytes() == b"old"
+
+
+def test_exdev_from_rename_falls_back_to_copy(tmp_path, folder, monkeypatch):
+    def rename(src, dst):
+        raise OSError(errno.EXDEV, "Invalid cross-device link")
+    monkeypatch.setattr(mover.os, "rename", rename)
+
+    src = make(tmp_path / "f.txt", b"x" * 1000)
+    assert move_path(src, tmp_path / "g.txt") == 1000
+    assert not src.exists() and (tmp_path / "g.txt").read_bytes() == b"x" * 1000
+
+    assert MoveEngine(1).move(folder, tmp_path / "moved") == 15
+    assert not folder.exists()
+    assert (tmp_path / "moved" / "sub" / "b.txt").read_bytes() == b"1234567890"
+
+
+def test_other_rename_errors_are_raised(tmp_path, monkeypatch):
+    def rename(src, dst):
+        raise PermissionError(errno.EACCES, "Permission denied")
+    monkeypatch.setattr(mover.os, "rename", rename)
+    src = make(tmp_path / "f.txt")
+    with pytest.raises(PermissionError):
+        move_path(src, tmp_path / "g.txt")
+    assert src.exists()
+
+
+def test_short_file_copy_keeps_the_source(tmp_path, cross_device, monkeypatch):
+    def short_copy(src, dst, buffer_size=mover.COPY_BUFFER):
+        with open(src, "rb") as f, open(dst, "wb") as out:
+            return out.write(f.read()[:-1])
+    monkeypatch.setattr(mover, "copy_file", short_copy)
+
+    src = make(tmp_path / "f.txt", b"12345")
+    with pytest.raises(OSError) as err:
+        move_path(src, tmp_path / "g.txt")
+    assert err.value.errno == errno.EIO
+    assert src.read_bytes() == b"12345" and not (tmp_path / "g.txt").exists()
+
+
+def test_folder_copy_missing_a_file_keeps_the_source(tmp_path, folder, cross_device, monkeypatch):
+    real_copy = mover.copy_file
+
+    def skip_one(src, dst, buffer_size=mover.COPY_BUFFER):
+        if os.path.basename(src) == "c.txt":  # empty: only the file count can catch it
+            return 0
+        return real_copy(src, dst, buffer_size)
+    monkeypatch.setattr(mover, "copy_file", skip_one)
+
+    with pytest.raises(OSError) as err:
+        move_path(folder, tmp_path / "moved")
+    assert err.value.errno == errno.EIO and "2 of 3 files" in str(err.value)
+    assert tree_size(folder) == (3, 15) and not (tmp_path / "moved").exists()
+
+
+def test_folder_copy_with_short_file_keeps_the_source(tmp_path, folder, cross_device, monkeypatch):
+    real_copy = mover.copy_file
+
+    def truncate_one(src, dst, buffer_size=mover.COPY_BUFFER):
+        copied = real_copy(src, dst, buffer_size)
+        if os.path.basename(src) == "b.txt":
+            os.truncate(dst, 3)
+        return copied
+    monkeypatch.setattr(mover, "copy_file", truncate_one)
+
+    with pytest.raises(OSError, match="8 of 15 bytes"):
+        move_path(folder, tmp_path / "moved")
+    assert tree_size(folder) == (3, 15) and not (tmp_path / "moved").exists()
+
+
+def test_failed_folder_copy_removes_partial_destination(tmp_path, folder, cross_device, monkeypatch):
+    def fail(src, dst, buffer_size=mover.COPY_BUFFER):
+        raise OSError(errno.ENOSPC, "No space left on device")
+    monkeypatch.setattr(mover, "copy_file", fail)
+    with pytest.raises(OSError):
+        move_path(folder, tmp_path / "moved")
+    assert tree_size(folder) == (3, 15) and not (tmp_path / "moved").exists()
+
+
+@pytest.mark.parametrize("size", [0, 1, 100_000])
+def test_copy_file_buffer_fallback(tmp_path, monkeypatch, size):
+    def unsupported(fin, fout, size):
+        raise OSError(errno.EXDEV, "Invalid cross-device link")
+    monkeypatch.setattr(mover, "_copy_range", unsupported)
+    data = os.urandom(size)
+    src = make(tmp_path / "f.bin", data)
+    assert copy_file(src, tmp_path / "g.bin", buffer_size=4096) == size
+    assert (tmp_path / "g.bin").read_bytes() == data
@@ -0,0 +1,37 @@
+from nameindex import NameIndex
+
+
+def test_free_name_is_returned_unchanged(tmp_path):
+    index = NameIndex()
+    assert index.reserve(tmp_path / "a.txt") == tmp_path / "a.txt"
+
+
+def test_suffixes_skip_names_on_disk_and_reserved(tmp_path):
+    for name in ("a.txt", "a(1).txt", "a(3).txt"):
+        (tmp_path / name).write_text("x")
+    index = NameIndex()
+    got = [index.reserve(tmp_path / "a.txt").name for _ in range(3)]
+    assert got == ["a(2).txt", "a(4).txt", "a(5).txt"]
+
+
+def test_counters_are_per_directory_stem_and_ext(tmp_path):
+    (tmp_path / "sub").mkdir()
+    index = NameIndex()
+    for path in (tmp_path / "a.txt", tmp_path / "a.jpg", tmp_path / "sub" / "a.txt"):
+        assert index.reserve(path) == path
+        assert index.reserve(path).name == "a(1)" + path.suffix
+
+
+def test_discard_frees_a_reservation(tmp_path):
+    index = NameIndex()
+    first = index.reserve(tmp_path / "a.txt")
+    index.discard(first)
+    assert index.reserve(tmp_path / "a.txt") == first
+
+
+def test_add_marks_name_taken_and_custom_pattern(tmp_path):
+    index = NameIndex("{stem}_{n}{ext}")
+    index.add(tmp_path / "a.txt")
+    assert index.reserve(tmp_path / "a.txt").name == "a_1.txt"
+    index.clear()
+    assert index.reserve(tmp_path / "a.txt") == tmp_path / "a.txt"
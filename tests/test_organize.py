@@ -0,0 +1,124 @@
+import os
+
+import pytest
+
+import mover
+from journal import Journal, rollback_job
+from mover import MoveEngine
+from organize import organize_job
+from profiling import Profiler
+
+PNG = b"\x89PNG\r\n\x1a\n" + bytes(8)
+
+
+@pytest.fixture
+def journal(tmp_path):
+    j = Journal(tmp_path / "journal.jsonl")
+    yield j
+    j.close()
+
+
+@pytest.fixture
+def sources(tmp_path):
+    src = tmp_path / "src"
+    (src / "sub").mkdir(parents=True)
+    (src / "notes.txt").write_text("hello")
+    (src / "sub" / "picture").write_bytes(PNG)  # no extension: sorted by content
+    (src / "sub" / "notes.txt").write_text("other notes")
+    (src / "data.unknownext").write_text("?")
+    return src
+
+
+def run(job):
+    job.start()
+    job.join(10)
+    events = []
+    while not job.events.empty():
+        events.append(job.events.get())
+    assert events[-1][0] == "done"
+    return events[-1][1], [e for e in events if e[0] == "error"]
+
+
+def listing(folder):
+    return sorted(os.path.relpath(os.path.join(d, f), folder).replace(os.sep, "/")
+                  for d, _, files in os.walk(folder) for f in files)
+
+
+def test_organize_by_category_and_undo(tmp_path, sources, journal):
+    target = tmp_path / "sorted"
+    profiler = Profiler("test")
+    job = organize_job([sources], target, MoveEngine(2), journal, "test", profiler=profiler)
+    result, errors = run(job)
+    assert (result.done, result.errors, errors) == (4, 0, [])
+    assert listing(target) == ["Documents/notes(1).txt", "Documents/notes.txt",
+                               "Images/picture", "Others/data.unknownext"]
+    assert listing(sources) == []
+
+    [tx] = journal.transactions("test")
+    assert (tx.id, tx.live, tx.ended) == (job.tx, 4, "commit")
+    assert tx.meta["subfolders"] is True
+    counters = profiler.finish(write=False)["counters"]
+    assert counters["files"] == 4 and counters["bytes_moved"] == 5 + 16 + 11 + 1
+
+    run(rollback_job(journal, job.tx, MoveEngine(2)))
+    assert listing(sources) == ["data.unknownext", "notes.txt", "sub/notes.txt", "sub/picture"]
+
+
+def test_flat_organize_with_pattern_and_default(tmp_path, sources, journal):
+    target = tmp_path / "sorted"
+    job = organize_job([sources], target, MoveEngine(1), journal, "test", subfolders=False,
+                       pattern="{stem} ({n}){ext}")
+    run(job)
+    assert listing(target) == ["data.unknownext", "notes (1).txt", "notes.txt", "picture"]
+
+    (tmp_path / "more").mkdir()
+    (tmp_path / "more" / "x").write_text("plain text")
+    job = organize_job([tmp_path / "more"], target, MoveEngine(1), journal, "test", default="Files")
+    run(job)
+    assert (target / "Files" / "x").exists()
+
+
+def test_target_inside_source_is_not_walked(tmp_path, sources, journal):
+    target = sources / "sorted"
+    result, _ = run(organize_job([sources], target, MoveEngine(2), journal, "test"))
+    assert result.done == 4
+    assert listing(sources) == ["sorted/" + p for p in listing(target)]
+
+
+def test_dry_run_changes_nothing(tmp_path, sources, journal):
+    target = tmp_path / "sorted"
+    job = organize_job([sources], target, MoveEngine(2), None, "test", dry_run=True)
+    result, _ = run(job)
+    assert job.tx is None and result.done == 4
+    assert sorted(os.path.relpath(dst, target) for _, dst in job.planned) == [
+        os.path.join("Documents", "notes(1).txt"), os.path.join("Documents", "notes.txt"),
+        os.path.join("Images", "picture"), os.path.join("Others", "data.unknownext")]
+    assert not target.exists() and len(listing(sources)) == 4
+    assert journal.transactions() == []
+
+
+def test_failed_move_is_journaled_and_frees_its_name(tmp_path, sources, journal, monkeypatch):
+    real_move = mover.move_path
+
+    def flaky(src, dst, buffer_size=mover.COPY_BUFFER):
+        if os.path.basename(src) == "picture":
+            raise OSError(5, "I/O error")
+        return real_move(src, dst, buffer_size)
+    monkeypatch.setattr(mover, "move_path", flaky)
+
+    job = organize_job([sources], tmp_path / "sorted", MoveEngine(2), journal, "test")
+    result, errors = run(job)
+    assert (result.done, result.errors, len(errors)) == (3, 1, 1)
+    assert (sources / "sub" / "picture").exists()
+    states = sorted(s.state for s in journal.steps(job.tx))
+    assert states == ["done", "done", "done", "failed"]
+    assert journal.transactions()[0].ended == "commit"
+
+
+def test_resume_continues_the_transaction(tmp_path, sources, journal):
+    target = tmp_path / "sorted"
+    tx = journal.begin("Organize", "test", {"target": str(target)})
+    job = organize_job([sources], target, MoveEngine(1), journal, "test", resume=tx)
+    run(job)
+    assert job.tx == tx and [t.id for t in journal.transactions()] == [tx]
+    assert journal.transactions()[0].live == 4
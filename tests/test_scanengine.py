@@ -0,0 +1,25 @@
+import os
+from types import SimpleNamespace
+
+from hashcache import HashCache, compute_md5
+from scanengine import WorkerCache, known_digests, scan_file
+
+
+def test_known_digests_key_on_a_full_stat(tmp_path):
+    # a Windows DirEntry.stat() has no device or inode; the worker keys on fstat
+    path = tmp_path / "a.bin"
+    path.write_bytes(os.urandom(1000))
+    cache = HashCache(":memory:")
+    cache.put(os.stat(path), compute_md5(path))
+    st = os.stat(path)
+    entry = SimpleNamespace(path=str(path), stat=lambda: SimpleNamespace(
+        st_dev=0, st_ino=0, st_size=st.st_size, st_mtime_ns=st.st_mtime_ns))
+
+    worker = WorkerCache(known_digests(entry, cache))
+    scan_file(str(path), cache=worker)
+    assert worker.known and not [algo for _, _, algo in worker.new if algo == "md5"]
+
+
+def test_known_digests_of_a_vanished_file(tmp_path):
+    entry = SimpleNamespace(path=str(tmp_path / "gone"), stat=lambda: os.stat("/nonexistent"))
+    assert known_digests(entry, HashCache(":memory:")) == {}
@@ -0,0 +1,52 @@
+from searchindex import TrigramIndex
+
+
+def brute(index, query):
+    return [i for i, name in enumerate(index.names) if query.lower() in name]
+
+
+def make(names):
+    index = TrigramIndex()
+    for name in names:
+        index.add(name)
+    return index
+
+
+NAMES = ["Holiday.JPG", "holiday_2.jpg", "report.pdf", "Report-final.PDF",
+         "notes.txt", "ho.txt", "photo.png"]
+
+
+def test_search_matches_substring_case_insensitively():
+    index = make(NAMES)
+    for query in ("", "h", "ho", "hol", "HOLIDAY", ".pdf", "port", "xyz", "o.t"):
+        index.clear()
+        for name in NAMES:
+            index.add(name)
+        assert index.search(query) == brute(index, query), query
+
+
+def test_typing_narrows_previous_results():
+    index = make(NAMES)
+    for query in ("r", "re", "rep", "repo", "report", "report-", "report-f"):
+        assert index.search(query) == brute(index, query), query
+
+
+def test_names_added_between_searches_are_found():
+    index = make(NAMES)
+    assert index.search("rep") == [2, 3]
+    index.add("reply.eml")
+    index.add("prep.doc")
+    assert index.search("rep") == [2, 3, 7, 8]
+    assert index.search("repl") == [7]
+    index.add("REPLAY.mp4")
+    assert index.search("repl") == [7, 9]
+    assert index.search("reply") == [7]
+    index.add("my reply.txt")
+    assert index.search("reply") == [7, 10]
+
+
+def test_new_query_not_containing_previous_rescans():
+    index = make(NAMES)
+    assert index.search("holiday") == [0, 1]
+    assert index.search("photo") == [6]
+    assert index.search("o") == brute(index, "o")
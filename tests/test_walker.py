@@ -0,0 +1,62 @@
+import os
+
+import pytest
+
+from walker import ParallelWalker, TreeWalker, dedupe_roots
+
+
+@pytest.fixture
+def tree(tmp_path):
+    for rel in ("a/1.txt", "a/b/2.txt", "a/b/c/3.txt", "a/d/4.txt",
+                "e/5.txt", "e/f/6.txt", "target/7.txt", "top.txt"):
+        path = tmp_path / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(rel)
+    return tmp_path
+
+
+def paths(walker):
+    return [os.path.relpath(e.path, walker.roots[0]).replace(os.sep, "/") for e in walker]
+
+
+def test_files_come_before_their_subdirectories(tree):
+    found = paths(TreeWalker([tree]))
+    assert sorted(found) == ["a/1.txt", "a/b/2.txt", "a/b/c/3.txt", "a/d/4.txt",
+                             "e/5.txt", "e/f/6.txt", "target/7.txt", "top.txt"]
+    for parent, child in (("a/1.txt", "a/b/2.txt"), ("a/b/2.txt", "a/b/c/3.txt"),
+                          ("e/5.txt", "e/f/6.txt")):
+        assert found.index(parent) < found.index(child)
+
+
+@pytest.mark.parametrize("cls", [TreeWalker, ParallelWalker])
+def test_excluded_directories_are_not_entered(tree, cls):
+    found = paths(cls([tree], exclude=[tree / "target", tree / "a" / "b"]))
+    assert sorted(found) == ["a/1.txt", "a/d/4.txt", "e/5.txt", "e/f/6.txt", "top.txt"]
+    assert paths(cls([tree], exclude=[tree])) == []
+
+
+def test_estimated_total_is_exact_when_done(tree):
+    walker = TreeWalker([tree])
+    found = list(walker)
+    assert walker.done and walker.estimated_total() == len(found) == 8
+
+
+@pytest.mark.parametrize("workers, max_pending", [(1, None), (4, None), (8, 1)])
+def test_parallel_walker_keeps_tree_walker_order(tree, workers, max_pending):
+    expected = paths(TreeWalker([tree]))
+    walker = ParallelWalker([tree], workers=workers, max_pending=max_pending)
+    assert paths(walker) == expected
+    assert walker.done and walker.estimated_total() == len(expected)
+
+
+@pytest.mark.parametrize("cls", [TreeWalker, ParallelWalker])
+def test_multiple_roots_and_file_roots(tree, cls):
+    walker = cls([tree / "e", tree / "top.txt", tree / "e" / "f"])
+    found = [e.path for e in walker]
+    assert found == [str(tree / "e" / "5.txt"), str(tree / "e" / "f" / "6.txt"),
+                     str(tree / "top.txt")]
+
+
+def test_dedupe_roots(tree):
+    roots = [str(tree / "a" / "b"), str(tree / "a"), str(tree / "a" / "1.txt"), str(tree / "a")]
+    assert dedupe_roots(roots) == [str(tree / "a")]
@@ -0,0 +1,132 @@
+import csv
+import time
+import threading
+from array import array
+
+# -------------------- Configuration --------------------
+# (resolution in seconds, number of points): 1 h of 1 s, 1 day of 1 min, 30 days of 1 h
+DEFAULT_TIERS = ((1, 3600), (60, 1440), (3600, 720))
+
+
+# -------------------- Tier --------------------
+class _Tier:
+    """Fixed-size ring of (time, mean, max) points at one resolution."""
+
+    def __init__(self, resolution, capacity, n_metrics):
+        self.resolution = resolution
+        self.capacity = capacity
+        self.times = array("d", bytes(8 * capacity))
+        self.means = [array("f", bytes(4 * capacity)) for _ in range(n_metrics)]
+        self.maxes = [array("f", bytes(4 * capacity)) for _ in range(n_metrics)]
+        self.head = 0   # next slot to write
+        self.count = 0
+        # bucket being accumulated: start time, per-metric sum / max, sample count
+        self.bucket = None
+        self.sums = [0.0] * n_metrics
+        self.peaks = [0.0] * n_metrics
+        self.n = 0
+
+    def add(self, t, values):
+        start = t - t % self.resolution
+        if self.bucket is not None and start != self.bucket:
+            self._close()
+        if self.bucket is None:
+            self.bucket = start
+            self.sums = list(values)
+            self.peaks = list(values)
+            self.n = 1
+            return
+        for i, v in enumerate(values):
+            self.sums[i] += v
+            if v > self.peaks[i]:
+                self.peaks[i] = v
+        self.n += 1
+
+    def _close(self):
+        slot = self.head
+        self.times[slot] = self.bucket
+        for i in range(len(self.means)):
+            self.means[i][slot] = self.sums[i] / self.n
+            self.maxes[i][slot] = self.peaks[i]
+        self.head = (slot + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        self.bucket = None
+
+    def slots(self):
+        """Slot indices oldest -> newest."""
+        first = (self.head - self.count) % self.capacity
+        return [(first + k) % self.capacity for k in range(self.count)]
+
+
+# -------------------- Time Series Store --------------------
+class TimeSeriesStore:
+    """Fixed-memory history of a few metrics at several resolutions.
+
+    Every sample goes into each tier; a tier closes a bucket (mean and max
+    of the samples in it) when its resolution boundary is crossed, so the
+    finest tier keeps recent spikes exactly while coarser tiers cover days
+    at the same cost. Storage is preallocated typed arrays (12 bytes per
+    point per metric plus 8 for the time) and never grows. Safe to write
+    from a sampler thread while the UI reads.
+    """
+
+    def __init__(self, metrics, tiers=DEFAULT_TIERS):
+        self.metrics = tuple(metrics)
+        self.tiers = [_Tier(res, cap, len(self.metrics)) for res, cap in tiers]
+        self._index = {m: i for i, m in enumerate(self.metrics)}
+        self._lock = threading.Lock()
+
+    def add(self, t, values):
+        """Record one sample; `values` is aligned with `metrics`."""
+        values = [float(v) for v in values]
+        with self._lock:
+            for tier in self.tiers:
+                tier.add(t, values)
+
+    def series(self, metric, tier=0, kind="mean", since=None):
+        """(times, values) of one metric in one tier, oldest first.
+
+        The bucket still being filled is included as the newest point.
+        """
+        i = self._index[metric]
+        with self._lock:
+            tr = self.tiers[tier]
+            column = tr.means[i] if kind == "mean" else tr.maxes[i]
+            times = []
+            values = []
+            for slot in tr.slots():
+                if since is None or tr.times[slot] >= since:
+                    times.append(tr.times[slot])
+                    values.append(column[slot])
+            if tr.bucket is not None and tr.n:
+                times.append(tr.bucket)
+                values.append(tr.sums[i] / tr.n if kind == "mean" else tr.peaks[i])
+        return times, values
+
+    def recent(self, metric, seconds, kind="mean"):
+        """Values covering the last `seconds`, from the finest tier that spans them."""
+        since = time.time() - seconds
+        for n, tier in enumerate(self.tiers):
+            if tier.resolution * tier.capacity >= seconds:
+                return self.series(metric, n, kind, since)[1]
+        return self.series(metric, len(self.tiers) - 1, kind, since)[1]
+
+    def export_csv(self, path):
+        """Write every tier as rows of resolution, timestamp, <metric>_mean, <metric>_max."""
+        header = ["resolution_s", "timestamp"]
+        for m in self.metrics:
+            header += [f"{m}_mean", f"{m}_max"]
+        rows = 0
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            with self._lock:
+                for tier in self.tiers:
+                    for slot in tier.slots():
+                        row = [tier.resolution,
+                               time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(tier.times[slot]))]
+                        for i in range(len(self.metrics)):
+                            row += [round(tier.means[i][slot], 2), round(tier.maxes[i][slot], 2)]
+                        writer.writerow(row)
+                        rows += 1
+        return rows
@@ -0,0 +1,193 @@
+from tkinter import ttk
+
+# -------------------- Configuration --------------------
+DEFAULT_ROW_HEIGHT = 20
+HEADER_HEIGHT = 25
+WHEEL_ROWS = 3
+
+
+# -------------------- Virtual Table --------------------
+class VirtualTable(ttk.Frame):
+    """A Treeview that only materializes the visible window of rows.
+
+    Rows live in a plain backing list (`rows`); `view` is the list of row
+    indices currently shown, in display order. Sorting and filtering
+    rebuild `view` from the backing list and never touch widgets beyond
+    the handful of Treeview items on screen.
+
+    `values(row)` turns a row into the tuple shown in the columns and the
+    optional `tags(row)` returns the Treeview tags for it.
+    """
+
+    def __init__(self, parent, columns, values, tags=None, selectmode="extended"):
+        super().__init__(parent)
+        self.values = values
+        self.tags = tags
+        self.rows = []
+        self.view = []
+        self.offset = 0
+        self.selected = set()
+
+        self.tree = ttk.Treeview(self, columns=columns, show="headings", selectmode=selectmode)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.yview)
+        self.scrollbar.pack(side="right", fill="y")
+        self.tree.pack(side="left", fill="both", expand=True)
+
+        row_height = ttk.Style().lookup("Treeview", "rowheight")
+        self.row_height = int(row_height) if row_height else DEFAULT_ROW_HEIGHT
+        self.page_size = 1
+
+        self.tree.bind("<Configure>", self._on_resize)
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        self.tree.bind("<MouseWheel>", lambda e: self.scroll(-WHEEL_ROWS if e.delta > 0 else WHEEL_ROWS))
+        self.tree.bind("<Button-4>", lambda e: self.scroll(-WHEEL_ROWS))
+        self.tree.bind("<Button-5>", lambda e: self.scroll(WHEEL_ROWS))
+        self.tree.bind("<Up>", lambda e: self._on_arrow(-1))
+        self.tree.bind("<Down>", lambda e: self._on_arrow(1))
+        self.tree.bind("<Prior>", lambda e: self.scroll(-self.page_size))
+        self.tree.bind("<Next>", lambda e: self.scroll(self.page_size))
+
+    # ---------- Backing store ----------
+    def set_rows(self, rows):
+        """Replace the backing store and show every row."""
+        self.rows = list(rows)
+        self.view = list(range(len(self.rows)))
+        self.offset = 0
+        self.selected.clear()
+        self.render()
+
+    def set_store(self, store):
+        """Use an external row sequence (len + indexing) as the backing store."""
+        self.rows = store
+        self.view = list(range(len(store)))
+        self.offset = 0
+        self.selected.clear()
+        self.render()
+
+    def extend_view(self, indices):
+        """Add backing-store indices to the end of the view."""
+        self.view.extend(indices)
+        self.render()
+
+    def append_rows(self, rows, predicate=None):
+        """Append rows to the backing store.
+
+        New rows join the view unless `predicate(row)` is false.
+        """
+        start = len(self.rows)
+        self.rows.extend(rows)
+        if predicate is None:
+            self.view.extend(range(start, len(self.rows)))
+        else:
+            self.view.extend(i for i in range(start, len(self.rows)) if predicate(self.rows[i]))
+        self.render()
+
+    def clear(self):
+        self.set_rows([])
+
+    def set_view(self, indices):
+        """Show only the given backing-store indices, in that order."""
+        self.view = list(indices)
+        self.offset = 0
+        self.selected.intersection_update(self.view)
+        self.render()
+
+    def filter(self, predicate):
+        """Show the rows of the backing store for which `predicate(row)` is true."""
+        self.set_view(i for i, row in enumerate(self.rows) if predicate(row))
+
+    def sort(self, key, reverse=False):
+        """Sort the current view by `key(row)`."""
+        rows = self.rows
+        self.sort_view(lambda i: key(rows[i]), reverse)
+
+    def sort_view(self, index_key, reverse=False):
+        """Sort the current view by `index_key(row_index)`."""
+        self.view.sort(key=index_key, reverse=reverse)
+        self.render()
+
+    def visible_rows(self):
+        """Rows of the current view, in display order."""
+        return [self.rows[i] for i in self.view]
+
+    def selected_rows(self):
+        return [self.rows[i] for i in self.view if i in self.selected]
+
+    def focused_row(self):
+        item = self.tree.focus()
+        if not item:
+            return None
+        pos = self.offset + int(item)
+        return self.rows[self.view[pos]] if pos < len(self.view) else None
+
+    def __len__(self):
+        return len(self.view)
+
+    # ---------- Rendering ----------
+    def render(self):
+        """Refresh the Treeview items for the visible window."""
+        total = len(self.view)
+        self.offset = max(0, min(self.offset, total - self.page_size))
+        window = self.view[self.offset:self.offset + self.page_size]
+
+        items = self.tree.get_children()
+        for i in range(len(items), len(window)):
+            self.tree.insert("", "end", iid=str(i))
+        if len(items) > len(window):
+            self.tree.delete(*items[len(window):])
+
+        for i, idx in enumerate(window):
+            row = self.rows[idx]
+            self.tree.item(str(i), values=self.values(row),
+                           tags=self.tags(row) if self.tags else ())
+        self.tree.selection_set([str(i) for i, idx in enumerate(window) if idx in self.selected])
+
+        if total:
+            self.scrollbar.set(self.offset / total, min(1.0, (self.offset + len(window)) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def scroll(self, rows):
+        self.offset += rows
+        self.render()
+        return "break"
+
+    def yview(self, *args):
+        """Scrollbar command: ("moveto", fraction) or ("scroll", n, "units"|"pages")."""
+        if args[0] == "moveto":
+            self.offset = int(float(args[1]) * len(self.view))
+            self.render()
+        elif args[0] == "scroll":
+            step = self.page_size if args[2] == "pages" else 1
+            self.scroll(int(args[1]) * step)
+
+    # ---------- Events ----------
+    def _on_resize(self, event):
+        page = max(1, (event.height - HEADER_HEIGHT) // self.row_height)
+        if page != self.page_size:
+            self.page_size = page
+            self.render()
+
+    def _on_select(self, event=None):
+        window = self.view[self.offset:self.offset + self.page_size]
+        self.selected.difference_update(window)
+        for item in self.tree.selection():
+            pos = int(item)
+            if pos < len(window):
+                self.selected.add(window[pos])
+
+    def _on_arrow(self, step):
+        item = self.tree.focus()
+        pos = int(item) if item else 0
+        if (step < 0 and pos == 0) or (step > 0 and pos >= len(self.tree.get_children()) - 1):
+            # at the edge of the window: scroll and move the selection along
+            self.offset += step
+            self.render()
+            window = self.view[self.offset:self.offset + self.page_size]
+            if window:
+                pos = min(pos, len(window) - 1)
+                self.selected = {window[pos]}
+                self.render()
+                self.tree.focus(str(pos))
+            return "break"
+        return None
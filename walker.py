@@ -0,0 +1,211 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# -------------------- Configuration --------------------
+DEFAULT_CRAWL_WORKERS = 8
+
+
+# -------------------- Entries --------------------
+class PathEntry:
+    """os.DirEntry look-alike for a path given directly (e.g. a file source).
+
+    The stat result is fetched once and cached, like DirEntry does.
+    """
+
+    __slots__ = ("path", "name", "_stat")
+
+    def __init__(self, path):
+        self.path = os.fspath(path)
+        self.name = os.path.basename(self.path)
+        self._stat = None
+
+    def stat(self, follow_symlinks=True):
+        if self._stat is None:
+            self._stat = os.stat(self.path)
+        return self._stat
+
+    def is_dir(self, follow_symlinks=True):
+        return os.path.isdir(self.path)
+
+    def is_file(self, follow_symlinks=True):
+        return os.path.isfile(self.path)
+
+    def is_symlink(self):
+        return os.path.islink(self.path)
+
+    def __fspath__(self):
+        return self.path
+
+    def __repr__(self):
+        return f"<PathEntry {self.path!r}>"
+
+
+# -------------------- Walker --------------------
+class TreeWalker:
+    """Stream the files below one or more roots, as they are found.
+
+    Iterating yields os.DirEntry objects (PathEntry for roots that are
+    files) in os.walk order, so consumers can start work on the first file
+    while the rest of the tree is still being listed, and can use the
+    cached entry.stat() instead of a second stat call. Symlinked
+    directories are listed but not descended into (like os.walk);
+    unreadable directories are skipped.
+    """
+
+    def __init__(self, roots, follow_symlinks=False, exclude=()):
+        if isinstance(roots, (str, bytes, os.PathLike)):
+            roots = [roots]
+        self.roots = dedupe_roots(roots)
+        self.follow_symlinks = follow_symlinks
+        # directories (e.g. an organize target) that are never entered
+        self.exclude = {_norm(p) for p in exclude}
+        self.files_found = 0
+        self.dirs_done = 0
+        self.dirs_pending = 0
+        self.done = False
+
+    def __iter__(self):
+        for root in self.roots:
+            if os.path.isdir(root):
+                if _norm(root) not in self.exclude:
+                    yield from self._walk(root)
+            elif os.path.lexists(root):
+                self.files_found += 1
+                yield PathEntry(root)
+        self.done = True
+
+    def _walk(self, top):
+        stack = [top]
+        self.dirs_pending += 1
+        while stack:
+            path = stack.pop()
+            self.dirs_pending -= 1
+            files, subdirs = self._list_dir(path)
+            self.files_found += len(files)
+            yield from files
+            self.dirs_done += 1
+            self.dirs_pending += len(subdirs)
+            stack.extend(reversed(subdirs))
+
+    def _list_dir(self, path):
+        """Return ([file entries], [subdirectory paths]) for one directory."""
+        files = []
+        subdirs = []
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if is_dir:
+                        if (self.follow_symlinks or not entry.is_symlink()) \
+                                and _norm(entry.path) not in self.exclude:
+                            subdirs.append(entry.path)
+                    else:
+                        files.append(entry)
+        except OSError:
+            pass
+        return files, subdirs
+
+    def estimated_total(self):
+        """Files found so far plus an estimate for the directories not yet listed."""
+        if self.done:
+            return self.files_found
+        per_dir = self.files_found / self.dirs_done if self.dirs_done else 0
+        return self.files_found + int(self.dirs_pending * per_dir)
+
+
+class ParallelWalker(TreeWalker):
+    """TreeWalker that lists directories on a thread pool.
+
+    Listings of all roots and of the directories next in line are fetched
+    concurrently (at most `max_pending` listings held at once), which hides
+    per-directory latency on network mounts. Entries are still yielded as
+    one stream in the same order as TreeWalker.
+    """
+
+    def __init__(self, roots, follow_symlinks=False, exclude=(),
+                 workers=DEFAULT_CRAWL_WORKERS, max_pending=None):
+        super().__init__(roots, follow_symlinks, exclude)
+        self.workers = max(1, workers)
+        self.max_pending = max_pending or self.workers * 4
+
+    def __iter__(self):
+        # stack of [path, is_dir, future] in DFS order (top = next)
+        stack = [[root, os.path.isdir(root), None] for root in reversed(self.roots)
+                 if os.path.lexists(root) and _norm(root) not in self.exclude]
+        self.dirs_pending = sum(1 for node in stack if node[1])
+        inflight = 0
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            def top_up():
+                nonlocal inflight
+                for node in reversed(stack):
+                    if inflight >= self.max_pending:
+                        break
+                    if node[1] and node[2] is None:
+                        node[2] = pool.submit(self._list_dir, node[0])
+                        inflight += 1
+
+            while stack:
+                top_up()
+                path, is_dir, future = stack.pop()
+                if not is_dir:
+                    self.files_found += 1
+                    yield PathEntry(path)
+                    continue
+                if future is None:
+                    future = pool.submit(self._list_dir, path)
+                    inflight += 1
+                files, subdirs = future.result()
+                inflight -= 1
+                self.dirs_pending -= 1
+                self.dirs_done += 1
+                self.dirs_pending += len(subdirs)
+                self.files_found += len(files)
+                stack.extend([d, True, None] for d in reversed(subdirs))
+                top_up()
+                yield from files
+        self.done = True
+
+
+# -------------------- Helpers --------------------
+def _norm(path):
+    return os.path.normcase(os.path.abspath(os.fspath(path)))
+
+
+def dedupe_roots(roots):
+    """Drop repeated roots and roots that lie inside another directory root.
+
+    Order of first appearance is kept, e.g. a folder and a file inside it
+    both added as sources yield just the folder.
+    """
+    normed = []
+    for root in roots:
+        path = os.fspath(root)
+        normed.append((path, _norm(path)))
+    dirs = {n for _, n in normed if os.path.isdir(n)}
+    result = []
+    seen = set()
+    for path, n in normed:
+        if n in seen:
+            continue
+        parent = os.path.dirname(n)
+        inside = False
+        while parent and parent != n:
+            if parent in dirs:
+                inside = True
+                break
+            n, parent = parent, os.path.dirname(parent)
+        if not inside:
+            seen.add(_norm(path))
+            result.append(path)
+    return result
+
+
+def iter_files(roots, follow_symlinks=False, exclude=(), workers=DEFAULT_CRAWL_WORKERS):
+    """Stream file entries below `roots` (crawled in parallel when workers > 1)."""
+    if workers > 1:
+        return iter(ParallelWalker(roots, follow_symlinks, exclude, workers))
+    return iter(TreeWalker(roots, follow_symlinks, exclude))